@@ -1,7 +1,13 @@
 # main.py
+from src.ui.utils import startup_timing  # first: starts the startup clock (MARBLE_STARTUP_TIMING=1)
+
 import sys
-from PySide6.QtWidgets import QApplication
+import multiprocessing
+from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtCore import QTimer
 
+from src.db.database import engine
+from src.db.migrations import run_migrations
 from src.db.session import get_db
 from src.db.auth_repo import user_count
 from src.ui.auth_dialogs import FirstRunAdminDialog, LoginDialog
@@ -10,32 +16,53 @@ from src.ui.main_window import MainWindow
 
 
 def main():
+    startup_timing.mark("imports (Qt, SQLAlchemy, app)")
+
     app = QApplication(sys.argv)
+    startup_timing.mark("QApplication")
 
-    # 1) First run admin create (if no users)
-    with get_db() as db:
-        cnt = user_count(db)
+    # 0) Schema check (one query when up to date) + 1) first run admin create (if no users)
+    try:
+        run_migrations(engine)
+        with get_db() as db:
+            cnt = user_count(db)
+    except Exception as e:
+        QMessageBox.critical(None, "Database", f"Cannot open the database.\nCheck DATABASE_URL in .env\n\n{e}")
+        return
+    startup_timing.mark("DB connect + schema check + user count")
 
     if cnt == 0:
         fr = FirstRunAdminDialog()
         if fr.exec() != FirstRunAdminDialog.Accepted:
             return
         # created fr.user (admin), still go to login for consistency
+        startup_timing.mark("first-run admin dialog", wait=True)
 
     # 2) Login
     lg = LoginDialog()
     if lg.exec() != LoginDialog.Accepted:
         return
+    startup_timing.mark("login dialog", wait=True)
 
     AppState.current_user = lg.user
 
     # 3) Launch app
     w = MainWindow()
+    startup_timing.mark("MainWindow (+ dashboard page)")
     w.apply_permissions()  # ✅ role-based UI
     w.show()
+    startup_timing.mark("show()")
+
+    # fires after the first paint => window is actually on screen
+    def _first_paint():
+        startup_timing.mark("first paint")
+        startup_timing.report()
+
+    QTimer.singleShot(0, _first_paint)
 
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # importer process pool in packaged (exe) builds
     main()
@@ -28,7 +28,12 @@ def create_adjustment(
     qty_primary: float,
     qty_secondary: int | None,
     notes: str | None = None,
+    commit: bool = True,
 ):
+    """
+    commit=False stages the ledger row only (caller commits), used by the batch
+    so a multi-line adjustment is posted in one transaction.
+    """
     if not location_id:
         raise ValueError("Location is required.")
 
@@ -80,10 +85,12 @@ def create_adjustment(
         unit_primary=item.unit_primary,
         unit_secondary=item.unit_secondary,
         ref_type="adjustment",
-        ref_id=None
+        ref_id=None,
+        allow_negative=not is_out,
     )
 
-    db.commit()
+    if commit:
+        db.commit()
 
 
 # =========================================================
@@ -105,8 +112,11 @@ def create_adjustments_batch(db, payload: dict):
             qty_primary=r["qty_primary"],
             qty_secondary=r.get("qty_secondary"),
             notes=notes,
+            commit=False,
         )
 
+    db.commit()
+
 
 # =========================================================
 # LIST
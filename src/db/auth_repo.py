@@ -2,7 +2,7 @@
 from sqlalchemy.orm import Session
 
 from src.db.models import User
-from src.db.security import hash_password, verify_password
+from src.db.security import hash_password, verify_password, needs_rehash
 
 
 def user_count(db: Session) -> int:
@@ -40,4 +40,20 @@ def authenticate(db: Session, username: str, password: str) -> User | None:
         return None
     if not verify_password(password or "", u.password_hash):
         return None
+
+    # ✅ old format / cost changed in .env => upgrade now, we have the plain password only here
+    if needs_rehash(u.password_hash):
+        u.password_hash = hash_password(password or "")
+        db.commit()
+        db.refresh(u)  # caller keeps u after the session closes
+    return u
+
+
+def set_password(db: Session, user_id: int, password: str) -> User:
+    u = db.query(User).get(user_id)
+    if not u:
+        raise ValueError("User not found.")
+    u.password_hash = hash_password(password or "")
+    db.commit()
+    db.refresh(u)
     return u
@@ -0,0 +1,163 @@
+# src/db/balance_columns.py
+"""
+Balances for many items / locations at once, as columns instead of dicts:
+
+    cols = bulk_balances(db)                                  # every (item, location)
+    cols = bulk_balances(db, item_ids=ids, by_location=False) # per item, all locations summed
+    cols = bulk_balances(db, location_ids=[2], as_of=date(2026, 9, 30))
+
+    cols.item_ids / cols.location_ids   array('q')   (location 0 = none / all locations)
+    cols.primary                        array('d')   sqft OR piece
+    cols.secondary                      array('q')   slab / box (0 for BLOCK/TABLE)
+    cols.row_of(item_id, location_id)   -> row index (-1 = no stock row)
+    cols.aligned(item_ids)              -> (primary, secondary) lined up with item_ids
+
+ONE grouped query (stock_balance, or nearest snapshot + ledger for as_of). The helpers
+at_or_below() / top_n() work on whole columns: numpy when it's installed (optional, not in
+requirements), plain array loops otherwise — same results either way.
+"""
+import heapq
+from array import array
+
+from sqlalchemy import func, select
+
+from src.db.models import StockBalance
+from src.db.ledger_repo import stock_as_of
+
+try:
+    import numpy as np
+except ImportError:  # optional speed-up only
+    np = None
+
+
+class BalanceColumns:
+    def __init__(self, item_ids, location_ids, primary, secondary, by_location: bool = True):
+        self.item_ids = item_ids
+        self.location_ids = location_ids
+        self.primary = primary
+        self.secondary = secondary
+        self.by_location = by_location
+        self._rows = None
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def row_of(self, item_id, location_id=None) -> int:
+        if self._rows is None:
+            self._rows = {key: i for i, key in enumerate(zip(self.item_ids, self.location_ids))}
+        return self._rows.get((int(item_id), int(location_id or 0)), -1)
+
+    def get(self, item_id, location_id=None) -> tuple[float, int]:
+        """(primary, secondary) like get_stock_balance; (0.0, 0) when there's no row."""
+        i = self.row_of(item_id, location_id)
+        return (self.primary[i], self.secondary[i]) if i >= 0 else (0.0, 0)
+
+    def aligned(self, item_ids) -> tuple[array, array]:
+        """
+        (primary, secondary) columns with one entry per item_ids entry, same order; (0.0, 0)
+        where there's no row. item_ids must be ascending (ORDER BY id) and the columns per item
+        (by_location=False) — both sides sorted => a positional merge, no per-item lookups.
+        """
+        if self.by_location:
+            raise ValueError("aligned() needs per-item columns: bulk_balances(..., by_location=False)")
+
+        if not len(self):
+            n = len(item_ids)
+            return array("d", bytes(8 * n)), array("q", bytes(8 * n))
+
+        if np is not None:
+            want = np.asarray(item_ids, dtype=np.int64)
+            have = np.frombuffer(self.item_ids, dtype=np.int64)
+            pos = np.minimum(np.searchsorted(have, want), len(have) - 1)
+            hit = have[pos] == want
+            pri = np.where(hit, np.frombuffer(self.primary, dtype=np.float64)[pos], 0.0)
+            sec = np.where(hit, np.frombuffer(self.secondary, dtype=np.int64)[pos], 0)
+            return array("d", pri.tobytes()), array("q", sec.astype(np.int64).tobytes())
+
+        pri, sec = array("d"), array("q")
+        have, n, j = self.item_ids, len(self), 0
+        for item_id in item_ids:
+            while j < n and have[j] < item_id:
+                j += 1
+            if j < n and have[j] == item_id:
+                pri.append(self.primary[j])
+                sec.append(self.secondary[j])
+            else:
+                pri.append(0.0)
+                sec.append(0)
+        return pri, sec
+
+    def as_numpy(self) -> dict:
+        """Zero-copy numpy views of the columns (ImportError without numpy)."""
+        if np is None:
+            raise ImportError("numpy is not installed (pip install numpy)")
+        return {
+            "item_ids": np.frombuffer(self.item_ids, dtype=np.int64),
+            "location_ids": np.frombuffer(self.location_ids, dtype=np.int64),
+            "primary": np.frombuffer(self.primary, dtype=np.float64),
+            "secondary": np.frombuffer(self.secondary, dtype=np.int64),
+        }
+
+
+def bulk_balances(db, item_ids=None, location_ids=None, by_location: bool = True, as_of=None) -> BalanceColumns:
+    """
+    item_ids / location_ids: None = all. by_location=False => one row per item (locations summed).
+    as_of: date/datetime => historical balance (ledger_repo.stock_as_of), else stock_balance.
+    Rows come sorted by (item_id, location_id).
+    """
+    src = StockBalance.__table__ if as_of is None else stock_as_of(db, as_of)
+    loc = func.coalesce(src.c.location_id, 0) if by_location else None
+
+    keys = [src.c.item_id] + ([loc] if by_location else [])
+    q = select(
+        *keys,
+        func.coalesce(func.sum(src.c.qty_primary), 0),
+        func.coalesce(func.sum(src.c.qty_secondary), 0),
+    )
+    if item_ids is not None:
+        q = q.where(src.c.item_id.in_([int(i) for i in item_ids]))
+    if location_ids is not None:
+        q = q.where(src.c.location_id.in_([int(l) for l in location_ids]))
+    rows = db.execute(q.group_by(*keys).order_by(*keys)).all()
+
+    if not rows:
+        return BalanceColumns(array("q"), array("q"), array("d"), array("q"), by_location)
+
+    cols = list(zip(*rows))
+    if not by_location:
+        cols.insert(1, (0,) * len(rows))
+    return BalanceColumns(
+        array("q", cols[0]),
+        array("q", cols[1]),
+        array("d", map(float, cols[2])),
+        array("q", map(int, cols[3])),
+        by_location,
+    )
+
+
+def at_or_below(values, limits) -> list[int]:
+    """Row indexes where values[i] <= limits[i] (limits: a column or one number)."""
+    if np is not None:
+        v = np.asarray(values, dtype=np.float64)
+        lim = limits if isinstance(limits, (int, float)) else np.asarray(limits, dtype=np.float64)
+        return np.flatnonzero(v <= lim).tolist()
+    if isinstance(limits, (int, float)):
+        return [i for i, v in enumerate(values) if v <= limits]
+    return [i for i, (v, lim) in enumerate(zip(values, limits)) if v <= lim]
+
+
+def top_n(values, n: int, largest: bool = False, rows=None) -> list[int]:
+    """
+    Indexes of the n smallest (largest=True: biggest) values, in order; ties keep row order.
+    rows: only rank these indexes (e.g. the result of at_or_below).
+    """
+    if n <= 0:
+        return []
+    if np is not None:
+        v = np.asarray(values, dtype=np.float64)
+        idx = np.arange(len(v)) if rows is None else np.asarray(rows, dtype=np.int64)
+        order = np.argsort(-v[idx] if largest else v[idx], kind="stable")[:n]
+        return idx[order].tolist()
+    idx = range(len(values)) if rows is None else rows
+    pick = heapq.nlargest if largest else heapq.nsmallest
+    return pick(n, idx, key=values.__getitem__)
@@ -1,11 +1,12 @@
 # src/db/block_repo.py
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 from sqlalchemy.orm import joinedload
 
+from src.db.item_search import item_match
 from src.db.models import BlockInventory, Item
 
 
-def list_blocks(db, q_text: str = ""):
+def list_blocks(db, q_text: str = "", limit: int | None = None, offset: int = 0):
     q = (
         db.query(BlockInventory)
         .options(
@@ -17,11 +18,10 @@ def list_blocks(db, q_text: str = ""):
     )
 
     if q_text:
-        like = f"%{q_text}%"
-        q = q.join(BlockInventory.item).filter(
-            or_(Item.sku.ilike(like), Item.name.ilike(like))
-        )
+        q = q.join(BlockInventory.item).filter(item_match(q_text))
 
+    if limit:
+        q = q.offset(offset).limit(limit)
     return q.all()
 
 
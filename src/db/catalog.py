@@ -0,0 +1,125 @@
+# src/db/catalog.py
+"""
+Process-wide item + location catalog for the entry dialogs (sales, purchases, returns,
+adjustments, slab/tile/block/table entry).
+
+    cat = catalog.get_catalog()          # loads once, then served from memory
+    cat.items                            # all active items, newest first (like get_items)
+    cat.in_category("SLAB")              # active SLAB items, by name (like get_slab_items)
+    cat.item(item_id) / cat.by_sku("MBL-001")
+    cat.locations                        # active locations, by name
+
+Records are small immutable NamedTuples (not ORM objects) => safe to keep around, share
+between dialogs and read from any thread; nothing is bound to a closed session.
+
+Dropped by invalidate(): the UI calls it on signals.inventory_changed("items") (see
+src/ui/signals.py). Items/locations changed on ANOTHER till show up after MAX_AGE_S.
+"""
+import threading
+import time
+from decimal import Decimal
+from typing import NamedTuple
+
+from src.db.models import Item, Location
+from src.db.session import get_db
+
+MAX_AGE_S = 300.0
+
+
+class ItemRec(NamedTuple):
+    id: int
+    sku: str
+    name: str
+    category: str
+    unit_primary: str | None
+    unit_secondary: str | None
+    sqft_per_unit: Decimal | None
+    material: str | None
+    thickness: str | None
+    finish: str | None
+
+    @property
+    def label(self) -> str:
+        return f"{self.sku} — {self.name}"
+
+
+class LocationRec(NamedTuple):
+    id: int
+    name: str
+
+
+class Catalog:
+    def __init__(self, items, locations):
+        self.items = tuple(sorted(items, key=lambda it: it.id, reverse=True))
+        self.locations = tuple(sorted(locations, key=lambda l: l.name))
+
+        self._by_id = {it.id: it for it in self.items}
+        self._by_sku = {it.sku.upper(): it for it in self.items}
+
+        by_cat = {}
+        for it in sorted(self.items, key=lambda it: it.name):
+            by_cat.setdefault((it.category or "").upper(), []).append(it)
+        self._by_category = {cat: tuple(rows) for cat, rows in by_cat.items()}
+
+        self.loaded_at = time.monotonic()
+
+    def item(self, item_id):
+        return self._by_id.get(item_id)
+
+    def by_sku(self, sku: str):
+        return self._by_sku.get((sku or "").strip().upper())
+
+    def in_category(self, category: str):
+        cat = (category or "ALL").upper()
+        if cat == "ALL":
+            return self.items
+        return self._by_category.get(cat, ())
+
+    def location(self, location_id):
+        for loc in self.locations:
+            if loc.id == location_id:
+                return loc
+        return None
+
+
+_ITEM_COLS = (
+    Item.id, Item.sku, Item.name, Item.category, Item.unit_primary, Item.unit_secondary,
+    Item.sqft_per_unit, Item.material, Item.thickness, Item.finish,
+)
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def load_catalog(db) -> Catalog:
+    items = [ItemRec(*row) for row in db.query(*_ITEM_COLS).filter(Item.is_active == True)]
+    locations = [
+        LocationRec(*row)
+        for row in db.query(Location.id, Location.name).filter(Location.is_active == True)
+    ]
+    return Catalog(items, locations)
+
+
+def get_catalog(db=None) -> Catalog:
+    """Cached catalog; loads it (with db, or a session of its own) when missing or stale."""
+    global _catalog
+    with _lock:
+        cat = _catalog
+        if cat is not None and time.monotonic() - cat.loaded_at < MAX_AGE_S:
+            return cat
+
+        if db is not None:
+            cat = load_catalog(db)
+        else:
+            with get_db() as own:
+                cat = load_catalog(own)
+
+        _catalog = cat
+        return cat
+
+
+def invalidate():
+    """Items/locations changed => next get_catalog() reloads."""
+    global _catalog
+    with _lock:
+        _catalog = None
@@ -0,0 +1,109 @@
+# src/db/compact_inventory.py
+import sys
+from datetime import datetime, timedelta, timezone
+
+from src.db.session import get_db
+from src.db.compaction_repo import (
+    compaction_candidates, compact_inventory, list_compactions,
+    superseded_by, verify_compaction, revert_compaction, inventory_vs_ledger,
+)
+
+DEFAULT_KEEP_DAYS = 365
+
+
+def _arg(argv, name, default):
+    if name in argv:
+        try:
+            return int(argv[argv.index(name) + 1])
+        except Exception:
+            pass
+    return default
+
+
+def _fmt(ts):
+    return ts.strftime("%Y-%m-%d %H:%M") if ts else "-"
+
+
+def main(argv=None):
+    """
+    python -m src.db.compact_inventory                  -> dry run: what would be collapsed
+    python -m src.db.compact_inventory --apply          -> collapse rows older than 365 days
+    python -m src.db.compact_inventory --days 90 --apply
+    python -m src.db.compact_inventory --list           -> past runs (+ check of their carry rows)
+    python -m src.db.compact_inventory --revert ID      -> put run ID's original rows back
+    python -m src.db.compact_inventory --audit          -> inventory tables vs stock_ledger
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    days = max(1, _arg(argv, "--days", DEFAULT_KEEP_DAYS))
+    revert_id = _arg(argv, "--revert", None)
+
+    with get_db() as db:
+        if "--list" in argv:
+            runs = list_compactions(db)
+            if not runs:
+                print("No compactions yet.")
+            for c in runs:
+                if c.reverted_at:
+                    state = f"reverted {_fmt(c.reverted_at)}"
+                elif superseded_by(db, c.id):
+                    state = f"compacted again by #{superseded_by(db, c.id)}"
+                else:
+                    state = "carry rows OK ✅" if not verify_compaction(db, c.id) else "carry rows changed ⚠"
+                print(
+                    f"  #{c.id}  {_fmt(c.created_at)}  before {_fmt(c.cutoff)}  "
+                    f"archived={c.rows_archived} carry={c.carry_rows}  {state}"
+                )
+            return 0
+
+        if revert_id is not None:
+            try:
+                c = revert_compaction(db, revert_id, force="--force" in argv)
+            except ValueError as e:
+                print(f"Not reverted: {e}")
+                if "changed since" in str(e):
+                    print("Run with --force to revert anyway (those changes are lost).")
+                return 1
+            print(f"Compaction #{c.id} reverted: {c.rows_archived} row(s) restored ✅")
+            return 0
+
+        if "--audit" in argv:
+            diff = inventory_vs_ledger(db)
+            if not diff:
+                print("inventory tables match stock_ledger ✅")
+                return 0
+            print(f"{len(diff)} item/location total(s) differ from stock_ledger "
+                  f"(manual slab/tile/block/table entries don't post to the ledger):")
+            for d in diff[:50]:
+                print(
+                    f"  item={d['item_id']} location={d['location_id']}  "
+                    f"inventory=({d['inventory_primary']:.3f}, {d['inventory_secondary']})  "
+                    f"ledger=({d['ledger_primary']:.3f}, {d['ledger_secondary']})"
+                )
+            if len(diff) > 50:
+                print(f"  ... {len(diff) - 50} more")
+            return 1
+
+        cutoff = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+
+        if "--apply" not in argv:
+            cands = compaction_candidates(db, cutoff)
+            print(f"Rows older than {cutoff:%Y-%m-%d} (keep {days} days of detail):")
+            for kind, (groups, rows) in cands.items():
+                print(f"  {kind:<6} {rows:>8} row(s) in {groups} item/location group(s)")
+            print("Dry run. Run with --apply to compact.")
+            return 0
+
+        c = compact_inventory(db, cutoff, notes=f"keep {days} days")
+        if c is None:
+            print("Nothing to compact ✅")
+            return 0
+        print(
+            f"Compaction #{c.id}: {c.rows_archived} row(s) archived -> {c.carry_rows} carry-forward row(s), "
+            f"stock totals unchanged ✅"
+        )
+        print(f"Undo with: python -m src.db.compact_inventory --revert {c.id}")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+# src/db/compaction_repo.py
+"""
+Inventory compaction: slab/tile/block/table rows are append-only (every purchase, sale,
+return, cancel adds one), so the tables grow with history instead of with stock.
+
+compact_inventory(db, cutoff) — for every (item, location) with 2+ rows older than cutoff:
+    1. copy those rows (active AND soft-deleted) to inventory_archive, unchanged
+    2. delete them from the inventory table
+    3. write ONE carry-forward row = sum of the active ones, compaction_id = this run,
+       id = newest archived id (keeps the row where it was in id-ordered lists)
+  Totals per (kind, item, location) are compared before/after in the same transaction;
+  any difference => ValueError and nothing is committed. On Postgres the four tables are
+  write-locked for the whole run (a till posting meanwhile waits, it doesn't get lost).
+
+revert_compaction(db, id) — carry-forward rows out, archived rows back with their own ids.
+Newest first: a run whose carry rows were compacted again by a later run can't be reverted
+before that later run.
+
+inventory_vs_ledger(db) — live inventory totals per (item, location) vs SUM(stock_ledger);
+compaction never changes this list (manual slab/tile entries don't post to the ledger, so
+it isn't always empty).
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import case, delete, func, insert, literal, select, text
+
+from src.db.inventory_view import KINDS, inventory_union
+from src.db.models import (
+    SlabInventory, TileInventory, BlockInventory, TableInventory,
+    InventoryCompaction, InventoryArchive, StockLedger,
+)
+
+# kind -> (model, primary column name, secondary column name)
+_TABLES = {
+    "SLAB": (SlabInventory, "total_sqft", "slab_count"),
+    "TILE": (TileInventory, "total_sqft", "box_count"),
+    "BLOCK": (BlockInventory, "piece_count", None),
+    "TABLE": (TableInventory, "piece_count", None),
+}
+
+TOLERANCE = 0.0005
+
+
+def _ts(db, value: datetime):
+    # SQLite keeps CURRENT_TIMESTAMP text ("YYYY-MM-DD HH:MM:SS", UTC) => compare as that text
+    if db.get_bind().dialect.name == "sqlite":
+        return literal(value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    return value
+
+
+def _lock_tables(db):
+    """
+    Postgres: the four inventory tables are locked against writes till commit/rollback, so a
+    till can't edit / soft-delete / add a row between the totals, the archive copy and the
+    DELETE (it waits for the run instead). Reads keep working.
+    SQLite locks the whole file on the first write anyway.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    names = ", ".join(model.__tablename__ for model, _, _ in _TABLES.values())
+    db.execute(text(f"LOCK TABLE {names} IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def _key(location_id):
+    # NULL location is its own group (NULL = NULL is not true in a join)
+    return func.coalesce(location_id, 0)
+
+
+def inventory_totals(db) -> dict:
+    """{(kind, item_id, location_id): (primary, secondary)} over the active inventory rows."""
+    inv = inventory_union()
+    rows = db.execute(
+        select(
+            inv.c.kind, inv.c.item_id, inv.c.location_id,
+            func.coalesce(func.sum(inv.c.qty_primary), 0),
+            func.coalesce(func.sum(inv.c.qty_secondary), 0),
+        ).group_by(inv.c.kind, inv.c.item_id, inv.c.location_id)
+    )
+    return {(r[0], r[1], r[2]): (float(r[3]), int(r[4])) for r in rows}
+
+
+def _totals_diff(before: dict, after: dict) -> list:
+    diff = []
+    for key in set(before) | set(after):
+        b_pri, b_sec = before.get(key, (0.0, 0))
+        a_pri, a_sec = after.get(key, (0.0, 0))
+        if abs(b_pri - a_pri) > TOLERANCE or b_sec != a_sec:
+            diff.append((key, (b_pri, b_sec), (a_pri, a_sec)))
+    return diff
+
+
+def compaction_candidates(db, cutoff: datetime) -> dict:
+    """{kind: (groups, rows)} that compact_inventory(cutoff) would collapse (read only)."""
+    out = {}
+    for kind, (model, _, _) in _TABLES.items():
+        groups = (
+            select(func.count().label("n"))
+            .where(model.created_at < _ts(db, cutoff))
+            .group_by(model.item_id, _key(model.location_id))
+            .having(func.count() > 1)
+            .subquery()
+        )
+        n_groups, n_rows = db.execute(select(func.count(), func.coalesce(func.sum(groups.c.n), 0))).one()
+        out[kind] = (int(n_groups or 0), int(n_rows or 0))
+    return out
+
+
+def _compact_kind(db, comp_id: int, kind: str, cutoff) -> tuple[int, int]:
+    model, pri_name, sec_name = _TABLES[kind]
+    pri = getattr(model, pri_name)
+    sec = getattr(model, sec_name) if sec_name else None
+    old = model.created_at < cutoff
+
+    groups = (
+        select(model.item_id.label("item_id"), _key(model.location_id).label("loc_key"))
+        .where(old)
+        .group_by(model.item_id, _key(model.location_id))
+        .having(func.count() > 1)
+        .subquery("groups")
+    )
+
+    # 1) archive
+    rows = (
+        select(
+            literal(comp_id), literal(kind), model.id, model.compaction_id,
+            model.item_id, model.location_id, pri, sec if sec is not None else literal(None),
+            model.notes, model.is_active, model.created_at,
+        )
+        .join(groups, (groups.c.item_id == model.item_id) & (groups.c.loc_key == _key(model.location_id)))
+        .where(old)
+    )
+    archived = db.execute(
+        insert(InventoryArchive).from_select(
+            ["compaction_id", "kind", "source_id", "source_compaction_id", "item_id", "location_id",
+             "qty_primary", "qty_secondary", "notes", "is_active", "created_at"],
+            rows,
+        )
+    ).rowcount
+    if not archived:
+        return 0, 0
+
+    # 2) originals out
+    mine = (InventoryArchive.compaction_id == comp_id) & (InventoryArchive.kind == kind)
+    db.execute(
+        delete(model)
+        .where(model.id.in_(select(InventoryArchive.source_id).where(mine)))
+        .execution_options(synchronize_session=False)
+    )
+
+    # 3) one carry-forward row per group (only active rows count; all soft-deleted => none)
+    active = InventoryArchive.is_active == True
+    sum_pri = func.coalesce(func.sum(case((active, InventoryArchive.qty_primary), else_=0)), 0)
+    sum_sec = func.coalesce(func.sum(case((active, InventoryArchive.qty_secondary), else_=0)), 0)
+    carry = (
+        select(
+            func.max(InventoryArchive.source_id), InventoryArchive.item_id, InventoryArchive.location_id,
+            sum_pri, *([sum_sec] if sec is not None else []),
+            literal(f"Carry-forward (compaction #{comp_id})"), literal(True),
+            func.max(InventoryArchive.created_at), literal(comp_id),
+        )
+        .where(mine)
+        .group_by(InventoryArchive.item_id, InventoryArchive.location_id)
+        .having(func.sum(case((active, 1), else_=0)) > 0)
+    )
+    cols = ["id", "item_id", "location_id", pri_name] + ([sec_name] if sec_name else []) + [
+        "notes", "is_active", "created_at", "compaction_id",
+    ]
+    carried = db.execute(insert(model).from_select(cols, carry)).rowcount
+    return archived, carried
+
+
+def compact_inventory(db, cutoff: datetime, notes: str | None = None) -> InventoryCompaction | None:
+    """
+    Collapses rows older than cutoff (see module doc) and commits.
+    Returns the InventoryCompaction record, or None when there was nothing to compact.
+    """
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+
+    try:
+        _lock_tables(db)
+        before = inventory_totals(db)
+
+        comp = InventoryCompaction(cutoff=cutoff, notes=notes)
+        db.add(comp)
+        db.flush()
+
+        archived = carried = 0
+        for kind in KINDS:
+            a, c = _compact_kind(db, comp.id, kind, _ts(db, cutoff))
+            archived += a
+            carried += c
+
+        if not archived:
+            db.rollback()
+            return None
+
+        diff = _totals_diff(before, inventory_totals(db))
+        if diff:
+            raise ValueError(f"Compaction would change {len(diff)} stock total(s), e.g. {diff[0]} — rolled back.")
+
+        comp.rows_archived = archived
+        comp.carry_rows = carried
+        db.commit()
+        db.refresh(comp)
+        return comp
+    except Exception:
+        db.rollback()
+        raise
+
+
+def list_compactions(db):
+    return db.query(InventoryCompaction).order_by(InventoryCompaction.id.desc()).all()
+
+
+def superseded_by(db, comp_id: int) -> int | None:
+    """Id of the later run that archived this run's carry-forward rows (None = still live)."""
+    row = (
+        db.query(InventoryArchive.compaction_id)
+        .filter(InventoryArchive.source_compaction_id == comp_id)
+        .first()
+    )
+    return row[0] if row else None
+
+
+def verify_compaction(db, comp_id: int) -> list[str]:
+    """
+    Carry-forward rows of a run vs its archived rows. Returns problems (empty = matches):
+    a carry row edited / soft-deleted / already compacted again shows up here.
+    """
+    problems = []
+    for kind, (model, pri_name, sec_name) in _TABLES.items():
+        pri = getattr(model, pri_name)
+        sec = getattr(model, sec_name) if sec_name else literal(0)
+
+        a = InventoryArchive
+        active = a.is_active == True
+        expected = {
+            (r[0], r[1]): (float(r[2]), int(r[3]))
+            for r in db.query(
+                a.item_id, a.location_id,
+                func.coalesce(func.sum(case((active, a.qty_primary), else_=0)), 0),
+                func.coalesce(func.sum(case((active, a.qty_secondary), else_=0)), 0),
+            )
+            .filter(a.compaction_id == comp_id, a.kind == kind)
+            .group_by(a.item_id, a.location_id)
+            .having(func.sum(case((active, 1), else_=0)) > 0)
+        }
+        actual = {
+            (r[0], r[1]): (float(r[2] or 0), int(r[3] or 0), r[4])
+            for r in db.query(model.item_id, model.location_id, pri, sec, model.is_active)
+            .filter(model.compaction_id == comp_id)
+        }
+
+        for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1] or 0)):
+            exp = expected.get(key)
+            act = actual.get(key)
+            where = f"{kind} item={key[0]} location={key[1]}"
+            if act is None:
+                problems.append(f"{where}: carry-forward row missing (compacted again or deleted)")
+            elif exp is None:
+                problems.append(f"{where}: carry-forward row without archived rows")
+            elif not act[2]:
+                problems.append(f"{where}: carry-forward row was deleted")
+            elif abs(exp[0] - act[0]) > TOLERANCE or exp[1] != act[1]:
+                problems.append(f"{where}: archived={exp[0]:.3f}/{exp[1]} carry-forward={act[0]:.3f}/{act[1]}")
+    return problems
+
+
+def revert_compaction(db, comp_id: int, force: bool = False) -> InventoryCompaction:
+    """
+    Puts the archived rows back (same ids) and removes the run's carry-forward rows; commits.
+    ValueError when it was reverted already, a later run still holds its carry rows, or a
+    carry row changed since (force=True reverts anyway; the change is lost).
+    """
+    try:
+        # checks below run under the same lock as the restore
+        _lock_tables(db)
+
+        comp = db.query(InventoryCompaction).get(comp_id)
+        if comp is None:
+            raise ValueError(f"Compaction #{comp_id} not found.")
+        if comp.reverted_at is not None:
+            raise ValueError(f"Compaction #{comp_id} was already reverted.")
+
+        later = superseded_by(db, comp_id)
+        if later is not None:
+            raise ValueError(f"Revert compaction #{later} first (it compacted #{comp_id}'s carry-forward rows).")
+
+        if not force:
+            problems = verify_compaction(db, comp_id)
+            if problems:
+                raise ValueError(
+                    f"Carry-forward rows of #{comp_id} changed since:\n  " + "\n  ".join(problems[:10])
+                )
+
+        for kind, (model, pri_name, sec_name) in _TABLES.items():
+            db.execute(
+                delete(model)
+                .where(model.compaction_id == comp_id)
+                .execution_options(synchronize_session=False)
+            )
+
+            a = InventoryArchive
+            rows = (
+                select(
+                    a.source_id, a.item_id, a.location_id, a.qty_primary,
+                    *([a.qty_secondary] if sec_name else []),
+                    a.notes, a.is_active, a.created_at, a.source_compaction_id,
+                )
+                .where(a.compaction_id == comp_id, a.kind == kind)
+            )
+            cols = ["id", "item_id", "location_id", pri_name] + ([sec_name] if sec_name else []) + [
+                "notes", "is_active", "created_at", "compaction_id",
+            ]
+            db.execute(insert(model).from_select(cols, rows))
+
+        db.execute(delete(InventoryArchive).where(InventoryArchive.compaction_id == comp_id))
+        comp.reverted_at = datetime.now(timezone.utc)
+        db.commit()
+        db.refresh(comp)
+        return comp
+    except Exception:
+        db.rollback()
+        raise
+
+
+def inventory_vs_ledger(db) -> list[dict]:
+    """
+    [{item_id, location_id, inventory_primary, inventory_secondary, ledger_primary, ledger_secondary}]
+    for every (item, location) where the inventory tables and stock_ledger disagree.
+    """
+    inventory = {}
+    for (_, item_id, location_id), (pri, sec) in inventory_totals(db).items():
+        p, s = inventory.get((item_id, location_id), (0.0, 0))
+        inventory[(item_id, location_id)] = (p + pri, s + sec)
+
+    ledger = {
+        (r[0], r[1]): (float(r[2]), int(r[3]))
+        for r in db.query(
+            StockLedger.item_id, StockLedger.location_id,
+            func.coalesce(func.sum(StockLedger.qty_primary), 0),
+            func.coalesce(func.sum(StockLedger.qty_secondary), 0),
+        ).group_by(StockLedger.item_id, StockLedger.location_id)
+    }
+
+    out = []
+    for key in sorted(set(inventory) | set(ledger), key=lambda k: (k[0], k[1] or 0)):
+        inv_pri, inv_sec = inventory.get(key, (0.0, 0))
+        led_pri, led_sec = ledger.get(key, (0.0, 0))
+        if abs(inv_pri - led_pri) > TOLERANCE or inv_sec != led_sec:
+            out.append({
+                "item_id": key[0],
+                "location_id": key[1],
+                "inventory_primary": inv_pri,
+                "inventory_secondary": inv_sec,
+                "ledger_primary": led_pri,
+                "ledger_secondary": led_sec,
+            })
+    return out
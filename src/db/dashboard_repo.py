@@ -1,37 +1,57 @@
 # src/db/dashboard_repo.py
-from sqlalchemy import func
+import math
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from sqlalchemy import func, case, select
 
 from src.db.models import (
     SlabInventory, TileInventory, BlockInventory, TableInventory,
-    Purchase, Item, StockLedger
+    Purchase, Item, StockBalance, ReorderThreshold
 )
+from src.db.balance_columns import bulk_balances, at_or_below, top_n
+
+
+# category -> (low, critical)
+# SLAB/TILE in slab/box, BLOCK/TABLE in pieces
+DEFAULT_THRESHOLDS = {
+    "SLAB": (5, 2),
+    "TILE": (6, 2),     # tile boxes <=2 => CRITICAL
+    "BLOCK": (20, 10),
+    "TABLE": (20, 10),
+}
+
+
+def _active_sum(model, col):
+    return (
+        select(func.coalesce(func.sum(col), 0))
+        .where(model.is_active == True)
+        .scalar_subquery()
+    )
 
 
 def get_dashboard_totals(db):
     """
     Returns dict with totals used on dashboard cards.
     NOTE: keys kept backward-compatible.
+    ONE statement (scalar subqueries) => one round trip instead of seven.
     """
+    row = db.query(
+        _active_sum(SlabInventory, SlabInventory.slab_count).label("slabs_count"),
+        _active_sum(SlabInventory, SlabInventory.total_sqft).label("slabs_sqft"),
+        _active_sum(TileInventory, TileInventory.box_count).label("tiles_boxes"),
+        _active_sum(TileInventory, TileInventory.total_sqft).label("tiles_sqft"),
+        _active_sum(BlockInventory, BlockInventory.piece_count).label("blocks_pieces"),
+        _active_sum(TableInventory, TableInventory.piece_count).label("tables_pieces"),
+        select(func.count(Purchase.id)).scalar_subquery().label("purchases_count"),
+    ).one()
 
-    slabs_count = db.query(func.coalesce(func.sum(SlabInventory.slab_count), 0)) \
-        .filter(SlabInventory.is_active == True).scalar()
-
-    slabs_sqft = db.query(func.coalesce(func.sum(SlabInventory.total_sqft), 0)) \
-        .filter(SlabInventory.is_active == True).scalar()
-
-    tiles_boxes = db.query(func.coalesce(func.sum(TileInventory.box_count), 0)) \
-        .filter(TileInventory.is_active == True).scalar()
-
-    tiles_sqft = db.query(func.coalesce(func.sum(TileInventory.total_sqft), 0)) \
-        .filter(TileInventory.is_active == True).scalar()
-
-    blocks_pieces = db.query(func.coalesce(func.sum(BlockInventory.piece_count), 0)) \
-        .filter(BlockInventory.is_active == True).scalar()
-
-    tables_pieces = db.query(func.coalesce(func.sum(TableInventory.piece_count), 0)) \
-        .filter(TableInventory.is_active == True).scalar()
-
-    purchases_count = db.query(func.count(Purchase.id)).scalar() or 0
+    slabs_count, slabs_sqft = row.slabs_count, row.slabs_sqft
+    tiles_boxes, tiles_sqft = row.tiles_boxes, row.tiles_sqft
+    blocks_pieces, tables_pieces = row.blocks_pieces, row.tables_pieces
+    purchases_count = row.purchases_count
 
     return {
         # old-style keys
@@ -54,61 +74,225 @@ def get_dashboard_totals(db):
     }
 
 
+def get_category_thresholds(db) -> dict:
+    """
+    Returns {category: {"low": float, "critical": float}}
+    DB rows (reorder_thresholds) override DEFAULT_THRESHOLDS.
+    """
+    out = {cat: {"low": float(low), "critical": float(crit)} for cat, (low, crit) in DEFAULT_THRESHOLDS.items()}
+    for t in db.query(ReorderThreshold).all():
+        out[(t.category or "").upper()] = {
+            "low": float(t.low_level or 0),
+            "critical": float(t.critical_level or 0),
+        }
+    return out
+
+
+def stock_level(value, low, critical) -> str:
+    """zero / critical / low / ok"""
+    try:
+        v = float(value or 0)
+    except Exception:
+        v = 0.0
+
+    if v <= 0:
+        return "zero"
+    if v <= float(critical or 0):
+        return "critical"
+    if v <= float(low or 0):
+        return "low"
+    return "ok"
+
+
 def get_low_stock_top_items(db, limit: int = 5, location_id=None):
     """
-    Low stock list (Top N) using StockLedger balances.
+    Low stock list (Top N) using stock_balance, in ONE grouped query.
 
     SLAB/TILE -> secondary balance (slab/box)
     BLOCK/TABLE -> primary balance (piece)
 
     If location_id is provided -> location-wise stock.
     Returns list of dict:
-    [{sku,name,category,qty,unit}]
+    [{sku,name,category,qty,unit,reorder_level,level}]
     """
+    bal = db.query(
+        StockBalance.item_id.label("item_id"),
+        func.sum(StockBalance.qty_primary).label("pri"),
+        func.sum(StockBalance.qty_secondary).label("sec"),
+    )
+    if location_id is not None:
+        bal = bal.filter(StockBalance.location_id == location_id)
+    bal = bal.group_by(StockBalance.item_id).subquery()
+
+    cat = func.upper(func.coalesce(Item.category, ""))
+    is_pair = cat.in_(("SLAB", "TILE"))
+
+    # per-category unit rule
+    qty = case(
+        (is_pair, func.coalesce(bal.c.sec, 0)),
+        else_=func.round(func.coalesce(bal.c.pri, 0)),
+    ).label("qty")
 
-    items = db.query(Item).filter(Item.is_active == True).order_by(Item.sku.asc()).all()
+    rows = (
+        db.query(
+            Item.sku, Item.name, cat.label("category"),
+            Item.unit_primary, Item.unit_secondary,
+            qty,
+            func.coalesce(Item.reorder_level, ReorderThreshold.low_level).label("reorder_level"),
+            ReorderThreshold.critical_level.label("critical_level"),
+        )
+        .outerjoin(bal, bal.c.item_id == Item.id)
+        .outerjoin(ReorderThreshold, ReorderThreshold.category == cat)
+        .filter(Item.is_active == True)
+        .order_by(qty.asc(), Item.sku.asc())
+        .limit(max(1, int(limit or 5)))
+        .all()
+    )
 
     out = []
-    for it in items:
-        cat = (it.category or "").upper()
+    for r in rows:
+        c = r.category or ""
+        default_low, default_crit = DEFAULT_THRESHOLDS.get(c, (0, 0))
+        low = float(r.reorder_level if r.reorder_level is not None else default_low)
+        crit = float(r.critical_level if r.critical_level is not None else default_crit)
+
+        if c in ("SLAB", "TILE"):
+            unit = r.unit_secondary or ("slab" if c == "SLAB" else "box")
+        else:
+            unit = r.unit_primary or "piece"
 
-        q_pri = db.query(func.coalesce(func.sum(StockLedger.qty_primary), 0)) \
-            .filter(StockLedger.item_id == it.id)
+        q = int(round(float(r.qty or 0)))
+        out.append({
+            "sku": r.sku,
+            "name": r.name,
+            "category": c,
+            "qty": q,
+            "unit": unit,
+            "reorder_level": low,
+            "level": stock_level(q, low, min(crit, low)),
+        })
+
+    return out
+
+
+def _sql_round(x: float) -> float:
+    """ROUND() like Postgres numeric / SQLite: halves away from zero (Python's round() goes to even)."""
+    return math.copysign(math.floor(abs(x) + 0.5), x)
 
-        q_sec = db.query(func.coalesce(func.sum(StockLedger.qty_secondary), 0)) \
-            .filter(StockLedger.item_id == it.id)
 
-        if location_id is not None:
-            q_pri = q_pri.filter(StockLedger.location_id == location_id)
-            q_sec = q_sec.filter(StockLedger.location_id == location_id)
+def get_reorder_suggestions(db, location_id=None, limit: int | None = None):
+    """
+    Every active item at or below its reorder level (item reorder_level, else the category
+    low threshold), lowest stock first — the full list behind the dashboard's Top 5
+    ("View all"). Same qty / level rules as get_low_stock_top_items.
+
+    Items + thresholds come from one query ordered by id, balances from bulk_balances
+    (per item, also ordered by id) => lined up by position; the threshold check and the
+    ordering then run over whole columns.
+
+    Returns list of dict:
+    [{item_id,sku,name,category,qty,unit,reorder_level,level,suggested}]
+      suggested = how much brings it back up to reorder_level
+    """
+    cat = func.upper(func.coalesce(Item.category, ""))
+    items = (
+        db.query(
+            Item.id, Item.sku, Item.name, cat.label("category"),
+            Item.unit_primary, Item.unit_secondary,
+            func.coalesce(Item.reorder_level, ReorderThreshold.low_level).label("reorder_level"),
+            ReorderThreshold.critical_level.label("critical_level"),
+        )
+        .outerjoin(ReorderThreshold, ReorderThreshold.category == cat)
+        .filter(Item.is_active == True)
+        .order_by(Item.id)
+        .all()
+    )
+    if not items:
+        return []
 
-        pri = q_pri.scalar() or 0
-        sec = q_sec.scalar() or 0
+    bal = bulk_balances(db, location_ids=None if location_id is None else [location_id], by_location=False)
+    pri, sec = bal.aligned(array("q", (it.id for it in items)))
 
-        try:
-            pri_val = float(pri or 0)
-        except Exception:
-            pri_val = 0.0
+    # qty in the reorder unit: SLAB/TILE -> slab/box, BLOCK/TABLE -> rounded pieces
+    pair = [it.category in ("SLAB", "TILE") for it in items]
+    qty = array("d", (float(s) if is_pair else _sql_round(p) for is_pair, p, s in zip(pair, pri, sec)))
+    low = array("d", (
+        float(it.reorder_level) if it.reorder_level is not None else float(DEFAULT_THRESHOLDS.get(it.category, (0, 0))[0])
+        for it in items
+    ))
 
-        try:
-            sec_val = int(sec or 0)
-        except Exception:
-            sec_val = 0
+    due = at_or_below(qty, low)
+    order = top_n(qty, len(due) if limit is None else int(limit), rows=due)
 
-        if cat in ("SLAB", "TILE"):
-            qty = sec_val
-            unit = it.unit_secondary or ("slab" if cat == "SLAB" else "box")
+    out = []
+    for i in order:
+        it = items[i]
+        c = it.category or ""
+        crit = float(it.critical_level if it.critical_level is not None else DEFAULT_THRESHOLDS.get(c, (0, 0))[1])
+        if pair[i]:
+            unit = it.unit_secondary or ("slab" if c == "SLAB" else "box")
         else:
-            qty = int(round(pri_val))
             unit = it.unit_primary or "piece"
 
+        q = int(qty[i])
         out.append({
+            "item_id": it.id,
             "sku": it.sku,
             "name": it.name,
-            "category": cat,
-            "qty": qty,
+            "category": c,
+            "qty": q,
             "unit": unit,
+            "reorder_level": low[i],
+            "level": stock_level(q, low[i], min(crit, low[i])),
+            "suggested": max(0.0, low[i] - q),
         })
+    return out
+
+
+# ---------------------------------------------------------
+# Snapshot cache (dashboard page)
+# ---------------------------------------------------------
+# Navigating to the dashboard shows the last snapshot at once; the page refreshes it in the
+# background when it's older than SNAPSHOT_TTL_S or marked stale (inventory_changed).
+SNAPSHOT_TTL_S = 30.0
+
+_snap_lock = threading.Lock()
+_snapshot = None
+_version = 0   # bumped by invalidate; a snapshot read before the bump stays stale
+
+
+def load_dashboard_snapshot(db, low_limit: int = 5) -> dict:
+    """Everything the dashboard shows, read now (and cached)."""
+    global _snapshot
+    with _snap_lock:
+        version = _version
+
+    snap = {
+        "totals": get_dashboard_totals(db),
+        "low_items": get_low_stock_top_items(db, limit=low_limit),
+        "thresholds": get_category_thresholds(db),
+        "taken_at": datetime.now(),
+        "loaded_at": time.monotonic(),
+        "version": version,
+    }
+    with _snap_lock:
+        if _snapshot is None or _snapshot["version"] <= version:
+            _snapshot = snap
+    return snap
+
+
+def cached_dashboard_snapshot():
+    """-> (snapshot or None, fresh: bool). Never touches the DB."""
+    with _snap_lock:
+        snap = _snapshot
+        if snap is None:
+            return None, False
+        fresh = snap["version"] == _version and time.monotonic() - snap["loaded_at"] < SNAPSHOT_TTL_S
+        return snap, fresh
+
 
-    out.sort(key=lambda x: x["qty"])
-    return out[: max(1, int(limit or 5))]
+def invalidate_dashboard_snapshot():
+    """Stock changed: keep showing the old numbers, but reload on next look."""
+    global _version
+    with _snap_lock:
+        _version += 1
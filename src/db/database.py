@@ -2,7 +2,6 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from src.db.migrations import ensure_items_extra_columns
 
 load_dotenv()
 
@@ -14,5 +13,5 @@ engine = create_engine(DATABASE_URL, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
-# Base.metadata.create_all(engine) ke baad:
-ensure_items_extra_columns(engine)
+# NOTE: no DB access at import time. Schema migrations run from main.py / init_db
+# (src.db.migrations.run_migrations), so importing src.db never opens a connection.
@@ -0,0 +1,129 @@
+# src/db/import_clean.py
+"""
+Pure row cleaning/validation for the items importer.
+NO database imports here: this module is loaded by the importer's worker
+processes (spawn re-imports it), so keep it cheap and side-effect free.
+"""
+
+
+def parse_float_or_none(val):
+    if val is None:
+        return None
+    s = str(val).strip()
+    if not s:
+        return None
+    try:
+        return float(s)
+    except Exception:
+        # allow commas "12,345.6"
+        try:
+            return float(s.replace(",", ""))
+        except Exception:
+            return None
+
+
+def clean_row(row: dict) -> dict:
+    # normalize keys (case-insensitive headers)
+    # e.g. "SKU" -> "sku"
+    row = {str(k).strip().lower(): v for k, v in (row or {}).items() if k is not None}
+
+    sku = (row.get("sku") or "").strip().upper()
+    name = (row.get("name") or "").strip()
+
+    category = (row.get("category") or "").strip().upper()
+
+    unit_primary = (row.get("unit_primary") or "").strip().lower() or "sqft"
+    unit_secondary = (row.get("unit_secondary") or "").strip().lower() or None
+
+    sqft_per_unit = parse_float_or_none(row.get("sqft_per_unit"))
+
+    # ✅ new optional fields
+    material = (row.get("material") or "").strip() or None
+    thickness = (row.get("thickness") or "").strip() or None
+    finish = (row.get("finish") or "").strip() or None
+
+    data = {
+        "sku": sku,
+        "name": name,
+        "category": category,
+        "unit_primary": unit_primary,
+        "unit_secondary": unit_secondary,
+        "sqft_per_unit": sqft_per_unit,
+        "material": material,
+        "thickness": thickness,
+        "finish": finish,
+    }
+
+    # enforce rules for BLOCK/TABLE
+    if category in ("BLOCK", "TABLE"):
+        data["unit_primary"] = "piece"
+        data["unit_secondary"] = None
+        data["sqft_per_unit"] = None
+
+    # if no secondary unit, sqft_per_unit should be None
+    if not data["unit_secondary"]:
+        data["sqft_per_unit"] = None
+
+    return data
+
+
+def validate_chunk(chunk: list) -> tuple[list, list, list]:
+    """
+    Parse + validate one chunk (runs in a worker process, or inline).
+    chunk = [(row_no, raw_dict)]
+    Returns (valid, invalid, errors):
+    - valid = [(row_no, data)] in file order (duplicates are NOT checked here;
+      the single writer does that in file order => first row wins, deterministic)
+    - invalid = row numbers missing sku/name/category (counted as skipped)
+    """
+    valid = []
+    invalid = []
+    errors = []
+
+    for row_no, row in chunk:
+        try:
+            data = clean_row(row)
+        except Exception as e:
+            errors.append(f"Row {row_no}: {e}")
+            continue
+
+        # validation
+        if not data["sku"] or not data["name"] or not data["category"]:
+            invalid.append(row_no)
+            continue
+
+        valid.append((row_no, data))
+
+    return valid, invalid, errors
+
+
+# fields the importer writes (sku is the key) => compared by the dry-run diff
+# and by the real import to skip rows that wouldn't change anything
+DIFF_FIELDS = (
+    "name", "category",
+    "unit_primary", "unit_secondary", "sqft_per_unit",
+    "material", "thickness", "finish",
+)
+
+
+def _norm(field: str, v):
+    if v is None or v == "":
+        return None
+    if field == "sqft_per_unit":
+        try:
+            return round(float(v), 3)  # column is Numeric(10, 3)
+        except Exception:
+            return v
+    return v
+
+
+def changed_fields(data: dict, current: tuple) -> list[str]:
+    """
+    data    = cleaned file row
+    current = catalog values in DIFF_FIELDS order + is_active (item_repo.get_catalog_index)
+    Returns the field names the import would change ([] => identical, skip it).
+    """
+    out = [f for f, cur in zip(DIFF_FIELDS, current) if _norm(f, data.get(f)) != _norm(f, cur)]
+    if not current[len(DIFF_FIELDS)]:
+        out.append("is_active")  # upsert reactivates deleted items
+    return out
@@ -1,8 +1,17 @@
 # src/db/importer.py
 import csv
+import multiprocessing
 import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
-from src.db.item_repo import upsert_by_sku
+from src.db.item_repo import (
+    bulk_upsert_by_sku, get_catalog_index,
+    supports_copy, copy_stage_items, merge_staged_items,
+)
+from src.db.import_clean import validate_chunk, changed_fields, DIFF_FIELDS
+from src.db import item_search
 
 # Excel support (optional dependency)
 try:
@@ -11,183 +20,385 @@ except Exception:
     load_workbook = None
 
 
-def _parse_float_or_none(val):
-    if val is None:
-        return None
-    s = str(val).strip()
-    if not s:
-        return None
-    try:
-        return float(s)
-    except Exception:
-        # allow commas "12,345.6"
-        try:
-            return float(s.replace(",", ""))
-        except Exception:
-            return None
-
-
-def _clean_row(row: dict) -> dict:
-    # normalize keys (case-insensitive headers)
-    # e.g. "SKU" -> "sku"
-    row = {str(k).strip().lower(): v for k, v in (row or {}).items() if k is not None}
-
-    sku = (row.get("sku") or "").strip().upper()
-    name = (row.get("name") or "").strip()
-
-    category = (row.get("category") or "").strip().upper()
-
-    unit_primary = (row.get("unit_primary") or "").strip().lower() or "sqft"
-    unit_secondary = (row.get("unit_secondary") or "").strip().lower() or None
+class CopyImportFailed(Exception):
+    """COPY/merge failed; transaction rolled back, nothing imported (caller falls back to upsert)."""
+
+
+class _ImportSink:
+    """
+    Writer side of the import (always ONE thread, owns the db session).
+    Takes validated chunks in file order, drops in-file duplicate SKUs (first row wins),
+    diffs every row against the catalog (loaded ONCE up front) and skips rows that
+    wouldn't change anything ("unchanged"), then writes:
+    - mode="upsert": item_repo.bulk_upsert_by_sku per batch_size rows, commit per chunk.
+      If a chunk fails, it is replayed row by row so the error points to the exact row.
+    - mode="copy" (Postgres + psycopg2): COPY into a temp staging table per 10k rows,
+      then ONE set-based UPSERT + ONE commit in finish(). All-or-nothing:
+      a cancel rolls everything back, a bad row raises CopyImportFailed.
+      Other engines silently use "upsert" (batched executemany).
+    - mode="dry_run": nothing is written; only the change set is collected (see result()).
+    """
+    def __init__(self, db, mode="upsert", batch_size=500):
+        self.db = db
+        self.dry_run = mode == "dry_run"
+        self.use_copy = mode == "copy" and supports_copy(db)
+        # COPY likes big pieces; the buffer per chunk is still small
+        self.chunk_size = max(batch_size, 10000) if self.use_copy else batch_size
+
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.unchanged = 0
+        self.errors = []
+
+        # the ONLY read: {sku: (DIFF_FIELDS values..., is_active)}
+        self.catalog = get_catalog_index(db, DIFF_FIELDS)
+        self.field_changes = {}
+
+        # dry-run change set
+        self.insert_skus = []
+        self.update_skus = []
+        self.unchanged_skus = []
+        self.invalid_rows = []
+
+        # ✅ Detect duplicate SKUs inside the file itself (case-insensitive, SKUs are upper-cased)
+        self.seen = set()
+        self.pending = []  # [(row_no, data)]
+
+    def add(self, valid: list, invalid: list | None = None, errors: list | None = None):
+        invalid = invalid or []
+        self.skipped += len(invalid)
+        self.errors.extend(errors or [])
+        if self.dry_run:
+            self.invalid_rows.extend(invalid)
+
+        for row_no, data in valid:
+            sku = data["sku"]
+            if sku in self.seen:
+                self.skipped += 1
+                self.errors.append(f"Row {row_no}: duplicate SKU in file ({sku})")
+                if self.dry_run:
+                    self.invalid_rows.append(row_no)
+                continue
+            self.seen.add(sku)
+
+            current = self.catalog.get(sku)
+            if current is not None:
+                changed = changed_fields(data, current)
+                if not changed:
+                    self.unchanged += 1
+                    if self.dry_run:
+                        self.unchanged_skus.append(sku)
+                    continue
+                for f in changed:
+                    self.field_changes[f] = self.field_changes.get(f, 0) + 1
+
+            if self.dry_run:
+                if current is None:
+                    self.inserted += 1
+                    self.insert_skus.append(sku)
+                else:
+                    self.updated += 1
+                    self.update_skus.append(sku)
+                continue
 
-    sqft_per_unit = _parse_float_or_none(row.get("sqft_per_unit"))
+            self.pending.append((row_no, data))
 
-    # ✅ new optional fields
-    material = (row.get("material") or "").strip() or None
-    thickness = (row.get("thickness") or "").strip() or None
-    finish = (row.get("finish") or "").strip() or None
+            if len(self.pending) >= self.chunk_size:
+                self.flush()
 
-    data = {
-        "sku": sku,
-        "name": name,
-        "category": category,
-        "unit_primary": unit_primary,
-        "unit_secondary": unit_secondary,
-        "sqft_per_unit": sqft_per_unit,
-        "material": material,
-        "thickness": thickness,
-        "finish": finish,
-    }
+    def flush(self):
+        chunk, self.pending = self.pending, []
+        if not chunk:
+            return
 
-    # enforce rules for BLOCK/TABLE
-    if category in ("BLOCK", "TABLE"):
-        data["unit_primary"] = "piece"
-        data["unit_secondary"] = None
-        data["sqft_per_unit"] = None
+        db = self.db
+        if self.use_copy:
+            try:
+                copy_stage_items(db, [d for _, d in chunk])
+            except Exception as e:
+                db.rollback()
+                raise CopyImportFailed(str(e)) from e
+            return
 
-    # if no secondary unit, sqft_per_unit should be None
-    if not data["unit_secondary"]:
-        data["sqft_per_unit"] = None
+        try:
+            ins, upd = bulk_upsert_by_sku(db, [d for _, d in chunk], existing=self.catalog)
+            db.commit()
+            self.inserted += ins
+            self.updated += upd
+        except Exception:
+            db.rollback()
+            for row_no, d in chunk:
+                try:
+                    ins, upd = bulk_upsert_by_sku(db, [d], existing=self.catalog)
+                    db.commit()
+                    self.inserted += ins
+                    self.updated += upd
+                except Exception as e:
+                    db.rollback()
+                    self.errors.append(f"Row {row_no}: {e}")
+
+    def finish(self, cancelled: bool, progress_cb=None) -> dict:
+        db = self.db
+
+        if self.dry_run:
+            db.rollback()  # nothing to write; just end the read transaction
+            if cancelled:
+                self.errors.append("Dry run cancelled by user.")
+            if progress_cb:
+                progress_cb(100, "Preview ready ✅")
+            return self.result()
+
+        if cancelled:
+            self.errors.append("Import cancelled by user.")
+            if self.use_copy:
+                db.rollback()  # drops the staging table too
+                self.pending = []
+                return self.result(inserted=0, updated=0)
+
+        # rows read before a cancel are still saved (same as before)
+        self.flush()
+        item_search.invalidate()  # names/attributes may have changed (count/max id won't show that)
+
+        if self.use_copy:
+            if progress_cb:
+                progress_cb(99, "Merging into items...")
+            try:
+                self.inserted, self.updated = merge_staged_items(db)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise CopyImportFailed(str(e)) from e
 
-    return data
+        if progress_cb:
+            progress_cb(100, "Done ✅")
+
+        return self.result()
+
+    def result(self, **override) -> dict:
+        """
+        Same keys as always (inserted/updated/skipped/errors) + "unchanged".
+        Dry run also adds "dry_run": True and "changes":
+        {inserted: [sku], updated: [sku], unchanged: [sku], invalid: [row_no], fields: {field: n}}
+        """
+        res = {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+        }
+        if self.dry_run:
+            res["dry_run"] = True
+            res["changes"] = {
+                "inserted": self.insert_skus,
+                "updated": self.update_skus,
+                "unchanged": self.unchanged_skus,
+                "invalid": self.invalid_rows,
+                "fields": dict(sorted(self.field_changes.items(), key=lambda kv: -kv[1])),
+            }
+        else:
+            res["fields"] = dict(self.field_changes)
+        res.update(override)
+        return res
+
+
+def _chunks(rows, size: int, cancelled):
+    """Groups (row_no, raw) into lists of `size`; stops early when cancelled() turns True."""
+    chunk = []
+    for item in rows:
+        if cancelled():
+            break
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
-def import_items_csv(
+def _import_rows(
     db,
-    file_path: str,
+    rows,
+    total: int,
     mode="upsert",
     batch_size=500,
     progress_cb=None,
-    stop_flag=None
+    stop_flag=None,
+    workers=None
 ):
-    inserted = 0
-    updated = 0
-    skipped = 0
-    errors = []
+    """
+    Shared streaming pipeline (CSV / Excel):
+    rows = iterator of (row_no, raw_dict); never materialised as a list.
+
+    workers <= 1: parse/validate inline, chunk by chunk.
+    workers > 1 : producer/consumer (_import_rows_parallel).
+    total is only for progress (may be an estimate).
+    """
+    if workers and workers > 1:
+        return _import_rows_parallel(
+            db, rows, total,
+            mode=mode,
+            batch_size=batch_size,
+            progress_cb=progress_cb,
+            stop_flag=stop_flag,
+            workers=workers
+        )
 
     def cancelled():
         return stop_flag() if stop_flag else False
 
-    with open(file_path, "r", newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    sink = _ImportSink(db, mode=mode, batch_size=batch_size)
+    done = 0
 
-    total = len(rows)
-    if total == 0:
-        return {"inserted": 0, "updated": 0, "skipped": 0, "errors": ["CSV is empty"]}
+    for chunk in _chunks(rows, batch_size, cancelled):
+        sink.add(*validate_chunk(chunk))
+        done += len(chunk)
 
-    # ✅ Detect duplicate SKUs inside the CSV itself (case-insensitive)
-    seen = set()
+        if progress_cb:
+            pct = min(99, int((done / total) * 100)) if total else 0
+            progress_cb(
+                pct,
+                f"Importing {done}/{max(total, done)}... "
+                f"Inserted: {sink.inserted} Updated: {sink.updated} Skipped: {sink.skipped}"
+            )
 
-    for i, row in enumerate(rows, start=1):
-        if cancelled():
-            errors.append("Import cancelled by user.")
-            break
+    return sink.finish(cancelled(), progress_cb)
 
-        try:
-            data = _clean_row(row)
 
-            # validation
-            if not data["sku"] or not data["name"] or not data["category"]:
-                skipped += 1
-                continue
+def _import_rows_parallel(
+    db,
+    rows,
+    total: int,
+    mode="upsert",
+    batch_size=500,
+    progress_cb=None,
+    stop_flag=None,
+    workers=2
+):
+    """
+    Producer/consumer import for very large files:
+    - this thread reads the file and submits chunks of raw rows to a process pool
+      (import_clean.validate_chunk: parse + validate, no DB)
+    - ONE writer thread takes the results in submission (= file) order, so in-file
+      duplicate detection stays first-wins and deterministic, and does all DB work
+    - bounded queue => reading never runs far ahead of writing (flat memory)
+    Progress = (validated rows + written rows) / (2 * total).
+    stop_flag is checked by the reader per row and by the writer per chunk.
+    """
+    def cancelled():
+        return stop_flag() if stop_flag else False
 
-            sku_key = data["sku"].upper()
-            if sku_key in seen:
-                skipped += 1
-                errors.append(f"Row {i}: duplicate SKU in file ({data['sku']})")
-                continue
-            seen.add(sku_key)
+    sink = _ImportSink(db, mode=mode, batch_size=batch_size)
+    work = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    state = {"validated": 0, "written": 0, "failure": None}
+
+    def report():
+        if not progress_cb:
+            return
+        t = max(total, state["validated"], state["written"])
+        pct = min(99, int(((state["validated"] + state["written"]) / (2 * t)) * 100)) if t else 0
+        progress_cb(
+            pct,
+            f"Validated {state['validated']}/{t} · Written {state['written']}... "
+            f"Inserted: {sink.inserted} Updated: {sink.updated} Skipped: {sink.skipped}"
+        )
 
-            res = upsert_by_sku(db, data)  # "inserted" or "updated"
-            if res == "inserted":
-                inserted += 1
-            else:
-                updated += 1
+    def on_validated(fut, n):
+        if not fut.cancelled():
+            state["validated"] += n
 
-            db.flush()
+    def writer():
+        while True:
+            job = work.get()
+            if job is None:
+                return
+            fut, n = job
 
-            if i % batch_size == 0:
-                db.commit()
+            if stop.is_set() or cancelled():
+                stop.set()
+                fut.cancel()
+                continue
 
-        except Exception as e:
-            db.rollback()
-            errors.append(f"Row {i}: {e}")
+            try:
+                sink.add(*fut.result())
+            except Exception as e:
+                state["failure"] = e
+                stop.set()
+                continue
 
-        if progress_cb:
-            pct = int((i / total) * 100)
-            progress_cb(
-                pct,
-                f"Importing {i}/{total}... Inserted: {inserted} Updated: {updated} Skipped: {skipped}"
-            )
+            state["written"] += n
+            report()
 
-    try:
-        db.commit()
-    except Exception:
+    # spawn: workers never inherit the DB connection pool / Qt threads of this process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        t = threading.Thread(target=writer, name="import-writer", daemon=True)
+        t.start()
+        try:
+            for chunk in _chunks(rows, max(batch_size, 5000), lambda: stop.is_set() or cancelled()):
+                fut = pool.submit(validate_chunk, chunk)
+                fut.add_done_callback(lambda f, n=len(chunk): on_validated(f, n))
+                work.put((fut, len(chunk)))  # blocks while the writer is behind
+        finally:
+            work.put(None)
+            t.join()
+
+    if state["failure"] is not None:
+        if isinstance(state["failure"], CopyImportFailed):
+            raise state["failure"]
         db.rollback()
+        sink.errors.append(f"Import stopped: {state['failure']}")
+        if sink.use_copy:
+            # the rollback dropped every COPY batch staged so far => all-or-nothing means nothing;
+            # never let finish() merge the leftover tail
+            sink.pending = []
+            sink.errors.append("Nothing was imported (COPY import is all-or-nothing).")
+            return sink.result(inserted=0, updated=0)
 
-    if progress_cb:
-        progress_cb(100, "Done ✅")
+    return sink.finish(stop.is_set() and state["failure"] is None, progress_cb)
 
-    return {"inserted": inserted, "updated": updated, "skipped": skipped, "errors": errors}
 
+def _count_csv_rows(file_path: str) -> int:
+    """Cheap line-count pass for the progress bar (no parsing; quoted newlines may overcount)."""
+    with open(file_path, "rb") as f:
+        lines = sum(1 for _ in f)
+    return max(0, lines - 1)  # minus header
 
-def import_items_xlsx(
+
+def import_items_csv(
     db,
     file_path: str,
     mode="upsert",
     batch_size=500,
     progress_cb=None,
-    stop_flag=None
+    stop_flag=None,
+    workers=None
 ):
-    if load_workbook is None:
-        raise RuntimeError("Excel import requires 'openpyxl'. Install it: pip install openpyxl")
-
-    inserted = 0
-    updated = 0
-    skipped = 0
-    errors = []
-
-    def cancelled():
-        return stop_flag() if stop_flag else False
-
-    wb = load_workbook(file_path, read_only=True, data_only=True)
-    ws = wb.active  # first sheet
-
-    rows_iter = ws.iter_rows(values_only=True)
-    header_row = next(rows_iter, None)
-
-    if not header_row:
-        return {"inserted": 0, "updated": 0, "skipped": 0, "errors": ["Excel is empty (no header row)."]}
+    total = _count_csv_rows(file_path)
+    if total == 0:
+        return {"inserted": 0, "updated": 0, "skipped": 0, "errors": ["CSV is empty"]}
 
-    headers = [str(h).strip().lower() if h is not None else "" for h in header_row]
+    with open(file_path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        return _import_rows(
+            db,
+            enumerate(reader, start=1),
+            total,
+            mode=mode,
+            batch_size=batch_size,
+            progress_cb=progress_cb,
+            stop_flag=stop_flag,
+            workers=workers
+        )
 
-    # Expected headers (recommended):
-    # sku, name, category, unit_primary, unit_secondary, sqft_per_unit, material, thickness, finish
 
-    data_rows = []
-    for r in rows_iter:
-        # skip fully empty rows
+def _xlsx_rows(ws, headers):
+    """
+    Generator over the sheet (read_only mode streams rows from the zip):
+    yields (row_no, row_dict); fully empty rows are skipped. Nothing is kept in memory.
+    """
+    for row_no, r in enumerate(ws.iter_rows(min_row=2, values_only=True), start=1):
         if not r or all(v is None or str(v).strip() == "" for v in r):
             continue
         row_dict = {}
@@ -195,65 +406,53 @@ def import_items_xlsx(
             if not key:
                 continue
             row_dict[key] = r[idx] if idx < len(r) else None
-        data_rows.append(row_dict)
-
-    total = len(data_rows)
-    if total == 0:
-        return {"inserted": 0, "updated": 0, "skipped": 0, "errors": ["Excel has no data rows."]}
-
-    seen = set()
-
-    for i, row in enumerate(data_rows, start=1):
-        if cancelled():
-            errors.append("Import cancelled by user.")
-            break
-
-        try:
-            data = _clean_row(row)
-
-            # validation
-            if not data["sku"] or not data["name"] or not data["category"]:
-                skipped += 1
-                continue
+        yield row_no, row_dict
 
-            sku_key = data["sku"].upper()
-            if sku_key in seen:
-                skipped += 1
-                errors.append(f"Row {i}: duplicate SKU in file ({data['sku']})")
-                continue
-            seen.add(sku_key)
 
-            res = upsert_by_sku(db, data)
-            if res == "inserted":
-                inserted += 1
-            else:
-                updated += 1
+def import_items_xlsx(
+    db,
+    file_path: str,
+    mode="upsert",
+    batch_size=500,
+    progress_cb=None,
+    stop_flag=None,
+    workers=None
+):
+    if load_workbook is None:
+        raise RuntimeError("Excel import requires 'openpyxl'. Install it: pip install openpyxl")
 
-            db.flush()
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active  # first sheet
 
-            if i % batch_size == 0:
-                db.commit()
+        header_row = next(ws.iter_rows(max_row=1, values_only=True), None)
+        if not header_row:
+            return {"inserted": 0, "updated": 0, "skipped": 0, "errors": ["Excel is empty (no header row)."]}
 
-        except Exception as e:
-            db.rollback()
-            errors.append(f"Row {i}: {e}")
+        headers = [str(h).strip().lower() if h is not None else "" for h in header_row]
 
-        if progress_cb:
-            pct = int((i / total) * 100)
-            progress_cb(
-                pct,
-                f"Importing {i}/{total}... Inserted: {inserted} Updated: {updated} Skipped: {skipped}"
-            )
+        # Expected headers (recommended):
+        # sku, name, category, unit_primary, unit_secondary, sqft_per_unit, material, thickness, finish
 
-    try:
-        db.commit()
-    except Exception:
-        db.rollback()
+        # sheet dimension from the file (may include trailing empty rows => progress is an estimate)
+        total = max(0, (ws.max_row or 0) - 1)
 
-    if progress_cb:
-        progress_cb(100, "Done ✅")
+        result = _import_rows(
+            db,
+            _xlsx_rows(ws, headers),
+            total,
+            mode=mode,
+            batch_size=batch_size,
+            progress_cb=progress_cb,
+            stop_flag=stop_flag,
+            workers=workers
+        )
+    finally:
+        wb.close()  # read_only keeps the file handle open
 
-    return {"inserted": inserted, "updated": updated, "skipped": skipped, "errors": errors}
+    if not (result["inserted"] or result["updated"] or result["skipped"] or result["errors"]):
+        result["errors"].append("Excel has no data rows.")
+    return result
 
 
 def import_items_file(
@@ -262,23 +461,46 @@ def import_items_file(
     mode="upsert",
     batch_size=500,
     progress_cb=None,
-    stop_flag=None
+    stop_flag=None,
+    workers=None
 ):
+    """
+    mode:
+    - "upsert": chunked INSERT ... ON CONFLICT, commit per chunk, per-row errors
+    - "copy":   Postgres COPY into staging + one merge (fastest, all-or-nothing);
+                if COPY/merge fails the file is re-imported with "upsert" to pinpoint bad rows
+    - "dry_run": read the file + ONE catalog query, write nothing; returns the change set
+                (result["changes"]) so the user can preview before importing for real
+    Every mode skips rows identical to the catalog (counted in result["unchanged"]).
+    Result shape is the same for every mode: {inserted, updated, skipped, errors}
+
+    workers > 1 => rows are parsed/validated in a process pool, one thread writes.
+    """
     ext = os.path.splitext(file_path.lower())[1]
     if ext == ".csv":
-        return import_items_csv(
+        import_fn = import_items_csv
+    elif ext == ".xlsx":
+        import_fn = import_items_xlsx
+    else:
+        raise ValueError("Unsupported file type. Please choose .csv or .xlsx")
+
+    try:
+        return import_fn(
             db, file_path,
             mode=mode,
             batch_size=batch_size,
             progress_cb=progress_cb,
-            stop_flag=stop_flag
+            stop_flag=stop_flag,
+            workers=workers
         )
-    if ext == ".xlsx":
-        return import_items_xlsx(
+    except CopyImportFailed as e:
+        result = import_fn(
             db, file_path,
-            mode=mode,
+            mode="upsert",
             batch_size=batch_size,
             progress_cb=progress_cb,
-            stop_flag=stop_flag
+            stop_flag=stop_flag,
+            workers=workers
         )
-    raise ValueError("Unsupported file type. Please choose .csv or .xlsx")
+        result["errors"].insert(0, f"Fast (COPY) import failed, imported row by row instead: {e}")
+        return result
@@ -0,0 +1,311 @@
+# src/db/index_advisor.py
+import json
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event, func, inspect, insert, select, text
+from sqlalchemy.orm import Session
+
+from src.db.database import Base, engine
+from src.db.models import Item, Location, StockLedger
+from src.db.ledger_repo import (
+    list_ledger, ledger_cursor, get_stock_balance, get_stock_balances, compute_ledger_balances,
+)
+from src.db.adjustments_repo import list_adjustments
+from src.db.dashboard_repo import get_dashboard_totals, get_low_stock_top_items
+from src.db.reports_repo import location_stock_summary, location_stock_by_item
+from src.db.item_repo import search_items
+
+
+PAGE = 200
+BIG_TABLE_ROWS = 10_000  # full scans of smaller tables are not worth an index
+SEED_BATCH = 5_000
+
+# (movement_type, ref_type) for synthetic ledger rows
+_SEED_MOVES = [
+    ("PURCHASE", "purchase"), ("SALE", "sale"), ("SALE", "sale"), ("SALE_RETURN", "sale_return"),
+    ("PURCHASE_RETURN", "purchase_return"), ("ADJUST_IN", "adjustment"), ("ADJUST_OUT", "adjustment"),
+]
+
+
+def _arg(argv, name, default):
+    if name in argv:
+        try:
+            return int(argv[argv.index(name) + 1])
+        except Exception:
+            pass
+    return default
+
+
+# ---------------------------------------------------------
+# Query shapes = the repo calls the pages make
+# ---------------------------------------------------------
+def _shapes(sample):
+    item_id, location_id = sample["item_id"], sample["location_id"]
+    today = date.today()
+
+    def next_page(db):
+        first = list_ledger(db, limit=PAGE)
+        return list_ledger(db, limit=PAGE, after=ledger_cursor(first[-1])) if first else []
+
+    return [
+        ("ledger: first page", lambda db: list_ledger(db, limit=PAGE)),
+        ("ledger: next page (keyset)", next_page),
+        ("ledger: movement type SALE", lambda db: list_ledger(db, limit=PAGE, movement_type="SALE")),
+        ("ledger: one item", lambda db: list_ledger(db, limit=PAGE, item_id=item_id)),
+        ("ledger: location, last 30 days", lambda db: list_ledger(
+            db, limit=PAGE, location_id=location_id, date_from=today - timedelta(days=30), date_to=today)),
+        ("ledger: text search", lambda db: list_ledger(db, "sale", limit=PAGE)),
+        ("adjustments list", lambda db: list_adjustments(db)),
+        ("balance: item @ location", lambda db: get_stock_balance(db, item_id, location_id)),
+        ("balance: document batch", lambda db: get_stock_balances(db, [item_id], location_id)),
+        ("balance: recompute from ledger (all rows)", compute_ledger_balances),
+        ("dashboard totals", get_dashboard_totals),
+        ("dashboard low stock", lambda db: get_low_stock_top_items(db, limit=5)),
+        ("stock report: summary", location_stock_summary),
+        ("stock report: by item", lambda db: location_stock_by_item(db, location_id=location_id)),
+        ("item search", lambda db: search_items(db, "mar", limit=PAGE)),
+    ]
+
+
+# ---------------------------------------------------------
+# Seeding (inside the advisor's transaction => rolled back)
+# ---------------------------------------------------------
+def _seed_ledger(conn, rows: int) -> int:
+    item_ids = [r[0] for r in conn.execute(select(Item.id).where(Item.is_active == True).limit(2000))]
+    loc_ids = [r[0] for r in conn.execute(select(Location.id).where(Location.is_active == True))]
+    if not item_ids or not loc_ids:
+        print("  (seed skipped: needs at least one item and one location)")
+        return 0
+
+    rnd = random.Random(7)
+    now = datetime.now(timezone.utc)
+    done = 0
+    while done < rows:
+        batch = []
+        for _ in range(min(SEED_BATCH, rows - done)):
+            move, ref_type = rnd.choice(_SEED_MOVES)
+            sign = -1 if move in ("SALE", "PURCHASE_RETURN", "ADJUST_OUT") else 1
+            batch.append({
+                "item_id": rnd.choice(item_ids),
+                "location_id": rnd.choice(loc_ids),
+                "movement_type": move,
+                "qty_primary": sign * rnd.randint(1, 400),
+                "qty_secondary": sign * rnd.randint(0, 10),
+                "ref_type": ref_type,
+                "ref_id": rnd.randint(1, rows // 3 + 1),
+                "created_at": now - timedelta(seconds=rnd.randint(0, 730 * 86400)),
+            })
+        conn.execute(insert(StockLedger), batch)
+        done += len(batch)
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ANALYZE stock_ledger"))  # transactional: rolled back with the rows
+    else:
+        conn.execute(text("ANALYZE"))
+    return done
+
+
+# ---------------------------------------------------------
+# Plans
+# ---------------------------------------------------------
+def _table_rows(conn) -> dict:
+    out = {}
+    for t in inspect(conn).get_table_names():
+        if conn.dialect.name == "postgresql":
+            n = conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = :t"), {"t": t}).scalar()
+        else:
+            n = conn.execute(text(f'SELECT COUNT(*) FROM "{t}"')).scalar()
+        out[t] = int(n or 0)
+    return out
+
+
+def _pg_plan(conn, statement, params):
+    raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, params).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+    nodes = []
+
+    def walk(n):
+        nodes.append(n)
+        for child in n.get("Plans", []):
+            walk(child)
+
+    walk(plan)
+    # Bitmap Index Scan nodes carry the index but not the table (that's on the Heap Scan above)
+    scans = [
+        (n["Node Type"], n.get("Relation Name"), n.get("Index Name"))
+        for n in nodes if n.get("Relation Name") or n.get("Index Name")
+    ]
+    lines = [
+        f"{n['Node Type']}" + (f" on {n['Relation Name']}" if n.get("Relation Name") else "")
+        + (f" using {n['Index Name']}" if n.get("Index Name") else "")
+        + f"  (rows≈{n.get('Plan Rows')})"
+        for n in nodes
+    ]
+    return float(plan.get("Total Cost") or 0), scans, lines
+
+
+def _sqlite_plan(conn, statement, params):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).fetchall()
+    scans = []
+    lines = []
+    for r in rows:
+        detail = str(r[-1])
+        lines.append(detail)
+        words = detail.split()
+        if not words or words[0] not in ("SCAN", "SEARCH") or len(words) < 2:
+            continue
+        table = words[1]
+        used = detail.split(" USING ", 1)[1] if " USING " in detail else ""
+        if used.startswith("AUTOMATIC"):
+            # SQLite builds a temp index for this query only => a real one is missing
+            scans.append(("Seq Scan", table, None))
+        elif "INDEX " in used:
+            scans.append(("Index Scan", table, used.split("INDEX ", 1)[1].split()[0]))
+        elif used.startswith("INTEGER PRIMARY KEY"):
+            scans.append(("Index Scan", table, "pk"))
+        else:
+            scans.append(("Seq Scan" if words[0] == "SCAN" else "Index Scan", table, None))
+    return None, scans, lines
+
+
+def _table_of(name, sizes) -> str:
+    """SQLAlchemy aliases (items_1) -> table name."""
+    if name in sizes:
+        return name
+    base = re.sub(r"_\d+$", "", name or "")
+    return base if base in sizes else name
+
+
+def _missing_declared_indexes(conn) -> list[str]:
+    insp = inspect(conn)
+    existing_tables = set(insp.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        have = {i["name"] for i in insp.get_indexes(table.name)}
+        for idx in table.indexes:
+            if idx.name not in have:
+                missing.append(f"{table.name}.{idx.name}")
+    return missing
+
+
+# ---------------------------------------------------------
+# Main
+# ---------------------------------------------------------
+def main(argv=None):
+    """
+    python -m src.db.index_advisor                  -> replay against the current data
+    python -m src.db.index_advisor --seed 200000    -> + 200k synthetic ledger rows (rolled back)
+    python -m src.db.index_advisor --verbose        -> print every plan line
+
+    Replays the query shapes the app really runs (ledger page + filters, balances, dashboard,
+    stock report, item search) and prints time + plan per statement. Full scans of big tables
+    are flagged. Everything runs in ONE transaction that is rolled back: nothing is written.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    seed = _arg(argv, "--seed", 0)
+    verbose = "--verbose" in argv
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            dialect = conn.dialect.name
+            print(f"Index advisor ({dialect})")
+
+            missing = _missing_declared_indexes(conn)
+            if missing:
+                print("\nDeclared in models but missing in this DB (run: python -m src.db.migrations):")
+                for m in missing:
+                    print(f"  - {m}")
+            else:
+                print("\nAll indexes declared in models exist ✅")
+
+            if seed:
+                t0 = time.perf_counter()
+                n = _seed_ledger(conn, seed)
+                print(f"\nSeeded {n} ledger rows in {time.perf_counter() - t0:.1f}s (rolled back at the end)")
+
+            sizes = _table_rows(conn)
+            sample = conn.execute(
+                select(StockLedger.item_id, StockLedger.location_id).order_by(StockLedger.id.desc()).limit(1)
+            ).first()
+            if sample is None:
+                sample = (
+                    conn.execute(select(func.min(Item.id))).scalar(),
+                    conn.execute(select(func.min(Location.id))).scalar(),
+                )
+            sample = {"item_id": sample[0], "location_id": sample[1]}
+            print(f"stock_ledger rows: {sizes.get('stock_ledger', 0)}   sample item={sample['item_id']} "
+                  f"location={sample['location_id']}")
+
+            captured = []
+            capturing = [False]
+
+            def _capture(_conn, _cursor, statement, parameters, _context, executemany):
+                if capturing[0] and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                    captured.append((statement, parameters))
+
+            event.listen(conn, "before_cursor_execute", _capture)
+            db = Session(bind=conn, autoflush=False, join_transaction_mode="create_savepoint")
+
+            flagged = []
+            for name, fn in _shapes(sample):
+                captured.clear()
+                capturing[0] = True
+                t0 = time.perf_counter()
+                try:
+                    fn(db)
+                except Exception as e:
+                    capturing[0] = False
+                    print(f"\n■ {name}: failed ({e})")
+                    continue
+                ms = (time.perf_counter() - t0) * 1000
+                capturing[0] = False
+
+                print(f"\n■ {name}  {ms:.1f} ms, {len(captured)} statement(s)")
+                for statement, params in list(captured):
+                    if dialect == "postgresql":
+                        cost, scans, lines = _pg_plan(conn, statement, params)
+                    else:
+                        cost, scans, lines = _sqlite_plan(conn, statement, params)
+
+                    scans = [(kind, _table_of(t, sizes), i) for kind, t, i in scans]
+                    used = sorted({i for _, _, i in scans if i})
+                    full = sorted({t for kind, t, _ in scans if kind == "Seq Scan" and sizes.get(t, 0) >= BIG_TABLE_ROWS})
+                    head = " ".join(statement.split())[:90]
+                    print(f"  {head}...")
+                    print(
+                        (f"    cost={cost:.0f}  " if cost is not None else "    ")
+                        + f"indexes: {', '.join(used) or '-'}"
+                        + (f"   ⚠ full scan: {', '.join(full)}" if full else "")
+                    )
+                    if verbose:
+                        for line in lines:
+                            print(f"      {line}")
+                    for t in full:
+                        flagged.append((name, t))
+
+            db.close()
+            event.remove(conn, "before_cursor_execute", _capture)
+
+            print()
+            if flagged:
+                print("Full scans on big tables (candidates for an index):")
+                for name, t in flagged:
+                    print(f"  - {t:<16} <- {name}")
+            else:
+                print("No full scans of big tables ✅")
+
+            return 1 if missing else 0
+        finally:
+            trans.rollback()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
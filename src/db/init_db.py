@@ -2,12 +2,16 @@
 from src.db.database import Base, engine, SessionLocal
 import src.db.models  # loads all models into Base metadata
 
-from src.db.models import Location
+from src.db.models import Location, StockBalance, StockLedger, ReorderThreshold
+from src.db.ledger_repo import rebuild_stock_balances
+from src.db.dashboard_repo import DEFAULT_THRESHOLDS
+from src.db.migrations import run_migrations
 
 
 def init():
-    # 1) Create all tables from models
+    # 1) Create all tables from models, then bring older tables up to date
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
     # 2) Seed default locations (safe)
     db = SessionLocal()
@@ -16,7 +20,16 @@ def init():
             exists = db.query(Location).filter(Location.name == name).first()
             if not exists:
                 db.add(Location(name=name, is_active=True))
+
+        # 3) Seed per-category reorder thresholds (editable later; existing rows kept)
+        for cat, (low, crit) in DEFAULT_THRESHOLDS.items():
+            if db.query(ReorderThreshold).get(cat) is None:
+                db.add(ReorderThreshold(category=cat, low_level=low, critical_level=crit))
         db.commit()
+
+        # 4) Backfill stock_balance for databases that already have ledger history
+        if db.query(StockBalance.id).first() is None and db.query(StockLedger.id).first() is not None:
+            rebuild_stock_balances(db)
     finally:
         db.close()
 
@@ -0,0 +1,91 @@
+# src/db/inventory_repo.py
+from sqlalchemy import insert
+
+from src.db.models import SlabInventory, TileInventory, BlockInventory, TableInventory
+
+
+def _to_float(v):
+    try:
+        return float(v or 0)
+    except Exception:
+        return 0.0
+
+
+def _to_int(v):
+    try:
+        return int(v or 0)
+    except Exception:
+        return 0
+
+
+def inventory_row(
+    category: str,
+    item_id: int,
+    location_id: int | None,
+    qty_primary,
+    qty_secondary,
+    notes: str | None,
+    sign: int = 1,
+):
+    """
+    Stages the inventory row for one document line as (Model, values).
+    Nothing is added to the session; pass the staged rows to bulk_insert().
+
+    sign=+1 adds stock, sign=-1 deducts stock
+    - SLAB/TILE: slab_count/box_count = qty_secondary, total_sqft = qty_primary
+    - BLOCK/TABLE: piece_count = qty_primary
+    Returns None for unknown categories.
+    """
+    cat = (category or "").upper()
+    sign = -1 if sign < 0 else 1
+
+    if cat == "SLAB":
+        return SlabInventory, {
+            "item_id": item_id,
+            "slab_count": sign * _to_int(qty_secondary),
+            "total_sqft": sign * _to_float(qty_primary),
+            "location_id": location_id,
+            "notes": notes,
+        }
+    if cat == "TILE":
+        return TileInventory, {
+            "item_id": item_id,
+            "box_count": sign * _to_int(qty_secondary),
+            "total_sqft": sign * _to_float(qty_primary),
+            "location_id": location_id,
+            "notes": notes,
+        }
+    if cat == "BLOCK":
+        return BlockInventory, {
+            "item_id": item_id,
+            "piece_count": sign * _to_int(_to_float(qty_primary)),
+            "location_id": location_id,
+            "notes": notes,
+        }
+    if cat == "TABLE":
+        return TableInventory, {
+            "item_id": item_id,
+            "piece_count": sign * _to_int(_to_float(qty_primary)),
+            "location_id": location_id,
+            "notes": notes,
+        }
+    return None
+
+
+def bulk_insert(db, staged: list):
+    """
+    Unit-of-work write for one document:
+    staged = [(Model, values_dict), ...]  (document lines + inventory rows)
+
+    One executemany INSERT per table, no per-row flush/refresh.
+    Does NOT commit; the document function commits once at the end.
+    """
+    by_model = {}
+    for row in staged:
+        if not row:
+            continue
+        model, values = row
+        by_model.setdefault(model, []).append(values)
+
+    for model, values in by_model.items():
+        db.execute(insert(model), values)
@@ -0,0 +1,68 @@
+# src/db/inventory_view.py
+"""
+The four inventory tables (slab / tile / block / table) as ONE selectable:
+
+    inv = inventory_union()                     # all kinds
+    inv = inventory_union(kinds=("SLAB",))      # only the branches you need
+    db.query(inv.c.location_id, func.sum(inv.c.qty_primary)).group_by(inv.c.location_id)
+
+Columns (active rows only):
+    kind           'SLAB' | 'TILE' | 'BLOCK' | 'TABLE'
+    item_id, location_id
+    qty_primary    SLAB/TILE: total_sqft      BLOCK/TABLE: piece_count
+    qty_secondary  SLAB: slab_count  TILE: box_count   BLOCK/TABLE: NULL
+
+Same primary/secondary meaning as the ledger (see inventory_repo.inventory_row).
+It's a UNION ALL subquery, not a DB view => no migration, and branches that can't match are
+left out of the SQL entirely.
+"""
+from sqlalchemy import literal, null, select, union_all, Integer, Numeric
+
+from src.db.models import SlabInventory, TileInventory, BlockInventory, TableInventory
+
+KINDS = ("SLAB", "TILE", "BLOCK", "TABLE")
+
+# kind -> (primary unit, secondary unit)
+UNITS = {
+    "SLAB": ("sqft", "slab"),
+    "TILE": ("sqft", "box"),
+    "BLOCK": ("piece", None),
+    "TABLE": ("piece", None),
+}
+
+
+def _branch(kind, model, primary, secondary, location_id):
+    q = select(
+        literal(kind).label("kind"),
+        model.item_id.label("item_id"),
+        model.location_id.label("location_id"),
+        primary.label("qty_primary"),
+        (secondary if secondary is not None else null().cast(Integer)).label("qty_secondary"),
+    ).where(model.is_active == True)
+
+    # filter inside every branch => each one can use its own table's indexes
+    if location_id is not None:
+        q = q.where(model.location_id == location_id)
+    return q
+
+
+def inventory_union(kinds=KINDS, location_id=None):
+    """UNION ALL of the active inventory rows of `kinds` (optionally one location) as a subquery."""
+    wanted = {(k or "").upper() for k in kinds}
+    kinds = [k for k in KINDS if k in wanted]
+    if not kinds:
+        raise ValueError("inventory_union needs at least one of: " + ", ".join(KINDS))
+
+    branches = {
+        "SLAB": lambda: _branch(
+            "SLAB", SlabInventory, SlabInventory.total_sqft, SlabInventory.slab_count, location_id),
+        "TILE": lambda: _branch(
+            "TILE", TileInventory, TileInventory.total_sqft, TileInventory.box_count, location_id),
+        "BLOCK": lambda: _branch(
+            "BLOCK", BlockInventory, BlockInventory.piece_count.cast(Numeric(12, 3)), None, location_id),
+        "TABLE": lambda: _branch(
+            "TABLE", TableInventory, TableInventory.piece_count.cast(Numeric(12, 3)), None, location_id),
+    }
+    parts = [branches[k]() for k in kinds]
+    q = parts[0] if len(parts) == 1 else union_all(*parts)
+    return q.subquery("inventory")
@@ -1,12 +1,19 @@
 # src/db/item_repo.py
-from sqlalchemy import or_
+import csv
+import io
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from src.db.models import Item
+from src.db import item_search
 
 
 ALLOWED_FIELDS = {
     "sku", "name", "category",
     "unit_primary", "unit_secondary", "sqft_per_unit",
     "material", "thickness", "finish",
+    "reorder_level",
 }
 
 
@@ -22,24 +29,35 @@ def get_items(db, category=None):
     return q.order_by(Item.id.desc()).all()
 
 
-def search_items(db, q_text="", category=None):
+def search_items(db, q_text="", category=None, limit: int | None = None, offset: int = 0):
+    """
+    Active items. No text => newest first. With text => ranked: exact SKU, SKU prefix,
+    name/attribute word prefix, then substring (see item_search).
+    Postgres ranks in SQL (trigram index); other databases use the in-process index.
+    """
+    q_text = (q_text or "").strip()
+
+    if q_text and db.get_bind().dialect.name != "postgresql":
+        ids = item_search.get_index(db).search(q_text, category, limit=(offset + limit) if limit else 10**9)
+        ids = ids[offset:] if limit else ids
+        by_id = get_items_by_ids(db, ids)
+        return [by_id[i] for i in ids if i in by_id]
+
     q = db.query(Item).filter(Item.is_active == True)
 
     if category and category != "ALL":
         q = q.filter(Item.category == category)
 
     if q_text:
-        like = f"%{q_text}%"
-        # ✅ search in new fields too
-        q = q.filter(or_(
-            Item.sku.ilike(like),
-            Item.name.ilike(like),
-            Item.material.ilike(like),
-            Item.thickness.ilike(like),
-            Item.finish.ilike(like),
-        ))
+        # ✅ sku/name/material/thickness/finish, via the trigram-indexed search text
+        q = q.filter(item_search.item_match(q_text))
+        q = q.order_by(item_search.rank_expr(q_text), Item.id.desc())
+    else:
+        q = q.order_by(Item.id.desc())
 
-    return q.order_by(Item.id.desc()).all()
+    if limit:
+        q = q.offset(offset).limit(limit)  # page for the lazy table
+    return q.all()
 
 
 def create_item(db, data):
@@ -54,6 +72,7 @@ def create_item(db, data):
     item = Item(**data)
     db.add(item)
     db.commit()
+    item_search.invalidate()
     db.refresh(item)
     return item
 
@@ -62,6 +81,24 @@ def get_item(db, item_id: int):
     return db.query(Item).get(item_id)
 
 
+def get_items_by_ids(db, item_ids) -> dict:
+    """
+    Batch loader for document posting: ONE `WHERE id IN (...)` query.
+    Returns {item_id: Item}; missing ids are simply absent.
+    """
+    ids = set()
+    for i in item_ids or []:
+        try:
+            ids.add(int(i))
+        except Exception:
+            continue
+
+    if not ids:
+        return {}
+
+    return {it.id: it for it in db.query(Item).filter(Item.id.in_(ids)).all()}
+
+
 def update_item(db, item_id: int, data: dict):
     item = db.query(Item).get(item_id)
     if not item:
@@ -79,6 +116,7 @@ def update_item(db, item_id: int, data: dict):
         setattr(item, k, v)
 
     db.commit()
+    item_search.invalidate()
     db.refresh(item)
     return item
 
@@ -88,6 +126,7 @@ def soft_delete_item(db, item_id: int):
     if item:
         item.is_active = False
         db.commit()
+        item_search.invalidate()
         return True
     return False
 
@@ -111,8 +150,9 @@ def upsert_by_sku(db, data: dict):
     if data.get("category"):
         data["category"] = data["category"].strip().upper()
 
-    # ✅ case-insensitive match (fixes BLK-005 vs blk-005 issues)
-    item = db.query(Item).filter(Item.sku.ilike(sku)).first()
+    # ✅ case-insensitive via normalisation: SKUs are stored upper-cased (fixes BLK-005 vs blk-005),
+    # so plain equality works and uses the unique index (ilike can't)
+    item = db.query(Item).filter(Item.sku == sku).first()
 
     if item:
         for k, v in data.items():
@@ -125,3 +165,145 @@ def upsert_by_sku(db, data: dict):
     item.is_active = True
     db.add(item)
     return "inserted"
+
+
+def _upsert_insert_fn(db):
+    """INSERT ... ON CONFLICT builder for the current dialect (None => generic fallback)."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return pg_insert
+    if name == "sqlite":
+        return sqlite_insert
+    return None
+
+
+def get_catalog_index(db, fields) -> dict:
+    """
+    Whole catalog in ONE query (streamed), for import diffing:
+    {sku: (values of `fields` in order..., is_active)}
+    """
+    cols = [getattr(Item, f) for f in fields]
+    q = db.query(Item.sku, *cols, Item.is_active).yield_per(5000)
+    return {r[0]: tuple(r[1:]) for r in q}
+
+
+def bulk_upsert_by_sku(db, rows: list[dict], existing=None) -> tuple[int, int]:
+    """
+    Chunk version of upsert_by_sku (importer).
+    rows: cleaned dicts with unique, upper-cased SKUs (same keys in every row).
+    Returns (inserted, updated). NOTE: no commit here.
+
+    - existing SKUs of the chunk are prefetched in ONE query (for the counts),
+      unless the caller already has them (existing = set/dict of SKUs)
+    - Postgres/SQLite: one INSERT ... ON CONFLICT (sku) DO UPDATE executemany
+    - other dialects: one SELECT for the chunk + setattr/add_all
+    """
+    if not rows:
+        return 0, 0
+
+    data = []
+    for r in rows:
+        d = _filtered(r)
+        d["sku"] = (d.get("sku") or "").strip().upper()
+        if not d["sku"]:
+            raise ValueError("SKU is required for upsert")
+        if d.get("category"):
+            d["category"] = d["category"].strip().upper()
+        d["is_active"] = True
+        data.append(d)
+
+    skus = [d["sku"] for d in data]
+    if existing is None:
+        existing = {sku for (sku,) in db.query(Item.sku).filter(Item.sku.in_(skus)).all()}
+    updated = sum(1 for sku in skus if sku in existing)
+    inserted = len(skus) - updated
+
+    insert_fn = _upsert_insert_fn(db)
+    if insert_fn is not None:
+        stmt = insert_fn(Item.__table__)
+        cols = [k for k in data[0].keys() if k != "sku"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sku"],
+            set_={k: getattr(stmt.excluded, k) for k in cols},
+        )
+        db.execute(stmt, data)
+        return inserted, updated
+
+    by_sku = {it.sku: it for it in db.query(Item).filter(Item.sku.in_(skus)).all()}
+    new_items = []
+    for d in data:
+        item = by_sku.get(d["sku"])
+        if item:
+            for k, v in d.items():
+                setattr(item, k, v)
+        else:
+            new_items.append(Item(**d))
+    db.add_all(new_items)
+    db.flush()
+    return inserted, updated
+
+
+# ---------------------------------------------------------
+# COPY fast-path (Postgres + psycopg2 only) — branch onboarding imports
+# ---------------------------------------------------------
+COPY_COLUMNS = (
+    "sku", "name", "category",
+    "unit_primary", "unit_secondary", "sqft_per_unit",
+    "material", "thickness", "finish",
+)
+
+
+def supports_copy(db) -> bool:
+    bind = db.get_bind()
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+
+def copy_stage_items(db, rows: list[dict]):
+    """
+    COPY FROM STDIN the rows into temp table _items_import (same transaction, no commit).
+    The temp table is created on first call and dropped at commit/rollback.
+    rows: cleaned dicts with unique upper-cased SKUs.
+    """
+    if not rows:
+        return
+
+    raw = db.connection().connection  # psycopg2 connection of the session's transaction
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    for r in rows:
+        # None => empty unquoted field => NULL in COPY csv
+        w.writerow([r.get(c) for c in COPY_COLUMNS])
+    buf.seek(0)
+
+    with raw.cursor() as cur:
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _items_import ("
+            " sku VARCHAR(50), name VARCHAR(200), category VARCHAR(20),"
+            " unit_primary VARCHAR(20), unit_secondary VARCHAR(20), sqft_per_unit NUMERIC(10, 3),"
+            " material VARCHAR(50), thickness VARCHAR(20), finish VARCHAR(30)"
+            ") ON COMMIT DROP"
+        )
+        cur.copy_expert(
+            f"COPY _items_import ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+
+
+def merge_staged_items(db) -> tuple[int, int]:
+    """
+    One set-based UPSERT from _items_import into items (no commit).
+    xmax = 0 on the RETURNING row => freshly inserted, else updated.
+    Returns (inserted, updated).
+    """
+    cols = ", ".join(COPY_COLUMNS)
+    sets = ", ".join(f"{c} = EXCLUDED.{c}" for c in COPY_COLUMNS if c != "sku")
+    row = db.execute(text(
+        "WITH merged AS ("
+        f" INSERT INTO items ({cols}, is_active)"
+        f" SELECT {cols}, TRUE FROM _items_import"
+        f" ON CONFLICT (sku) DO UPDATE SET {sets}, is_active = TRUE"
+        " RETURNING (xmax = 0) AS inserted"
+        ")"
+        " SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM merged"
+    )).one()
+    return int(row[0] or 0), int(row[1] or 0)
@@ -0,0 +1,221 @@
+# src/db/item_search.py
+"""
+Item search (SKU / name / material / thickness / finish).
+
+Ranking (both backends):  0 exact SKU  >  1 SKU prefix  >  2 word prefix (name/attributes)
+                          >  3 substring anywhere; ties => newest item first
+
+- Postgres: ONE ranked query. `item_match()` is a LIKE on a single lower-cased search text
+  expression that has a pg_trgm GIN index (migration 4), so '%q%' is an index scan
+  instead of a seq scan; SKU/name prefix tiers use text_pattern_ops b-tree indexes.
+- SQLite / offline: ItemSearchIndex, an in-process tokenized index (sorted SKUs + sorted
+  word tokens, bisect for prefixes). Built once, rebuilt after item writes (invalidate())
+  or when the items table fingerprint (count, max id) changes.
+"""
+import bisect
+import re
+import threading
+import time
+
+from sqlalchemy import case, func, inspect, literal, text
+
+from src.db.models import Item
+
+SEARCH_FIELDS = ("sku", "name", "material", "thickness", "finish")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_text_expr():
+    """lower(sku || ' ' || name || ' ' || material ...). Must match the GIN index expression."""
+    expr = None
+    for f in SEARCH_FIELDS:
+        part = func.coalesce(getattr(Item, f), "")
+        expr = part if expr is None else expr.op("||")(literal(" ")).op("||")(part)
+    return func.lower(expr)
+
+
+def item_match(q_text: str):
+    """WHERE clause: q anywhere in the item's search text (case-insensitive, wildcards escaped)."""
+    like = f"%{escape_like(q_text.strip().lower())}%"
+    return search_text_expr().like(like, escape="\\")
+
+
+def rank_expr(q_text: str):
+    q = q_text.strip()
+    sku_prefix = escape_like(q.upper()) + "%"
+    word_prefix = escape_like(q.lower()) + "%"
+    return case(
+        (Item.sku == q.upper(), 0),
+        (Item.sku.like(sku_prefix, escape="\\"), 1),
+        (func.lower(Item.name).like(word_prefix, escape="\\"), 2),
+        else_=3,
+    )
+
+
+# ---------------------------------------------------------
+# Postgres indexes (migration 4)
+# ---------------------------------------------------------
+_TRGM_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS ix_items_search_trgm ON items USING gin ("
+    "lower(coalesce(sku, '') || ' ' || coalesce(name, '') || ' ' || coalesce(material, '') || ' ' "
+    "|| coalesce(thickness, '') || ' ' || coalesce(finish, '')) gin_trgm_ops)"
+)
+
+
+def ensure_search_indexes(conn) -> str | None:
+    """
+    Postgres only. pg_trgm needs CREATE privilege on the database (it ships with Postgres);
+    if the extension can't be created the prefix indexes are still added and search
+    falls back to a seq scan for substrings — it still works, only slower.
+    Returns None when everything was created, else a short note saying why trigram wasn't
+    (the caller records / shows it; this runs at GUI startup, no console there).
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+    if "items" not in inspect(conn).get_table_names():
+        return None
+
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_items_sku_prefix ON items (sku varchar_pattern_ops)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_items_name_prefix ON items (lower(name) varchar_pattern_ops)"))
+
+    sp = conn.begin_nested()
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(_TRGM_INDEX_SQL))
+        sp.commit()
+    except Exception as e:
+        sp.rollback()
+        reason = str(getattr(e, "orig", None) or e).strip().splitlines()[0]
+        return f"pg_trgm not available, substring search unindexed: {reason}"
+    return None
+
+
+# ---------------------------------------------------------
+# In-process index (SQLite / offline)
+# ---------------------------------------------------------
+class ItemSearchIndex:
+    """
+    rows: iterable of (id, sku, name, category, material, thickness, finish), active items only.
+    search() returns item ids, best first.
+    """
+    def __init__(self, rows):
+        self._sku = {}        # "SKU" -> id
+        self._skus = []       # sorted [(sku, -id)]  (-id => newest first inside a prefix)
+        self._tokens = []     # sorted [(token, -id)]
+        self._text = {}       # id -> lower search text (substring tier)
+        self._category = {}   # id -> category
+
+        for item_id, sku, name, category, *attrs in rows:
+            sku = (sku or "").upper()
+            self._sku[sku] = item_id
+            self._skus.append((sku, -item_id))
+            self._category[item_id] = (category or "").upper()
+
+            words = " ".join(v or "" for v in (name, *attrs)).lower()
+            for tok in set(_TOKEN_RE.findall(words)):
+                self._tokens.append((tok, -item_id))
+            self._text[item_id] = f"{sku.lower()} {words}"
+
+        self._skus.sort()
+        self._tokens.sort()
+        self._newest_first = sorted(self._text, reverse=True)
+
+    def __len__(self):
+        return len(self._text)
+
+    @staticmethod
+    def _prefix(sorted_pairs, prefix):
+        i = bisect.bisect_left(sorted_pairs, (prefix,))
+        while i < len(sorted_pairs) and sorted_pairs[i][0].startswith(prefix):
+            yield -sorted_pairs[i][1]
+            i += 1
+
+    def search(self, q_text: str, category: str | None = None, limit: int = 50) -> list[int]:
+        q = (q_text or "").strip()
+        if not q:
+            return []
+        cat = (category or "ALL").upper()
+
+        out = []
+        seen = set()
+
+        def take(ids):
+            for i in ids:
+                if i in seen or (cat != "ALL" and self._category.get(i) != cat):
+                    continue
+                seen.add(i)
+                out.append(i)
+                if len(out) >= limit:
+                    return True
+            return False
+
+        # 0 exact SKU, 1 SKU prefix
+        exact = self._sku.get(q.upper())
+        if take([exact] if exact is not None else []):
+            return out
+        if take(sorted(self._prefix(self._skus, q.upper()), reverse=True)):
+            return out
+
+        # 2 every query word is a prefix of some word of the item
+        words = _TOKEN_RE.findall(q.lower())
+        if words:
+            hits = None
+            for w in words:
+                ids = set(self._prefix(self._tokens, w))
+                hits = ids if hits is None else hits & ids
+                if not hits:
+                    break
+            if hits and take(sorted(hits, reverse=True)):
+                return out
+
+        # 3 substring anywhere (plain scan, only reached when the tiers above didn't fill the page)
+        ql = q.lower()
+        take(i for i in self._newest_first if ql in self._text[i])
+        return out
+
+
+# writes from this process call invalidate(); the fingerprint query (a count over items) only
+# has to catch changes made by OTHER tills, so it's not run on every keystroke
+FINGERPRINT_CHECK_S = 5.0
+
+_lock = threading.Lock()
+_index = None
+_fingerprint = None
+_checked_at = 0.0
+
+
+def invalidate():
+    """Item rows changed in this process => rebuild on next search."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def get_index(db) -> ItemSearchIndex:
+    """Shared in-process index (rebuilt when invalidated or when the items table changed)."""
+    global _index, _fingerprint, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _index is not None and now - _checked_at < FINGERPRINT_CHECK_S:
+            return _index
+
+    fp = tuple(db.query(func.count(Item.id), func.max(Item.id)).filter(Item.is_active == True).one())
+
+    with _lock:
+        _checked_at = now
+        if _index is not None and fp == _fingerprint:
+            return _index
+
+        rows = (
+            db.query(Item.id, Item.sku, Item.name, Item.category, Item.material, Item.thickness, Item.finish)
+            .filter(Item.is_active == True)
+            .yield_per(5000)
+        )
+        _index = ItemSearchIndex(rows)
+        _fingerprint = fp
+        return _index
@@ -1,8 +1,11 @@
 # src/db/ledger_repo.py
+import os
+from datetime import datetime, timedelta
+
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, literal, or_, select, tuple_, union_all
 
-from src.db.models import StockLedger
+from src.db.models import Item, StockLedger, StockBalance, StockSnapshot, StockSnapshotRow
 
 
 def add_ledger_entry(
@@ -16,7 +19,12 @@ def add_ledger_entry(
     unit_secondary: str | None,
     ref_type: str | None = None,
     ref_id: int | None = None,
+    allow_negative: bool = True,
 ):
+    """
+    allow_negative=False => outgoing moves (sale / purchase return / adjust out) may not
+    push the balance below zero; raises ValueError instead (see _apply_balance_delta).
+    """
     led = StockLedger(
         item_id=item_id,
         location_id=location_id,
@@ -29,24 +37,105 @@ def add_ledger_entry(
         ref_id=ref_id,
     )
     db.add(led)
+    _apply_balance_delta(db, item_id, location_id, qty_primary, qty_secondary, allow_negative=allow_negative)
     return led
 
 
-def get_stock_balance(db, item_id: int, location_id: int | None = None) -> tuple[float, int]:
+def _location_filter(col, location_id):
+    return col.is_(None) if location_id is None else col == location_id
+
+
+# float noise allowance for the non-negative guard (qty_primary is Numeric(…, 3))
+_NEG_EPS = 0.0005
+
+
+def _apply_balance_delta(
+    db,
+    item_id: int,
+    location_id: int | None,
+    qty_primary,
+    qty_secondary,
+    allow_negative: bool = True,
+):
+    """
+    Adds the ledger movement to stock_balance (same transaction, no commit).
+    UPDATE first (atomic increment); INSERT the row only the first time an item hits a location.
+
+    allow_negative=False adds `balance + delta >= 0` to the UPDATE itself, so two counters
+    racing for the last slab can't both win: the loser updates 0 rows and gets ValueError.
+    """
+    try:
+        d_pri = float(qty_primary or 0)
+    except Exception:
+        d_pri = 0.0
+
+    try:
+        d_sec = int(qty_secondary or 0)
+    except Exception:
+        d_sec = 0
+
+    q = db.query(StockBalance).filter(
+        StockBalance.item_id == item_id,
+        _location_filter(StockBalance.location_id, location_id),
+    )
+
+    guarded = not allow_negative and (d_pri < 0 or d_sec < 0)
+    if guarded:
+        q = q.filter(
+            StockBalance.qty_primary + d_pri >= -_NEG_EPS,
+            StockBalance.qty_secondary + d_sec >= 0,
+        )
+
+    updated = (
+        q.update(
+            {
+                StockBalance.qty_primary: StockBalance.qty_primary + d_pri,
+                StockBalance.qty_secondary: StockBalance.qty_secondary + d_sec,
+            },
+            synchronize_session=False,
+        )
+    )
+
+    if not updated and guarded:
+        raise ValueError(
+            "Insufficient stock (Location-wise)\n\n"
+            f"Item id={item_id}: stock changed while posting (another counter?). Please re-check and retry."
+        )
+
+    if not updated:
+        db.add(StockBalance(
+            item_id=item_id,
+            location_id=location_id,
+            qty_primary=d_pri,
+            qty_secondary=d_sec,
+        ))
+        # session runs with autoflush=False: flush now so the next line of the
+        # same document finds this row instead of inserting a duplicate
+        db.flush()
+
+
+def get_stock_balance(db, item_id: int, location_id: int | None = None, as_of=None) -> tuple[float, int]:
     """
     Returns (primary_balance, secondary_balance)
 
     - primary_balance: sum(qty_primary)  (sqft OR piece)
     - secondary_balance: sum(qty_secondary) (slab/box) ; NULL treated as 0
     - If location_id is None => balance across ALL locations
+    - as_of (datetime => up to and including it; plain date => end of that day):
+      historical balance = nearest stock snapshot + ledger rows since (see stock_as_of)
+
+    Reads the maintained stock_balance row(s), not the ledger history.
     """
+    if as_of is not None:
+        return get_stock_balances(db, [item_id], location_id, as_of=as_of).get(int(item_id), (0.0, 0))
+
     q = db.query(
-        func.coalesce(func.sum(StockLedger.qty_primary), 0),
-        func.coalesce(func.sum(StockLedger.qty_secondary), 0),
-    ).filter(StockLedger.item_id == item_id)
+        func.coalesce(func.sum(StockBalance.qty_primary), 0),
+        func.coalesce(func.sum(StockBalance.qty_secondary), 0),
+    ).filter(StockBalance.item_id == item_id)
 
     if location_id is not None:
-        q = q.filter(StockLedger.location_id == location_id)
+        q = q.filter(StockBalance.location_id == location_id)
 
     pri, sec = q.one()
 
@@ -63,13 +152,166 @@ def get_stock_balance(db, item_id: int, location_id: int | None = None) -> tuple
     return pri_val, sec_val
 
 
-def list_ledger(db, q_text: str = "", limit: int = 200):
+def get_stock_balances(db, item_ids, location_id: int | None = None, as_of=None) -> dict:
+    """
+    Batch version of get_stock_balance: ONE grouped query for all items of a document.
+    Returns {item_id: (primary_balance, secondary_balance)}; items with no stock => (0.0, 0).
+    """
+    ids = {int(i) for i in (item_ids or []) if i}
+    if not ids:
+        return {}
+
+    if as_of is not None:
+        out = {i: (0.0, 0) for i in ids}
+        for (item_id, _), (pri, sec) in stock_balances_as_of(db, as_of, ids, location_id).items():
+            p, s = out[item_id]
+            out[item_id] = (p + pri, s + sec)
+        return out
+
+    q = (
+        db.query(
+            StockBalance.item_id,
+            func.coalesce(func.sum(StockBalance.qty_primary), 0),
+            func.coalesce(func.sum(StockBalance.qty_secondary), 0),
+        )
+        .filter(StockBalance.item_id.in_(ids))
+        .group_by(StockBalance.item_id)
+    )
+
+    if location_id is not None:
+        q = q.filter(StockBalance.location_id == location_id)
+
+    out = {i: (0.0, 0) for i in ids}
+    for item_id, pri, sec in q.all():
+        out[item_id] = (float(pri or 0), int(sec or 0))
+    return out
+
+
+def compute_ledger_balances(db) -> dict:
+    """
+    Full recompute from stock_ledger (slow path, used by rebuild/verify only).
+    Returns {(item_id, location_id): (primary, secondary)}
+    """
+    rows = (
+        db.query(
+            StockLedger.item_id,
+            StockLedger.location_id,
+            func.coalesce(func.sum(StockLedger.qty_primary), 0),
+            func.coalesce(func.sum(StockLedger.qty_secondary), 0),
+        )
+        .group_by(StockLedger.item_id, StockLedger.location_id)
+        .all()
+    )
+    return {(r[0], r[1]): (float(r[2] or 0), int(r[3] or 0)) for r in rows}
+
+
+def verify_stock_balances(db, tolerance: float = 0.0005) -> list[dict]:
+    """
+    Compares stock_balance with a fresh SUM over stock_ledger.
+    Returns drift rows:
+    [{item_id, location_id, ledger_primary, ledger_secondary, balance_primary, balance_secondary}]
+    """
+    expected = compute_ledger_balances(db)
+
+    actual = {}
+    for b in db.query(StockBalance).all():
+        actual[(b.item_id, b.location_id)] = (float(b.qty_primary or 0), int(b.qty_secondary or 0))
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1] or 0)):
+        exp_pri, exp_sec = expected.get(key, (0.0, 0))
+        act_pri, act_sec = actual.get(key, (0.0, 0))
+        if abs(exp_pri - act_pri) > tolerance or exp_sec != act_sec:
+            drift.append({
+                "item_id": key[0],
+                "location_id": key[1],
+                "ledger_primary": exp_pri,
+                "ledger_secondary": exp_sec,
+                "balance_primary": act_pri,
+                "balance_secondary": act_sec,
+            })
+    return drift
+
+
+def rebuild_stock_balances(db) -> list[dict]:
+    """
+    Recomputes stock_balance from stock_ledger and commits.
+    Returns the drift that was found (same shape as verify_stock_balances) before fixing.
+    """
+    drift = verify_stock_balances(db)
+
+    db.query(StockBalance).delete(synchronize_session=False)
+    db.add_all([
+        StockBalance(item_id=item_id, location_id=location_id, qty_primary=pri, qty_secondary=sec)
+        for (item_id, location_id), (pri, sec) in compute_ledger_balances(db).items()
+    ])
+    db.commit()
+    return drift
+
+
+# Ledger filter choices -> stored movement types (adjustments are saved as *_IN / *_OUT)
+MOVEMENT_TYPE_GROUPS = {
+    "PURCHASE": ("PURCHASE",),
+    "SALE": ("SALE",),
+    "SALE_RETURN": ("SALE_RETURN",),
+    "PURCHASE_RETURN": ("PURCHASE_RETURN",),
+    "ADJUST": ("ADJUST_IN", "ADJUST_OUT"),
+    "DAMAGE": ("DAMAGE_OUT",),
+    "CORRECTION": ("CORRECTION_IN", "CORRECTION_OUT"),
+    "CANCEL": ("SALE_CANCEL", "SALE_RETURN_CANCEL", "PURCHASE_RETURN_CANCEL"),
+}
+
+
+def movement_types(movement_type) -> list[str]:
+    """'ADJUST' -> ['ADJUST_IN', 'ADJUST_OUT']; exact types / lists pass through; ALL/None -> []."""
+    if not movement_type:
+        return []
+    wanted = [movement_type] if isinstance(movement_type, str) else list(movement_type)
+    out = []
+    for t in wanted:
+        t = (t or "").strip().upper()
+        if t and t != "ALL":
+            out.extend(MOVEMENT_TYPE_GROUPS.get(t, (t,)))
+    return out
+
+
+def list_ledger(
+    db,
+    q_text: str = "",
+    limit: int = 200,
+    movement_type=None,
+    item_id: int | None = None,
+    location_id: int | None = None,
+    date_from=None,
+    date_to=None,
+    after: tuple | None = None,
+):
+    """
+    Newest first, filtered in SQL. Keyset paging: pass `after=ledger_cursor(last_row)`
+    to get the next (older) page — uses ix_stock_ledger_created_id, so page N costs
+    the same as page 1 (no OFFSET scan).
+    date_from/date_to are inclusive; a plain date for date_to means the whole day.
+    """
     q = (
         db.query(StockLedger)
         .options(joinedload(StockLedger.item), joinedload(StockLedger.location))
-        .order_by(StockLedger.id.desc())
     )
 
+    types = movement_types(movement_type)
+    if types:
+        q = q.filter(StockLedger.movement_type.in_(types))
+    if item_id:
+        q = q.filter(StockLedger.item_id == int(item_id))
+    if location_id:
+        q = q.filter(StockLedger.location_id == int(location_id))
+    if date_from:
+        q = q.filter(StockLedger.created_at >= _day_start(date_from))
+    if date_to:
+        if isinstance(date_to, datetime):
+            q = q.filter(StockLedger.created_at <= date_to)
+        else:
+            q = q.filter(StockLedger.created_at < _day_start(date_to) + timedelta(days=1))
+
     if q_text:
         like = f"%{q_text}%"
         q = q.filter(
@@ -79,4 +321,258 @@ def list_ledger(db, q_text: str = "", limit: int = 200):
             )
         )
 
-    return q.limit(limit).all()
+    if after:
+        # row-value compare => Postgres uses it as an index condition (an OR form only filters)
+        created_at, last_id = after
+        q = q.filter(tuple_(StockLedger.created_at, StockLedger.id) < tuple_(_ts_param(db, created_at), last_id))
+
+    return q.order_by(StockLedger.created_at.desc(), StockLedger.id.desc()).limit(limit).all()
+
+
+def ledger_cursor(led) -> tuple:
+    """Keyset cursor for list_ledger(after=...)."""
+    return (led.created_at, led.id)
+
+
+def _ts_param(db, value):
+    """
+    SQLite keeps timestamps as text ("YYYY-MM-DD HH:MM:SS" from CURRENT_TIMESTAMP, no
+    microseconds) while a bound datetime is sent with ".000000" => equal rows would compare
+    as smaller and repeat forever. Send the same text form instead.
+    """
+    if isinstance(value, datetime) and db.get_bind().dialect.name == "sqlite":
+        return literal(str(value.replace(tzinfo=None)))
+    return value
+
+
+def _day_start(d):
+    if isinstance(d, datetime):
+        return d
+    return datetime(d.year, d.month, d.day)
+
+
+def get_ledger_entry(db, entry_id: int):
+    return (
+        db.query(StockLedger)
+        .options(joinedload(StockLedger.item), joinedload(StockLedger.location))
+        .filter(StockLedger.id == entry_id)
+        .first()
+    )
+
+
+# ---------------------------------------------------------
+# Point-in-time balances (stock snapshots)
+# ---------------------------------------------------------
+SNAPSHOT_PERIODS = ("DAY", "MONTH")
+# a snapshot at T must not miss a posting still open at T (created_at = its start time)
+SNAPSHOT_SETTLE = timedelta(minutes=10)
+
+
+def snapshot_period() -> str:
+    """MARBLE_SNAPSHOT_INTERVAL in .env: day / month (default month)."""
+    raw = os.getenv("MARBLE_SNAPSHOT_INTERVAL", "").strip().upper()
+    raw = {"DAILY": "DAY", "MONTHLY": "MONTH"}.get(raw, raw)
+    return raw if raw in SNAPSHOT_PERIODS else "MONTH"
+
+
+def _as_of_bound(as_of):
+    """-> (bound, inclusive). datetime => created_at <= as_of; plain date => the whole day (like list_ledger)."""
+    if isinstance(as_of, datetime):
+        return as_of, True
+    return _day_start(as_of) + timedelta(days=1), False
+
+
+def nearest_snapshot(db, as_of):
+    """Latest snapshot usable for as_of (taken at or before it), None => sum from the start."""
+    bound, _ = _as_of_bound(as_of)
+    return (
+        db.query(StockSnapshot)
+        .filter(StockSnapshot.taken_at <= bound)
+        .order_by(StockSnapshot.taken_at.desc())
+        .first()
+    )
+
+
+def _stock_rows(db, snap, bound, inclusive: bool, item_ids=None, location_id=None):
+    """Snapshot rows + ledger rows after it up to bound, as (item_id, location_id, qty_primary, qty_secondary)."""
+    led = StockLedger
+    end = _ts_param(db, bound)
+    delta = select(
+        led.item_id.label("item_id"),
+        led.location_id.label("location_id"),
+        func.coalesce(led.qty_primary, 0).label("qty_primary"),
+        func.coalesce(led.qty_secondary, 0).label("qty_secondary"),
+    ).where(led.created_at <= end if inclusive else led.created_at < end)
+    if snap is not None:
+        delta = delta.where(led.created_at >= _ts_param(db, snap.taken_at))
+    if item_ids is not None:
+        delta = delta.where(led.item_id.in_(item_ids))
+    if location_id is not None:
+        delta = delta.where(led.location_id == location_id)
+
+    if snap is None:
+        return delta
+
+    row = StockSnapshotRow
+    base = select(row.item_id, row.location_id, row.qty_primary, row.qty_secondary).where(row.snapshot_id == snap.id)
+    if item_ids is not None:
+        base = base.where(row.item_id.in_(item_ids))
+    if location_id is not None:
+        base = base.where(row.location_id == location_id)
+    return union_all(base, delta)
+
+
+def stock_as_of(db, as_of, kinds=None, location_id=None):
+    """
+    Ledger stock as of a date, shaped like inventory_view.inventory_union() (kind = item
+    category, item_id, location_id, qty_primary, qty_secondary) => the stock report runs the
+    same grouped queries over it. kinds=None => every category.
+    """
+    bound, inclusive = _as_of_bound(as_of)
+    rows = _stock_rows(db, nearest_snapshot(db, as_of), bound, inclusive, location_id=location_id).subquery("as_of_rows")
+
+    q = select(
+        Item.category.label("kind"),
+        rows.c.item_id, rows.c.location_id, rows.c.qty_primary, rows.c.qty_secondary,
+    ).join(Item, Item.id == rows.c.item_id)
+    if kinds is not None:
+        q = q.where(Item.category.in_([(k or "").upper() for k in kinds]))
+    return q.subquery("stock_as_of")
+
+
+def stock_balances_as_of(db, as_of, item_ids=None, location_id=None) -> dict:
+    """{(item_id, location_id): (primary, secondary)} as of a date — nearest snapshot + ledger delta."""
+    bound, inclusive = _as_of_bound(as_of)
+    rows = _stock_rows(db, nearest_snapshot(db, as_of), bound, inclusive, item_ids, location_id).subquery()
+    q = (
+        select(rows.c.item_id, rows.c.location_id, func.sum(rows.c.qty_primary), func.sum(rows.c.qty_secondary))
+        .group_by(rows.c.item_id, rows.c.location_id)
+    )
+    return {(r[0], r[1]): (float(r[2] or 0), int(r[3] or 0)) for r in db.execute(q)}
+
+
+def take_stock_snapshot(db, taken_at: datetime, period: str = "MANUAL"):
+    """
+    Checkpoints every non-zero (item, location) balance over the ledger rows created before
+    taken_at, built from the previous snapshot + ledger rows since (not the full history).
+    Already there => returns the existing one. Commits.
+    """
+    now = datetime.now(taken_at.tzinfo) if taken_at.tzinfo else datetime.now()
+    if taken_at > now - SNAPSHOT_SETTLE:
+        raise ValueError(
+            f"Snapshot time must be at least {int(SNAPSHOT_SETTLE.total_seconds() // 60)} minutes in the past."
+        )
+
+    existing = db.query(StockSnapshot).filter(StockSnapshot.taken_at == taken_at).first()
+    if existing is not None:
+        return existing
+
+    prev = (
+        db.query(StockSnapshot)
+        .filter(StockSnapshot.taken_at < taken_at)
+        .order_by(StockSnapshot.taken_at.desc())
+        .first()
+    )
+
+    try:
+        snap = StockSnapshot(taken_at=taken_at, period=period)
+        db.add(snap)
+        db.flush()
+
+        rows = _stock_rows(db, prev, taken_at, inclusive=False).subquery()
+        pri = func.sum(rows.c.qty_primary)
+        sec = func.sum(rows.c.qty_secondary)
+        balances = (
+            select(literal(snap.id), rows.c.item_id, rows.c.location_id, pri, sec)
+            .group_by(rows.c.item_id, rows.c.location_id)
+            .having(or_(pri != 0, sec != 0))  # zero balances are implied
+        )
+        snap.row_count = db.execute(
+            insert(StockSnapshotRow).from_select(
+                ["snapshot_id", "item_id", "location_id", "qty_primary", "qty_secondary"], balances
+            )
+        ).rowcount
+        db.commit()
+        db.refresh(snap)
+        return snap
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _next_boundary(dt: datetime, period: str) -> datetime:
+    """First DAY / MONTH start strictly after dt."""
+    if period == "DAY":
+        return _day_start(dt.date()) + timedelta(days=1)
+    year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return datetime(year, month, 1)
+
+
+def _naive(dt: datetime) -> datetime:
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def due_snapshot_times(db, period: str | None = None, now: datetime | None = None) -> list[datetime]:
+    """
+    Period starts (00:00 of each day / 1st of each month) not snapshotted yet, from the last
+    snapshot of that period (or the first ledger row) up to now - SNAPSHOT_SETTLE.
+    A boundary that already has a snapshot of ANY period is taken (taken_at is unique: a DAY
+    snapshot at 1st 00:00 is also that month's checkpoint).
+    """
+    period = (period or snapshot_period()).upper()
+    if period not in SNAPSHOT_PERIODS:
+        raise ValueError(f"Snapshot period must be one of: {', '.join(SNAPSHOT_PERIODS)}")
+
+    last = db.query(func.max(StockSnapshot.taken_at)).filter(StockSnapshot.period == period).scalar()
+    start = last if last is not None else db.query(func.min(StockLedger.created_at)).scalar()
+    if start is None:
+        return []
+
+    limit = (now or datetime.now()) - SNAPSHOT_SETTLE
+    out = []
+    t = _next_boundary(_naive(start), period)
+    while t <= limit:
+        out.append(t)
+        t = _next_boundary(t, period)
+
+    if out:
+        taken = {
+            _naive(ts) for (ts,) in db.query(StockSnapshot.taken_at)
+            .filter(StockSnapshot.taken_at >= out[0], StockSnapshot.taken_at <= out[-1])
+        }
+        out = [t for t in out if t not in taken]
+    return out
+
+
+def verify_stock_snapshot(db, snap, tolerance: float = 0.0005) -> list[dict]:
+    """
+    Snapshot rows vs a full SUM(stock_ledger) before taken_at.
+    Drift rows: [{item_id, location_id, ledger_primary, ledger_secondary, snapshot_primary, snapshot_secondary}]
+    """
+    full = _stock_rows(db, None, snap.taken_at, inclusive=False).subquery()
+    expected = {
+        (r[0], r[1]): (float(r[2] or 0), int(r[3] or 0))
+        for r in db.execute(
+            select(full.c.item_id, full.c.location_id, func.sum(full.c.qty_primary), func.sum(full.c.qty_secondary))
+            .group_by(full.c.item_id, full.c.location_id)
+        )
+    }
+    actual = {
+        (r.item_id, r.location_id): (float(r.qty_primary or 0), int(r.qty_secondary or 0))
+        for r in db.query(StockSnapshotRow).filter(StockSnapshotRow.snapshot_id == snap.id)
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1] or 0)):
+        exp_pri, exp_sec = expected.get(key, (0.0, 0))
+        act_pri, act_sec = actual.get(key, (0.0, 0))
+        if abs(exp_pri - act_pri) > tolerance or exp_sec != act_sec:
+            drift.append({
+                "item_id": key[0],
+                "location_id": key[1],
+                "ledger_primary": exp_pri,
+                "ledger_secondary": exp_sec,
+                "snapshot_primary": act_pri,
+                "snapshot_secondary": act_sec,
+            })
+    return drift
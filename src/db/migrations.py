@@ -1,14 +1,39 @@
 # src/db/migrations.py
+"""
+Versioned schema migrations (small, in-house).
+
+- every migration is a (version, name, fn(conn)) entry in MIGRATIONS, applied in order
+- applied versions are recorded in `schema_migrations` (version, name, applied_at);
+  a fn may return a short note (e.g. a skipped optional part), stored as "name — note"
+- startup cost when nothing is pending: ONE query (SELECT MAX(version))
+- runs from main.py / init_db, NOT at import time of src.db.database
+  (importing src.db never touches the database)
+
+The app runs ONLY these at startup (main.py), init_db's create_all is not run there =>
+a new table the app needs must be created here too (Model.__table__.create(conn,
+checkfirst=True)), plus ALTERs, data fixes and indexes for tables that already exist.
+Each fn must be safe on a fresh database too (check before altering).
+"""
+from datetime import datetime, timezone
+
 from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
 
-def ensure_items_extra_columns(engine):
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def ensure_items_extra_columns(conn):
     """
     Safe migration:
     - Adds nullable columns if missing
     - Won't break existing data
     Works for SQLite/Postgres/MySQL (basic ALTER TABLE ADD COLUMN)
     """
-    insp = inspect(engine)
+    insp = inspect(conn)
+    if "items" not in insp.get_table_names():
+        return  # fresh DB: create_all builds the full table
+
     cols = {c["name"] for c in insp.get_columns("items")}
 
     alters = []
@@ -18,10 +43,217 @@ def ensure_items_extra_columns(engine):
         alters.append("ALTER TABLE items ADD COLUMN thickness VARCHAR(20)")
     if "finish" not in cols:
         alters.append("ALTER TABLE items ADD COLUMN finish VARCHAR(30)")
+    if "reorder_level" not in cols:
+        alters.append("ALTER TABLE items ADD COLUMN reorder_level NUMERIC(12, 3)")
+
+    for sql in alters:
+        conn.execute(text(sql))
+
+
+def normalize_item_skus(conn):
+    """
+    SKUs are matched by equality on the upper-cased value (uses the unique index).
+    Old rows saved before normalisation get upper-cased/trimmed here,
+    unless that would collide with another SKU (those are left as-is).
+    """
+    if "items" not in inspect(conn).get_table_names():
+        return
+
+    conn.execute(text(
+        "UPDATE items SET sku = UPPER(TRIM(sku)) "
+        "WHERE sku <> UPPER(TRIM(sku)) "
+        "AND UPPER(TRIM(sku)) NOT IN (SELECT sku FROM items) "
+        "AND UPPER(TRIM(sku)) IN ("
+        "  SELECT UPPER(TRIM(sku)) FROM items GROUP BY UPPER(TRIM(sku)) HAVING COUNT(*) = 1"
+        ")"
+    ))
+
+
+def add_ledger_keyset_index(conn):
+    """(created_at, id) index for newest-first ledger paging (list_ledger after=...)."""
+    if "stock_ledger" not in inspect(conn).get_table_names():
+        return
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_stock_ledger_created_id ON stock_ledger (created_at, id)"
+    ))
+
+
+def add_item_search_indexes(conn):
+    # Postgres only: pg_trgm GIN on the item search text + prefix b-trees (see item_search)
+    # returns the pg_trgm fallback note (if any) => recorded with the migration
+    from src.db.item_search import ensure_search_indexes
+    return ensure_search_indexes(conn)
+
 
-    if not alters:
+def add_ledger_access_indexes(conn):
+    """
+    stock_ledger indexes for balance sums, document lookups and type-filtered paging.
+    Built from the model's Index objects => Postgres gets the INCLUDE (qty_*) covering index,
+    SQLite the plain key columns.
+    """
+    if "stock_ledger" not in inspect(conn).get_table_names():
         return
+    from src.db.models import StockLedger
+
+    wanted = {"ix_stock_ledger_item_loc_created", "ix_stock_ledger_ref", "ix_stock_ledger_type_created"}
+    for idx in StockLedger.__table__.indexes:
+        if idx.name in wanted:
+            idx.create(conn, checkfirst=True)
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ANALYZE stock_ledger"))  # planner sees the new indexes right away
+
+
+def add_inventory_compaction(conn):
+    """
+    Inventory compaction (compaction_repo): its two tables + compaction_id on the four
+    inventory tables. The app only runs migrations at startup, so the tables are made here
+    too (the carry-forward FK points at inventory_compactions).
+    """
+    from src.db.models import InventoryCompaction, InventoryArchive
+
+    InventoryCompaction.__table__.create(conn, checkfirst=True)
+    InventoryArchive.__table__.create(conn, checkfirst=True)
+
+    insp = inspect(conn)
+    tables = set(insp.get_table_names())
+    for table in ("slab_inventory", "tile_inventory", "block_inventory", "table_inventory"):
+        if table not in tables:
+            continue  # fresh DB: create_all builds the full table
+        cols = {c["name"] for c in insp.get_columns(table)}
+        if "compaction_id" not in cols:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN compaction_id INTEGER"))
+
+
+def add_stock_snapshots(conn):
+    """Point-in-time balance checkpoints (ledger_repo.take_stock_snapshot)."""
+    from src.db.models import StockSnapshot, StockSnapshotRow
+
+    StockSnapshot.__table__.create(conn, checkfirst=True)
+    StockSnapshotRow.__table__.create(conn, checkfirst=True)
+
+
+def add_balance_tables(conn):
+    """
+    stock_balance (running balance per item/location) and reorder_thresholds (dashboard
+    low-stock levels) used to come only from init_db. Databases upgraded by the app's
+    startup migrations never got them => made here. stock_balance is backfilled from
+    stock_ledger when it's empty but the ledger isn't; missing categories get the
+    DEFAULT_THRESHOLDS (rows edited already are kept).
+    """
+    from sqlalchemy.orm import Session
+    from src.db.models import StockBalance, ReorderThreshold
+    from src.db.ledger_repo import rebuild_stock_balances
+    from src.db.dashboard_repo import DEFAULT_THRESHOLDS
+
+    StockBalance.__table__.create(conn, checkfirst=True)
+    ReorderThreshold.__table__.create(conn, checkfirst=True)
+
+    have = {r[0] for r in conn.execute(text("SELECT category FROM reorder_thresholds"))}
+    for cat, (low, crit) in DEFAULT_THRESHOLDS.items():
+        if cat not in have:
+            conn.execute(
+                text("INSERT INTO reorder_thresholds (category, low_level, critical_level) VALUES (:c, :l, :k)"),
+                {"c": cat, "l": low, "k": crit},
+            )
+
+    if "stock_ledger" not in inspect(conn).get_table_names():
+        return
+    has_balance = conn.execute(text("SELECT 1 FROM stock_balance LIMIT 1")).first()
+    has_ledger = conn.execute(text("SELECT 1 FROM stock_ledger LIMIT 1")).first()
+    if has_balance is None and has_ledger is not None:
+        # session joins the migration's transaction; its commit doesn't end it
+        with Session(bind=conn) as db:
+            rebuild_stock_balances(db)
+
+
+def add_ledger_ref_type_index(conn):
+    """(ref_type, id) for the adjustments list (ref_type filter, newest id first)."""
+    if "stock_ledger" not in inspect(conn).get_table_names():
+        return
+    from src.db.models import StockLedger
+
+    for idx in StockLedger.__table__.indexes:
+        if idx.name == "ix_stock_ledger_ref_type_id":
+            idx.create(conn, checkfirst=True)
+
+
+# (version, name, fn) — append only, never renumber
+MIGRATIONS = [
+    (1, "items: material/thickness/finish/reorder_level columns", ensure_items_extra_columns),
+    (2, "items: upper-case legacy SKUs", normalize_item_skus),
+    (3, "stock_ledger: (created_at, id) index", add_ledger_keyset_index),
+    (4, "items: trigram + prefix search indexes", add_item_search_indexes),
+    (5, "stock_ledger: balance / ref / movement type indexes", add_ledger_access_indexes),
+    (6, "inventory: compaction tables + carry-forward compaction_id", add_inventory_compaction),
+    (7, "stock_snapshots: point-in-time balances", add_stock_snapshots),
+    (8, "stock_balance + reorder_thresholds: tables, backfill, default levels", add_balance_tables),
+    (9, "stock_ledger: (ref_type, id) index for the adjustments list", add_ledger_ref_type_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _read_version(conn) -> int | None:
+    """MAX(version) or None when the migrations table doesn't exist yet."""
+    try:
+        return conn.execute(text(f"SELECT MAX(version) FROM {MIGRATIONS_TABLE}")).scalar() or 0
+    except DBAPIError:
+        conn.rollback()
+        return None
+
+
+def schema_version(engine) -> int | None:
+    with engine.connect() as conn:
+        return _read_version(conn)
+
+
+def run_migrations(engine) -> int:
+    """
+    Applies pending migrations; returns the schema version afterwards.
+    Fast path (up to date) = one SELECT. Raises if the DB is unreachable (caller shows it).
+    """
+    with engine.connect() as conn:
+        version = _read_version(conn)
+    if version is not None and version >= LATEST_VERSION:
+        return version
 
     with engine.begin() as conn:
-        for sql in alters:
-            conn.execute(text(sql))
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            " version INTEGER PRIMARY KEY,"
+            " name VARCHAR(200) NOT NULL,"
+            " applied_at VARCHAR(40) NOT NULL"
+            ")"
+        ))
+
+        # two workstations starting together: only one migrates, the other waits then sees it done
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": MIGRATIONS_TABLE})
+
+        version = conn.execute(text(f"SELECT MAX(version) FROM {MIGRATIONS_TABLE}")).scalar() or 0
+
+        for ver, name, fn in MIGRATIONS:
+            if ver <= version:
+                continue
+            note = fn(conn)
+            if note:
+                name = f"{name} — {note}"[:200]
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": ver, "n": name, "t": datetime.now(timezone.utc).isoformat(timespec="seconds")},
+            )
+            version = ver
+
+    return version
+
+
+if __name__ == "__main__":
+    from src.db.database import engine
+
+    print(f"schema version: {run_migrations(engine)} ✅")
+    with engine.connect() as conn:
+        for ver, name in conn.execute(text(
+            f"SELECT version, name FROM {MIGRATIONS_TABLE} WHERE name LIKE :p ORDER BY version"
+        ), {"p": "% — %"}):
+            print(f"  #{ver}: {name}")
@@ -1,5 +1,5 @@
 # src/db/models.py
-from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -37,10 +37,25 @@ class Item(Base):
     thickness = Column(String(20), nullable=True)        # 2cm / 3cm etc
     finish = Column(String(30), nullable=True)           # Honed / Polished etc
 
+    # low-stock alert level (slab/box for SLAB/TILE, piece for BLOCK/TABLE); NULL => category default
+    reorder_level = Column(Numeric(12, 3), nullable=True)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+class ReorderThreshold(Base):
+    """
+    Per-category low-stock levels (dashboard cards + low stock list).
+    Item.reorder_level overrides low_level for a single item.
+    """
+    __tablename__ = "reorder_thresholds"
+
+    category = Column(String(20), primary_key=True)      # SLAB / TILE / BLOCK / TABLE
+    low_level = Column(Numeric(12, 3), nullable=False)
+    critical_level = Column(Numeric(12, 3), nullable=False)
+
+
 # ----------------------------
 # INVENTORY TABLES
 # ----------------------------
@@ -57,6 +72,9 @@ class SlabInventory(Base):
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     notes = Column(Text, nullable=True)
 
+    # set on carry-forward rows written by inventory compaction (see compaction_repo)
+    compaction_id = Column(Integer, ForeignKey("inventory_compactions.id"), nullable=True)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -76,6 +94,9 @@ class TileInventory(Base):
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     notes = Column(Text, nullable=True)
 
+    # set on carry-forward rows written by inventory compaction (see compaction_repo)
+    compaction_id = Column(Integer, ForeignKey("inventory_compactions.id"), nullable=True)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -94,6 +115,9 @@ class BlockInventory(Base):
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     notes = Column(Text, nullable=True)
 
+    # set on carry-forward rows written by inventory compaction (see compaction_repo)
+    compaction_id = Column(Integer, ForeignKey("inventory_compactions.id"), nullable=True)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -112,6 +136,9 @@ class TableInventory(Base):
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     notes = Column(Text, nullable=True)
 
+    # set on carry-forward rows written by inventory compaction (see compaction_repo)
+    compaction_id = Column(Integer, ForeignKey("inventory_compactions.id"), nullable=True)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -119,6 +146,50 @@ class TableInventory(Base):
     location = relationship("Location")
 
 
+class InventoryCompaction(Base):
+    """
+    One run of the inventory compaction job (python -m src.db.compact_inventory).
+    Rows older than `cutoff` were moved to inventory_archive and replaced by one
+    carry-forward row per (item, location) with compaction_id = this id.
+    """
+    __tablename__ = "inventory_compactions"
+
+    id = Column(Integer, primary_key=True)
+    cutoff = Column(DateTime(timezone=True), nullable=False)
+    rows_archived = Column(Integer, default=0, nullable=False)
+    carry_rows = Column(Integer, default=0, nullable=False)
+    notes = Column(String(250), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    reverted_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class InventoryArchive(Base):
+    """
+    Original slab/tile/block/table rows removed by a compaction, kept as-is (same id,
+    normalized qty like inventory_view) so the compaction can be audited and reverted.
+    """
+    __tablename__ = "inventory_archive"
+    __table_args__ = (
+        Index("ix_inventory_archive_compaction", "compaction_id", "kind"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    compaction_id = Column(Integer, ForeignKey("inventory_compactions.id"), nullable=False)
+
+    kind = Column(String(10), nullable=False)  # SLAB / TILE / BLOCK / TABLE
+    source_id = Column(Integer, nullable=False)  # id in the inventory table
+    source_compaction_id = Column(Integer, nullable=True)  # it was itself a carry-forward row
+
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
+    qty_primary = Column(Numeric(12, 3), nullable=False)  # total_sqft / piece_count
+    qty_secondary = Column(Integer, nullable=True)  # slab_count / box_count / NULL
+    notes = Column(Text, nullable=True)
+    is_active = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
 # ----------------------------
 # PURCHASES
 # ----------------------------
@@ -195,6 +266,21 @@ class SaleItem(Base):
 
 class StockLedger(Base):
     __tablename__ = "stock_ledger"
+    __table_args__ = (
+        # ledger browsing: ORDER BY created_at DESC, id DESC + keyset cursor
+        Index("ix_stock_ledger_created_id", "created_at", "id"),
+        # balance sums per (item, location) [as of a date]; INCLUDE => index-only scan on Postgres
+        Index(
+            "ix_stock_ledger_item_loc_created", "item_id", "location_id", "created_at",
+            postgresql_include=["qty_primary", "qty_secondary"],
+        ),
+        # rows of one document (sale #12, adjustment #5, ...)
+        Index("ix_stock_ledger_ref", "ref_type", "ref_id"),
+        # adjustments list: WHERE ref_type = 'adjustment' ORDER BY id DESC
+        Index("ix_stock_ledger_ref_type_id", "ref_type", "id"),
+        # ledger page filtered by movement type, newest first
+        Index("ix_stock_ledger_type_created", "movement_type", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
@@ -215,6 +301,64 @@ class StockLedger(Base):
     item = relationship("Item")
     location = relationship("Location")
 
+
+class StockBalance(Base):
+    """
+    Running balance per (item, location).
+    Maintained by ledger_repo.add_ledger_entry in the same transaction as the ledger row,
+    so balance checks don't need to SUM the whole ledger history.
+    """
+    __tablename__ = "stock_balance"
+    __table_args__ = (
+        UniqueConstraint("item_id", "location_id", name="uq_stock_balance_item_location"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+
+    qty_primary = Column(Numeric(14, 3), default=0, nullable=False)
+    qty_secondary = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    item = relationship("Item")
+    location = relationship("Location")
+
+class StockSnapshot(Base):
+    """
+    Checkpoint of every (item, location) balance: rows = SUM(stock_ledger) over the ledger
+    rows created BEFORE taken_at (see ledger_repo.take_stock_snapshot).
+    As-of balances = nearest snapshot + ledger rows since it, not the whole history.
+    """
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime(timezone=True), unique=True, nullable=False)
+    period = Column(String(10), nullable=False, default="MANUAL")  # DAY / MONTH / MANUAL
+    row_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    rows = relationship("StockSnapshotRow", back_populates="snapshot", cascade="all, delete-orphan")
+
+
+class StockSnapshotRow(Base):
+    __tablename__ = "stock_snapshot_rows"
+    __table_args__ = (
+        UniqueConstraint("snapshot_id", "item_id", "location_id", name="uq_stock_snapshot_row"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey("stock_snapshots.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+
+    qty_primary = Column(Numeric(14, 3), default=0, nullable=False)
+    qty_secondary = Column(Integer, default=0, nullable=False)
+
+    snapshot = relationship("StockSnapshot", back_populates="rows")
+
 # ----------------------------
 # RETURNS (Sale Return / Purchase Return)
 # ----------------------------
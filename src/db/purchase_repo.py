@@ -1,13 +1,11 @@
 # src/db/purchase_repo.py
 from sqlalchemy.orm import joinedload
 
-from src.db.models import Purchase, PurchaseItem, Item
+from src.db.models import Purchase, PurchaseItem
 from src.db.ledger_repo import add_ledger_entry
-
-from src.db.slab_repo import create_slab_entry
-from src.db.tile_repo import create_tile_entry
-from src.db.block_repo import create_block_entry
-from src.db.table_repo import create_table_entry
+from src.db.item_repo import get_items_by_ids
+from src.db.stock_lock import lock_stock_balances, retry_on_conflict
+from src.db.inventory_repo import inventory_row, bulk_insert
 
 
 def _clean_text(v):
@@ -15,7 +13,7 @@ def _clean_text(v):
     return v or None
 
 
-def _validate_purchase_rows_or_raise(db, location_id: int | None, rows: list[dict]):
+def _validate_purchase_rows_or_raise(db, location_id: int | None, rows: list[dict]) -> dict:
     """
     Purchase rules:
     - location_id REQUIRED (location-wise stock)
@@ -23,6 +21,8 @@ def _validate_purchase_rows_or_raise(db, location_id: int | None, rows: list[dic
     - qty_primary > 0 always
     - for SLAB/TILE qty_secondary > 0 required
     - for BLOCK/TABLE qty_secondary must be None
+
+    Returns {item_id: Item} (loaded in one query) so posting doesn't re-fetch.
     """
     if not location_id:
         raise ValueError("Location is required for Purchase (location-wise stock).")
@@ -30,12 +30,14 @@ def _validate_purchase_rows_or_raise(db, location_id: int | None, rows: list[dic
     if not rows:
         raise ValueError("At least one line item is required.")
 
+    items = get_items_by_ids(db, [r.get("item_id") for r in rows])
+
     for r in rows:
         item_id = r.get("item_id")
         if not item_id:
             raise ValueError("Invalid row: item is missing.")
 
-        item = db.query(Item).get(item_id)
+        item = items.get(int(item_id))
         if not item:
             raise ValueError(f"Item not found (id={item_id}).")
 
@@ -62,7 +64,10 @@ def _validate_purchase_rows_or_raise(db, location_id: int | None, rows: list[dic
         else:
             r["qty_secondary"] = None
 
+    return items
 
+
+@retry_on_conflict
 def create_purchase(db, payload: dict) -> Purchase:
     """
     payload = {
@@ -79,7 +84,10 @@ def create_purchase(db, payload: dict) -> Purchase:
     location_id = payload.get("location_id")
 
     rows = payload.get("rows") or []
-    _validate_purchase_rows_or_raise(db, location_id, rows)
+    items = _validate_purchase_rows_or_raise(db, location_id, rows)
+
+    # same lock order as sales (item_id) so a purchase and a sale can't deadlock each other
+    lock_stock_balances(db, items.keys(), int(location_id))
 
     p = Purchase(
         vendor_name=vendor_name,
@@ -89,8 +97,12 @@ def create_purchase(db, payload: dict) -> Purchase:
     db.add(p)
     db.flush()  # get p.id
 
+    note_text = f"Purchase#{p.id}" + (f" — {vendor_name}" if vendor_name else "")
+
+    # stage everything, insert in bulk, commit ONCE for the whole document
+    staged = []
     for r in rows:
-        item = db.query(Item).get(r["item_id"])
+        item = items[int(r["item_id"])]
         cat = (item.category or "").upper()
 
         unit_primary = item.unit_primary or ("piece" if cat in ("BLOCK", "TABLE") else "sqft")
@@ -101,14 +113,14 @@ def create_purchase(db, payload: dict) -> Purchase:
         if qty_secondary is not None:
             qty_secondary = int(qty_secondary or 0)
 
-        db.add(PurchaseItem(
+        staged.append((PurchaseItem, dict(
             purchase_id=p.id,
             item_id=item.id,
             qty_primary=qty_primary,
             qty_secondary=qty_secondary,
             unit_primary=unit_primary,
             unit_secondary=unit_secondary
-        ))
+        )))
 
         add_ledger_entry(
             db=db,
@@ -123,39 +135,9 @@ def create_purchase(db, payload: dict) -> Purchase:
             ref_id=p.id
         )
 
-        note_text = f"Purchase#{p.id}" + (f" — {vendor_name}" if vendor_name else "")
-
-        if cat == "SLAB":
-            create_slab_entry(db, {
-                "item_id": item.id,
-                "slab_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TILE":
-            create_tile_entry(db, {
-                "item_id": item.id,
-                "box_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "BLOCK":
-            create_block_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TABLE":
-            create_table_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=1))
 
+    bulk_insert(db, staged)
     db.commit()
     db.refresh(p)
     return p
@@ -0,0 +1,93 @@
+# src/db/query_cancel.py
+"""
+Cancel a running (search) query from another thread.
+
+    token = QueryCancelToken()
+    with get_db() as db:
+        token.bind(db)              # remembers the backend / connection + sets statement_timeout
+        try:
+            rows = search_items(db, ...)
+        finally:
+            token.release()         # before the connection goes back to the pool
+    ...
+    token.cancel()                  # from any thread: stops the query on the server
+
+- Postgres: pg_cancel_backend(pid) from a second connection (the query fails with QueryCanceled)
+- SQLite:   sqlite3 Connection.interrupt() (the query fails with "interrupted")
+
+bind/release/cancel share a lock, so a cancel can never hit the NEXT user of the pooled
+connection: release() waits for an in-progress cancel, and cancel() after release() is a no-op.
+"""
+import threading
+
+from sqlalchemy import text
+
+
+# server-side cap for background searches (a runaway '%x%' scan can't pin a backend forever)
+SEARCH_STATEMENT_TIMEOUT_MS = 15000
+
+
+class QueryCancelled(Exception):
+    """The search was superseded/cancelled before it finished."""
+
+
+class QueryCancelToken:
+    def __init__(self, statement_timeout_ms: int | None = SEARCH_STATEMENT_TIMEOUT_MS):
+        self.statement_timeout_ms = statement_timeout_ms
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._engine = None
+        self._pid = None        # postgres backend pid
+        self._raw_conn = None   # sqlite3 connection
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def bind(self, db):
+        """Call inside the worker before running the query."""
+        conn = db.connection()
+        dialect = conn.dialect.name
+
+        if dialect == "postgresql":
+            if self.statement_timeout_ms:
+                # SET LOCAL => only this transaction (session is closed/rolled back after the search)
+                conn.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+            pid = conn.execute(text("SELECT pg_backend_pid()")).scalar()
+        else:
+            pid = None
+
+        with self._lock:
+            if self._cancelled:
+                raise QueryCancelled()
+            self._engine = conn.engine
+            self._pid = pid
+            if dialect == "sqlite":
+                self._raw_conn = conn.connection.dbapi_connection
+
+    def release(self):
+        """Call inside the worker when the query is done (success or error)."""
+        with self._lock:
+            self._pid = None
+            self._raw_conn = None
+
+    def cancel(self):
+        """Any thread. Safe to call before bind, during the query, or after release."""
+        with self._lock:
+            self._cancelled = True
+
+            if self._raw_conn is not None:
+                try:
+                    self._raw_conn.interrupt()
+                except Exception:
+                    pass
+                return
+
+            if self._pid is None:
+                return
+
+            try:
+                with self._engine.connect() as other:
+                    other.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": self._pid})
+            except Exception:
+                pass  # best effort: statement_timeout still bounds it
@@ -0,0 +1,40 @@
+# src/db/rebuild_balances.py
+import sys
+
+from src.db.session import get_db
+from src.db.ledger_repo import verify_stock_balances, rebuild_stock_balances
+
+
+def main(argv=None):
+    """
+    python -m src.db.rebuild_balances           -> verify only (report drift)
+    python -m src.db.rebuild_balances --fix     -> recompute stock_balance from stock_ledger
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    fix = "--fix" in argv
+
+    with get_db() as db:
+        drift = rebuild_stock_balances(db) if fix else verify_stock_balances(db)
+
+    if not drift:
+        print("stock_balance matches stock_ledger ✅")
+        return 0
+
+    print(f"Drift found in {len(drift)} item/location balance(s):")
+    for d in drift:
+        print(
+            f"  item={d['item_id']} location={d['location_id']}  "
+            f"ledger=({d['ledger_primary']:.3f}, {d['ledger_secondary']})  "
+            f"balance=({d['balance_primary']:.3f}, {d['balance_secondary']})"
+        )
+
+    if fix:
+        print("stock_balance rebuilt from ledger ✅")
+        return 0
+
+    print("Run with --fix to rebuild.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,238 +1,143 @@
 # src/db/reports_repo.py
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 
-from src.db.models import (
-    Location, Item,
-    SlabInventory, TileInventory, BlockInventory, TableInventory
-)
+from src.db.inventory_view import KINDS, UNITS, inventory_union
+from src.db.ledger_repo import stock_as_of
+from src.db.models import Location, Item
 
 
-def location_stock_summary(db):
+def _sum_of(inv, kind, col):
+    return func.coalesce(func.sum(case((inv.c.kind == kind, col))), 0)
+
+
+def _stock_source(db, as_of, kinds=KINDS, location_id=None):
+    # current stock: the inventory tables; as_of: ledger balances (nearest snapshot + delta)
+    if as_of is None:
+        return inventory_union(kinds, location_id=location_id)
+    return stock_as_of(db, as_of, kinds, location_id=location_id)
+
+
+def location_stock_summary(db, as_of=None):
     """
     Returns list of dict rows:
     [
       {location_id, location_name, slab_count, slab_sqft, tile_boxes, tile_sqft, block_pieces, table_pieces}
     ]
+    One statement: inventory totals per location (UNION ALL of the four tables, grouped once),
+    joined onto the active locations => locations without stock still show with zeros.
+    as_of (date/datetime) => stock at that time from the ledger (see ledger_repo.stock_as_of).
     """
-    locs = (
-        db.query(Location)
-        .filter(Location.is_active == True)
-        .order_by(Location.name.asc())
-        .all()
-    )
-
-    slab_rows = (
-        db.query(
-            SlabInventory.location_id.label("location_id"),
-            func.coalesce(func.sum(SlabInventory.slab_count), 0).label("slab_count"),
-            func.coalesce(func.sum(SlabInventory.total_sqft), 0).label("slab_sqft"),
+    inv = _stock_source(db, as_of)
+    totals = (
+        select(
+            inv.c.location_id,
+            _sum_of(inv, "SLAB", inv.c.qty_secondary).label("slab_count"),
+            _sum_of(inv, "SLAB", inv.c.qty_primary).label("slab_sqft"),
+            _sum_of(inv, "TILE", inv.c.qty_secondary).label("tile_boxes"),
+            _sum_of(inv, "TILE", inv.c.qty_primary).label("tile_sqft"),
+            _sum_of(inv, "BLOCK", inv.c.qty_primary).label("block_pieces"),
+            _sum_of(inv, "TABLE", inv.c.qty_primary).label("table_pieces"),
         )
-        .filter(SlabInventory.is_active == True)
-        .group_by(SlabInventory.location_id)
-        .all()
-    )
-    slab_map = {r.location_id: r for r in slab_rows}
-
-    tile_rows = (
-        db.query(
-            TileInventory.location_id.label("location_id"),
-            func.coalesce(func.sum(TileInventory.box_count), 0).label("tile_boxes"),
-            func.coalesce(func.sum(TileInventory.total_sqft), 0).label("tile_sqft"),
-        )
-        .filter(TileInventory.is_active == True)
-        .group_by(TileInventory.location_id)
-        .all()
+        .group_by(inv.c.location_id)
+        .subquery("totals")
     )
-    tile_map = {r.location_id: r for r in tile_rows}
 
-    block_rows = (
+    rows = (
         db.query(
-            BlockInventory.location_id.label("location_id"),
-            func.coalesce(func.sum(BlockInventory.piece_count), 0).label("block_pieces"),
+            Location.id, Location.name,
+            totals.c.slab_count, totals.c.slab_sqft, totals.c.tile_boxes, totals.c.tile_sqft,
+            totals.c.block_pieces, totals.c.table_pieces,
         )
-        .filter(BlockInventory.is_active == True)
-        .group_by(BlockInventory.location_id)
-        .all()
-    )
-    block_map = {r.location_id: r for r in block_rows}
-
-    table_rows = (
-        db.query(
-            TableInventory.location_id.label("location_id"),
-            func.coalesce(func.sum(TableInventory.piece_count), 0).label("table_pieces"),
-        )
-        .filter(TableInventory.is_active == True)
-        .group_by(TableInventory.location_id)
+        .outerjoin(totals, totals.c.location_id == Location.id)
+        .filter(Location.is_active == True)
+        .order_by(Location.name.asc())
         .all()
     )
-    table_map = {r.location_id: r for r in table_rows}
-
-    out = []
-    for loc in locs:
-        slab = slab_map.get(loc.id)
-        tile = tile_map.get(loc.id)
-        block = block_map.get(loc.id)
-        table = table_map.get(loc.id)
-
-        out.append({
-            "location_id": loc.id,
-            "location_name": loc.name,
 
-            "slab_count": int(getattr(slab, "slab_count", 0) or 0),
-            "slab_sqft": float(getattr(slab, "slab_sqft", 0) or 0),
+    return [
+        {
+            "location_id": r.id,
+            "location_name": r.name,
 
-            "tile_boxes": int(getattr(tile, "tile_boxes", 0) or 0),
-            "tile_sqft": float(getattr(tile, "tile_sqft", 0) or 0),
+            "slab_count": int(r.slab_count or 0),
+            "slab_sqft": float(r.slab_sqft or 0),
 
-            "block_pieces": int(getattr(block, "block_pieces", 0) or 0),
-            "table_pieces": int(getattr(table, "table_pieces", 0) or 0),
-        })
+            "tile_boxes": int(r.tile_boxes or 0),
+            "tile_sqft": float(r.tile_sqft or 0),
 
-    return out
+            "block_pieces": int(r.block_pieces or 0),
+            "table_pieces": int(r.table_pieces or 0),
+        }
+        for r in rows
+    ]
 
 
-def location_stock_by_item(db, location_id=None, category="ALL", q_text=""):
+def location_stock_by_item(db, location_id=None, category="ALL", q_text="", as_of=None):
     """
     Item-wise per-location stock list.
     Returns list of dict:
     { sku, name, category, primary_qty, secondary_qty, location_name, primary_unit, secondary_unit }
     - SLAB/TILE: primary=total_sqft, secondary=slab_count/box_count
     - BLOCK/TABLE: primary=piece_count, secondary=None
+    One grouped statement over inventory_union(), sorted by the DB (location, category, sku).
+    as_of => same over the ledger stock at that time.
     """
     q_text = (q_text or "").strip()
     cat = (category or "ALL").upper()
 
-    def apply_item_filter(query):
-        query = query.filter(Item.is_active == True)
-
-        if cat and cat != "ALL":
-            query = query.filter(Item.category == cat)
+    if cat == "ALL":
+        kinds = KINDS
+    elif cat in KINDS:
+        kinds = (cat,)
+    else:
+        return []
+
+    inv = _stock_source(db, as_of, kinds, location_id=location_id)
+
+    # group the raw inventory rows first (per kind / item / location), then join names onto
+    # the much smaller result
+    stock = (
+        select(
+            inv.c.kind, inv.c.item_id, inv.c.location_id,
+            func.coalesce(func.sum(inv.c.qty_primary), 0).label("primary_qty"),
+            func.sum(inv.c.qty_secondary).label("secondary_qty"),
+        )
+        .group_by(inv.c.kind, inv.c.item_id, inv.c.location_id)
+        .subquery("stock")
+    )
+    location_name = func.coalesce(Location.name, "")
 
-        if q_text:
-            like = f"%{q_text}%"
-            query = query.filter((Item.sku.ilike(like)) | (Item.name.ilike(like)))
+    q = (
+        db.query(
+            Item.sku, Item.name, Item.category, stock.c.kind,
+            location_name.label("location_name"),
+            stock.c.primary_qty, stock.c.secondary_qty,
+        )
+        .select_from(stock)
+        .join(Item, Item.id == stock.c.item_id)
+        .outerjoin(Location, Location.id == stock.c.location_id)
+        .filter(Item.is_active == True)
+    )
+    if cat != "ALL":
+        q = q.filter(Item.category == cat)
+    if q_text:
+        # SKU / name only (what the report's search box says), not the item picker's wider match
+        like = f"%{q_text}%"
+        q = q.filter(Item.sku.ilike(like) | Item.name.ilike(like))
 
-        return query
+    q = q.order_by(location_name, Item.category, Item.sku, stock.c.kind)
 
     results = []
-
-    # SLABS
-    if cat in ("ALL", "SLAB"):
-        slab_q = (
-            db.query(
-                Item.sku, Item.name, Item.category,
-                Location.name.label("location_name"),
-                func.coalesce(func.sum(SlabInventory.total_sqft), 0).label("primary_qty"),
-                func.coalesce(func.sum(SlabInventory.slab_count), 0).label("secondary_qty"),
-            )
-            .join(SlabInventory, SlabInventory.item_id == Item.id)
-            .outerjoin(Location, Location.id == SlabInventory.location_id)
-            .filter(SlabInventory.is_active == True)
-            .group_by(Item.sku, Item.name, Item.category, Location.name)
-        )
-        slab_q = apply_item_filter(slab_q)
-        if location_id is not None:
-            slab_q = slab_q.filter(SlabInventory.location_id == location_id)
-
-        for r in slab_q.all():
-            results.append({
-                "sku": r.sku,
-                "name": r.name,
-                "category": r.category,
-                "location_name": r.location_name or "",
-                "primary_qty": float(r.primary_qty or 0),
-                "secondary_qty": int(r.secondary_qty or 0),
-                "primary_unit": "sqft",
-                "secondary_unit": "slab",
-            })
-
-    # TILES
-    if cat in ("ALL", "TILE"):
-        tile_q = (
-            db.query(
-                Item.sku, Item.name, Item.category,
-                Location.name.label("location_name"),
-                func.coalesce(func.sum(TileInventory.total_sqft), 0).label("primary_qty"),
-                func.coalesce(func.sum(TileInventory.box_count), 0).label("secondary_qty"),
-            )
-            .join(TileInventory, TileInventory.item_id == Item.id)
-            .outerjoin(Location, Location.id == TileInventory.location_id)
-            .filter(TileInventory.is_active == True)
-            .group_by(Item.sku, Item.name, Item.category, Location.name)
-        )
-        tile_q = apply_item_filter(tile_q)
-        if location_id is not None:
-            tile_q = tile_q.filter(TileInventory.location_id == location_id)
-
-        for r in tile_q.all():
-            results.append({
-                "sku": r.sku,
-                "name": r.name,
-                "category": r.category,
-                "location_name": r.location_name or "",
-                "primary_qty": float(r.primary_qty or 0),
-                "secondary_qty": int(r.secondary_qty or 0),
-                "primary_unit": "sqft",
-                "secondary_unit": "box",
-            })
-
-    # BLOCKS
-    if cat in ("ALL", "BLOCK"):
-        block_q = (
-            db.query(
-                Item.sku, Item.name, Item.category,
-                Location.name.label("location_name"),
-                func.coalesce(func.sum(BlockInventory.piece_count), 0).label("primary_qty"),
-            )
-            .join(BlockInventory, BlockInventory.item_id == Item.id)
-            .outerjoin(Location, Location.id == BlockInventory.location_id)
-            .filter(BlockInventory.is_active == True)
-            .group_by(Item.sku, Item.name, Item.category, Location.name)
-        )
-        block_q = apply_item_filter(block_q)
-        if location_id is not None:
-            block_q = block_q.filter(BlockInventory.location_id == location_id)
-
-        for r in block_q.all():
-            results.append({
-                "sku": r.sku,
-                "name": r.name,
-                "category": r.category,
-                "location_name": r.location_name or "",
-                "primary_qty": float(r.primary_qty or 0),
-                "secondary_qty": None,
-                "primary_unit": "piece",
-                "secondary_unit": None,
-            })
-
-    # TABLES
-    if cat in ("ALL", "TABLE"):
-        table_q = (
-            db.query(
-                Item.sku, Item.name, Item.category,
-                Location.name.label("location_name"),
-                func.coalesce(func.sum(TableInventory.piece_count), 0).label("primary_qty"),
-            )
-            .join(TableInventory, TableInventory.item_id == Item.id)
-            .outerjoin(Location, Location.id == TableInventory.location_id)
-            .filter(TableInventory.is_active == True)
-            .group_by(Item.sku, Item.name, Item.category, Location.name)
-        )
-        table_q = apply_item_filter(table_q)
-        if location_id is not None:
-            table_q = table_q.filter(TableInventory.location_id == location_id)
-
-        for r in table_q.all():
-            results.append({
-                "sku": r.sku,
-                "name": r.name,
-                "category": r.category,
-                "location_name": r.location_name or "",
-                "primary_qty": float(r.primary_qty or 0),
-                "secondary_qty": None,
-                "primary_unit": "piece",
-                "secondary_unit": None,
-            })
-
-    results.sort(key=lambda x: (x["location_name"], x["category"], x["sku"]))
+    for r in q.all():
+        primary_unit, secondary_unit = UNITS[r.kind]
+        results.append({
+            "sku": r.sku,
+            "name": r.name,
+            "category": r.category,
+            "location_name": r.location_name or "",
+            "primary_qty": float(r.primary_qty or 0),
+            "secondary_qty": int(r.secondary_qty or 0) if secondary_unit else None,
+            "primary_unit": primary_unit,
+            "secondary_unit": secondary_unit,
+        })
     return results
@@ -7,12 +7,10 @@ from src.db.models import (
     PurchaseReturn, PurchaseReturnItem
 )
 
-from src.db.ledger_repo import add_ledger_entry, get_stock_balance
-
-from src.db.slab_repo import create_slab_entry
-from src.db.tile_repo import create_tile_entry
-from src.db.block_repo import create_block_entry
-from src.db.table_repo import create_table_entry
+from src.db.ledger_repo import add_ledger_entry
+from src.db.item_repo import get_items_by_ids
+from src.db.stock_lock import lock_stock_balances, retry_on_conflict
+from src.db.inventory_repo import inventory_row, bulk_insert
 
 
 def _pos_float(v):
@@ -58,14 +56,15 @@ def _validate_return_row(item: Item, qty_primary, qty_secondary):
             raise ValueError(f"{cat} requires secondary qty (slab/box) for {item.sku} — {item.name}")
 
 
-def _validate_stock_or_raise(db, item: Item, location_id: int, qty_primary, qty_secondary):
+def _validate_stock_or_raise(item: Item, available: tuple, qty_primary, qty_secondary):
     """
-    Used for PURCHASE RETURN (because it DEDUCTS stock).
+    Used for PURCHASE RETURN + sale return cancel (both DEDUCT stock).
     SLAB/TILE: validate both primary and secondary
     BLOCK/TABLE: validate primary only
+    available = prefetched (primary, secondary) minus earlier lines of the same return
     """
     cat = (item.category or "").upper()
-    available_primary, available_secondary = get_stock_balance(db, item.id, location_id)
+    available_primary, available_secondary = available
 
     req_primary = _pos_float(qty_primary)
     req_secondary = _pos_int(qty_secondary) if qty_secondary is not None else 0
@@ -97,6 +96,7 @@ def _validate_stock_or_raise(db, item: Item, location_id: int, qty_primary, qty_
 # -------------------------------------------------------
 # SALE RETURN  (stock ADD back, ledger POSITIVE)
 # -------------------------------------------------------
+@retry_on_conflict
 def create_sale_return(db, payload: dict) -> SaleReturn:
     customer = (payload.get("customer_name") or payload.get("party_name") or "").strip() or None
     notes = (payload.get("notes") or "").strip() or None
@@ -109,23 +109,31 @@ def create_sale_return(db, payload: dict) -> SaleReturn:
     if not rows:
         raise ValueError("At least one line is required.")
 
+    items = get_items_by_ids(db, [r.get("item_id") for r in rows])
+
     for r in rows:
         item_id = r.get("item_id")
         if not item_id:
             raise ValueError("Invalid item.")
 
-        item = db.query(Item).get(item_id)
+        item = items.get(int(item_id))
         if not item:
             raise ValueError("Item not found.")
 
         _validate_return_row(item, r.get("qty_primary"), r.get("qty_secondary"))
 
+    # stock goes up, nothing to validate; lock anyway so row locks are taken in item_id order
+    lock_stock_balances(db, items.keys(), int(location_id))
+
     sr = SaleReturn(customer_name=customer, location_id=location_id, notes=notes)
     db.add(sr)
     db.flush()
 
+    note_text = f"SaleReturn#{sr.id}" + (f" — {customer}" if customer else "")
+
+    staged = []
     for r in rows:
-        item = db.query(Item).get(r["item_id"])
+        item = items[int(r["item_id"])]
         cat = (item.category or "").upper()
 
         unit_primary = item.unit_primary or ("piece" if cat in ("BLOCK", "TABLE") else "sqft")
@@ -134,14 +142,14 @@ def create_sale_return(db, payload: dict) -> SaleReturn:
         qty_primary = _pos_float(r.get("qty_primary"))
         qty_secondary = _pos_int(r.get("qty_secondary")) if cat in ("SLAB", "TILE") else None
 
-        db.add(SaleReturnItem(
+        staged.append((SaleReturnItem, dict(
             sale_return_id=sr.id,
             item_id=item.id,
             qty_primary=qty_primary,
             qty_secondary=qty_secondary,
             unit_primary=unit_primary,
             unit_secondary=unit_secondary
-        ))
+        )))
 
         add_ledger_entry(
             db=db,
@@ -156,45 +164,15 @@ def create_sale_return(db, payload: dict) -> SaleReturn:
             ref_id=sr.id
         )
 
-        note_text = f"SaleReturn#{sr.id}" + (f" — {customer}" if customer else "")
-
-        if cat == "SLAB":
-            create_slab_entry(db, {
-                "item_id": item.id,
-                "slab_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TILE":
-            create_tile_entry(db, {
-                "item_id": item.id,
-                "box_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "BLOCK":
-            create_block_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TABLE":
-            create_table_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=1))
 
+    bulk_insert(db, staged)
     db.commit()
     db.refresh(sr)
     return sr
 
 
-def list_sale_returns(db, q_text: str = "", limit: int = 300):
+def list_sale_returns(db, q_text: str = "", limit: int = 300, offset: int = 0):
     q = (
         db.query(SaleReturn)
         .options(joinedload(SaleReturn.location))
@@ -203,7 +181,7 @@ def list_sale_returns(db, q_text: str = "", limit: int = 300):
     if q_text:
         like = f"%{q_text}%"
         q = q.filter(SaleReturn.customer_name.ilike(like))
-    return q.limit(limit).all()
+    return q.offset(offset).limit(limit).all()
 
 
 def get_sale_return_details(db, return_id: int):
@@ -221,6 +199,7 @@ def get_sale_return_details(db, return_id: int):
 # -------------------------------------------------------
 # PURCHASE RETURN  (stock DEDUCT, ledger NEGATIVE)
 # -------------------------------------------------------
+@retry_on_conflict
 def create_purchase_return(db, payload: dict) -> PurchaseReturn:
     vendor = (payload.get("vendor_name") or payload.get("party_name") or "").strip() or None
     notes = (payload.get("notes") or "").strip() or None
@@ -233,24 +212,36 @@ def create_purchase_return(db, payload: dict) -> PurchaseReturn:
     if not rows:
         raise ValueError("At least one line is required.")
 
+    items = get_items_by_ids(db, [r.get("item_id") for r in rows])
+    available = lock_stock_balances(db, items.keys(), int(location_id))
+
     for r in rows:
         item_id = r.get("item_id")
         if not item_id:
             raise ValueError("Invalid item.")
 
-        item = db.query(Item).get(item_id)
+        item = items.get(int(item_id))
         if not item:
             raise ValueError("Item not found.")
 
         _validate_return_row(item, r.get("qty_primary"), r.get("qty_secondary"))
-        _validate_stock_or_raise(db, item, location_id, r.get("qty_primary"), r.get("qty_secondary"))
+        _validate_stock_or_raise(item, available[item.id], r.get("qty_primary"), r.get("qty_secondary"))
+
+        pri, sec = available[item.id]
+        available[item.id] = (
+            pri - _pos_float(r.get("qty_primary")),
+            sec - (_pos_int(r.get("qty_secondary")) if r.get("qty_secondary") is not None else 0),
+        )
 
     pr = PurchaseReturn(vendor_name=vendor, location_id=location_id, notes=notes)
     db.add(pr)
     db.flush()
 
+    note_text = f"PurchaseReturn#{pr.id}" + (f" — {vendor}" if vendor else "")
+
+    staged = []
     for r in rows:
-        item = db.query(Item).get(r["item_id"])
+        item = items[int(r["item_id"])]
         cat = (item.category or "").upper()
 
         unit_primary = item.unit_primary or ("piece" if cat in ("BLOCK", "TABLE") else "sqft")
@@ -259,14 +250,14 @@ def create_purchase_return(db, payload: dict) -> PurchaseReturn:
         qty_primary = _pos_float(r.get("qty_primary"))
         qty_secondary = _pos_int(r.get("qty_secondary")) if cat in ("SLAB", "TILE") else None
 
-        db.add(PurchaseReturnItem(
+        staged.append((PurchaseReturnItem, dict(
             purchase_return_id=pr.id,
             item_id=item.id,
             qty_primary=qty_primary,
             qty_secondary=qty_secondary,
             unit_primary=unit_primary,
             unit_secondary=unit_secondary
-        ))
+        )))
 
         add_ledger_entry(
             db=db,
@@ -278,48 +269,19 @@ def create_purchase_return(db, payload: dict) -> PurchaseReturn:
             unit_primary=unit_primary,
             unit_secondary=unit_secondary,
             ref_type="purchase_return",
-            ref_id=pr.id
+            ref_id=pr.id,
+            allow_negative=False,
         )
 
-        note_text = f"PurchaseReturn#{pr.id}" + (f" — {vendor}" if vendor else "")
-
-        if cat == "SLAB":
-            create_slab_entry(db, {
-                "item_id": item.id,
-                "slab_count": -int(qty_secondary or 0),
-                "total_sqft": _neg(qty_primary) or 0,
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TILE":
-            create_tile_entry(db, {
-                "item_id": item.id,
-                "box_count": -int(qty_secondary or 0),
-                "total_sqft": _neg(qty_primary) or 0,
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "BLOCK":
-            create_block_entry(db, {
-                "item_id": item.id,
-                "piece_count": -int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TABLE":
-            create_table_entry(db, {
-                "item_id": item.id,
-                "piece_count": -int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=-1))
 
+    bulk_insert(db, staged)
     db.commit()
     db.refresh(pr)
     return pr
 
 
-def list_purchase_returns(db, q_text: str = "", limit: int = 300):
+def list_purchase_returns(db, q_text: str = "", limit: int = 300, offset: int = 0):
     q = (
         db.query(PurchaseReturn)
         .options(joinedload(PurchaseReturn.location))
@@ -328,7 +290,7 @@ def list_purchase_returns(db, q_text: str = "", limit: int = 300):
     if q_text:
         like = f"%{q_text}%"
         q = q.filter(PurchaseReturn.vendor_name.ilike(like))
-    return q.limit(limit).all()
+    return q.offset(offset).limit(limit).all()
 
 
 def get_purchase_return_details(db, return_id: int):
@@ -379,6 +341,7 @@ def _is_cancelled(notes: str | None) -> bool:
     return "[CANCELLED]" in t or "CANCELLED" in t
 
 
+@retry_on_conflict
 def cancel_sale_return(db, return_id: int, reason: str | None = None):
     sr = get_sale_return_details(db, return_id)
     if not sr:
@@ -389,6 +352,17 @@ def cancel_sale_return(db, return_id: int, reason: str | None = None):
     location_id = getattr(sr, "location_id", None)
     party = getattr(sr, "customer_name", None)
 
+    note_text = f"SaleReturnCancel#{sr.id}" + (f" — {party}" if party else "")
+    if reason:
+        note_text += f" ({reason})"
+
+    # cancel takes the returned stock back out => same lock + guard as a sale
+    # (returned goods may already be sold again)
+    available = {}
+    if location_id:
+        available = lock_stock_balances(db, [li.item_id for li in (sr.items or [])], int(location_id))
+
+    staged = []
     for li in (sr.items or []):
         item = li.item
         if not item:
@@ -398,6 +372,11 @@ def cancel_sale_return(db, return_id: int, reason: str | None = None):
         qty_primary = float(li.qty_primary or 0)
         qty_secondary = (int(li.qty_secondary) if li.qty_secondary is not None else None)
 
+        if item.id in available:
+            _validate_stock_or_raise(item, available[item.id], qty_primary, qty_secondary)
+            pri, sec = available[item.id]
+            available[item.id] = (pri - qty_primary, sec - (qty_secondary or 0))
+
         # SALE_RETURN cancel => reverse (negative)
         add_ledger_entry(
             db=db,
@@ -409,21 +388,13 @@ def cancel_sale_return(db, return_id: int, reason: str | None = None):
             unit_primary=li.unit_primary,
             unit_secondary=li.unit_secondary,
             ref_type="sale_return",
-            ref_id=sr.id
+            ref_id=sr.id,
+            allow_negative=False,
         )
 
-        note_text = f"SaleReturnCancel#{sr.id}" + (f" — {party}" if party else "")
-        if reason:
-            note_text += f" ({reason})"
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=-1))
 
-        if cat == "SLAB":
-            create_slab_entry(db, {"item_id": item.id, "slab_count": -int(qty_secondary or 0), "total_sqft": _neg(qty_primary), "location_id": location_id, "notes": note_text})
-        elif cat == "TILE":
-            create_tile_entry(db, {"item_id": item.id, "box_count": -int(qty_secondary or 0), "total_sqft": _neg(qty_primary), "location_id": location_id, "notes": note_text})
-        elif cat == "BLOCK":
-            create_block_entry(db, {"item_id": item.id, "piece_count": -int(qty_primary or 0), "location_id": location_id, "notes": note_text})
-        elif cat == "TABLE":
-            create_table_entry(db, {"item_id": item.id, "piece_count": -int(qty_primary or 0), "location_id": location_id, "notes": note_text})
+    bulk_insert(db, staged)
 
     base = (getattr(sr, "notes", None) or "").strip()
     stamp = "[CANCELLED]"
@@ -446,6 +417,11 @@ def cancel_purchase_return(db, return_id: int, reason: str | None = None):
     location_id = getattr(pr, "location_id", None)
     party = getattr(pr, "vendor_name", None)
 
+    note_text = f"PurchaseReturnCancel#{pr.id}" + (f" — {party}" if party else "")
+    if reason:
+        note_text += f" ({reason})"
+
+    staged = []
     for li in (pr.items or []):
         item = li.item
         if not item:
@@ -469,18 +445,9 @@ def cancel_purchase_return(db, return_id: int, reason: str | None = None):
             ref_id=pr.id
         )
 
-        note_text = f"PurchaseReturnCancel#{pr.id}" + (f" — {party}" if party else "")
-        if reason:
-            note_text += f" ({reason})"
-
-        if cat == "SLAB":
-            create_slab_entry(db, {"item_id": item.id, "slab_count": int(qty_secondary or 0), "total_sqft": float(qty_primary), "location_id": location_id, "notes": note_text})
-        elif cat == "TILE":
-            create_tile_entry(db, {"item_id": item.id, "box_count": int(qty_secondary or 0), "total_sqft": float(qty_primary), "location_id": location_id, "notes": note_text})
-        elif cat == "BLOCK":
-            create_block_entry(db, {"item_id": item.id, "piece_count": int(qty_primary or 0), "location_id": location_id, "notes": note_text})
-        elif cat == "TABLE":
-            create_table_entry(db, {"item_id": item.id, "piece_count": int(qty_primary or 0), "location_id": location_id, "notes": note_text})
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=1))
+
+    bulk_insert(db, staged)
 
     base = (getattr(pr, "notes", None) or "").strip()
     stamp = "[CANCELLED]"
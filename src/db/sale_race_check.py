@@ -0,0 +1,122 @@
+# src/db/sale_race_check.py
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.db.session import get_db
+from src.db.models import Item, Location
+from src.db.item_repo import create_item
+from src.db.purchase_repo import create_purchase
+from src.db.sales_repo import create_sale
+from src.db.ledger_repo import get_stock_balance, verify_stock_balances
+
+
+def _arg(argv, name, default):
+    if name in argv:
+        try:
+            return int(argv[argv.index(name) + 1])
+        except Exception:
+            pass
+    return default
+
+
+def main(argv=None):
+    """
+    Concurrency check for create_sale (run against a TEST database, it writes data):
+
+    python -m src.db.sale_race_check --yes [--stock 5] [--workers 8] [--sales 40]
+
+    Stocks one throw-away BLOCK item with --stock pieces, then fires --sales parallel
+    1-piece sales from --workers threads (own session each, all released together).
+    Pass = exactly --stock sales succeed, balance ends at 0 (never negative),
+    and stock_balance still matches the ledger.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if "--yes" not in argv:
+        print("This writes a test item + purchase + sales into DATABASE_URL. Re-run with --yes.")
+        return 2
+
+    stock = _arg(argv, "--stock", 5)
+    workers = _arg(argv, "--workers", 8)
+    sales = _arg(argv, "--sales", 40)
+
+    with get_db() as db:
+        loc = db.query(Location).filter(Location.is_active == True).order_by(Location.id).first()
+        if not loc:
+            print("No active location. Run init_db first.")
+            return 2
+        location_id = loc.id
+
+        item = create_item(db, {
+            "sku": f"RACE-{int(time.time() * 1000)}",
+            "name": "Race check (safe to delete)",
+            "category": "BLOCK",
+            "unit_primary": "piece",
+        })
+        item_id = item.id
+
+        create_purchase(db, {
+            "vendor_name": "race-check",
+            "location_id": location_id,
+            "rows": [{"item_id": item_id, "qty_primary": stock}],
+        })
+
+    # fewer sales than workers => only that many ever reach the gate
+    first_wave = max(1, min(workers, sales))
+    gate = threading.Barrier(first_wave)
+    results = {"ok": 0, "rejected": 0, "errors": []}
+    lock = threading.Lock()
+
+    def sell(n):
+        if n < first_wave:
+            gate.wait()  # first wave starts at the same instant
+        try:
+            with get_db() as db:
+                create_sale(db, {
+                    "customer_name": f"race-{n}",
+                    "location_id": location_id,
+                    "rows": [{"item_id": item_id, "qty_primary": 1}],
+                })
+            with lock:
+                results["ok"] += 1
+        except ValueError:
+            with lock:
+                results["rejected"] += 1
+        except Exception as e:
+            with lock:
+                results["errors"].append(repr(e))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(sell, range(sales)))
+    elapsed = time.perf_counter() - t0
+
+    with get_db() as db:
+        pri, _sec = get_stock_balance(db, item_id, location_id)
+        drift = [d for d in verify_stock_balances(db) if d["item_id"] == item_id]
+
+        # park the test item so it doesn't show up in pickers
+        it = db.query(Item).get(item_id)
+        if it:
+            it.is_active = False
+            db.commit()
+
+    print(f"item={item_id} stock={stock} workers={workers} sales={sales}  ({elapsed:.2f}s)")
+    print(f"  sold={results['ok']} rejected={results['rejected']} errors={len(results['errors'])}")
+    print(f"  final balance={pri:.3f}  drift={len(drift)}")
+    for e in results["errors"][:5]:
+        print("  error:", e)
+
+    passed = (
+        pri >= 0
+        and results["ok"] == min(stock, sales)
+        and not drift
+        and not results["errors"]
+    )
+    print("PASS ✅" if passed else "FAIL ❌")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,10 @@ from __future__ import annotations
 from sqlalchemy.orm import joinedload
 
 from src.db.models import Sale, SaleItem, Item
-from src.db.ledger_repo import add_ledger_entry, get_stock_balance
-
-from src.db.slab_repo import create_slab_entry
-from src.db.tile_repo import create_tile_entry
-from src.db.block_repo import create_block_entry
-from src.db.table_repo import create_table_entry
+from src.db.ledger_repo import add_ledger_entry
+from src.db.item_repo import get_items_by_ids
+from src.db.stock_lock import lock_stock_balances, retry_on_conflict
+from src.db.inventory_repo import inventory_row, bulk_insert
 
 
 def _neg(v):
@@ -33,10 +31,14 @@ def _to_int(v, default=0):
         return default
 
 
-def _validate_stock_or_raise(db, item: Item, location_id: int, qty_primary, qty_secondary):
+def _validate_stock_or_raise(item: Item, available: tuple, qty_primary, qty_secondary):
+    """
+    available = (primary, secondary) still free for this item at the location
+    (prefetched balance minus earlier lines of the same document).
+    """
     cat = (item.category or "").upper()
 
-    avail_primary, avail_secondary = get_stock_balance(db, item.id, location_id)
+    avail_primary, avail_secondary = available
 
     req_primary = _to_float(qty_primary, 0.0)
     req_secondary = _to_int(qty_secondary, 0) if qty_secondary is not None else 0
@@ -77,6 +79,7 @@ def _validate_stock_or_raise(db, item: Item, location_id: int, qty_primary, qty_
         )
 
 
+@retry_on_conflict
 def create_sale(db, payload: dict) -> Sale:
     customer = (payload.get("customer_name") or "").strip() or None
     notes = (payload.get("notes") or "").strip() or None
@@ -89,20 +92,32 @@ def create_sale(db, payload: dict) -> Sale:
     if not rows:
         raise ValueError("No sale rows found.")
 
+    # 2 queries total (items + balances), whatever the number of lines.
+    # balance rows stay locked (FOR UPDATE) till commit => other counters wait, no oversell
+    items = get_items_by_ids(db, [r.get("item_id") for r in rows])
+    available = lock_stock_balances(db, items.keys(), int(location_id))
+
     prepared = []
     for r in rows:
         item_id = r.get("item_id")
         if not item_id:
             continue
 
-        item = db.query(Item).get(item_id)
+        item = items.get(int(item_id))
         if not item:
             continue
 
         qty_secondary = r.get("qty_secondary")
         qty_primary = r.get("qty_primary")
 
-        _validate_stock_or_raise(db, item, int(location_id), qty_primary, qty_secondary)
+        _validate_stock_or_raise(item, available[item.id], qty_primary, qty_secondary)
+
+        # same item on two lines => second line sees what the first one left
+        pri, sec = available[item.id]
+        available[item.id] = (
+            pri - _to_float(qty_primary, 0.0),
+            sec - (_to_int(qty_secondary, 0) if qty_secondary is not None else 0),
+        )
 
         prepared.append((item, _to_float(qty_primary), (None if qty_secondary is None else _to_int(qty_secondary))))
 
@@ -113,20 +128,24 @@ def create_sale(db, payload: dict) -> Sale:
     db.add(s)
     db.flush()
 
+    note_text = f"Sale#{s.id}" + (f" — {customer}" if customer else "")
+
+    # stage everything, insert in bulk, commit ONCE for the whole document
+    staged = []
     for (item, qty_primary, qty_secondary) in prepared:
         cat = (item.category or "").upper()
         unit_primary = item.unit_primary or ("piece" if cat in ("BLOCK", "TABLE") else "sqft")
         unit_secondary = item.unit_secondary
 
         # line
-        db.add(SaleItem(
+        staged.append((SaleItem, dict(
             sale_id=s.id,
             item_id=item.id,
             qty_primary=float(qty_primary or 0),
             qty_secondary=(None if cat in ("BLOCK", "TABLE") else (None if qty_secondary is None else int(qty_secondary))),
             unit_primary=unit_primary,
             unit_secondary=unit_secondary
-        ))
+        )))
 
         # ledger (SALE negative)
         add_ledger_entry(
@@ -139,43 +158,14 @@ def create_sale(db, payload: dict) -> Sale:
             unit_primary=unit_primary,
             unit_secondary=unit_secondary,
             ref_type="sale",
-            ref_id=s.id
+            ref_id=s.id,
+            allow_negative=False,
         )
 
-        note_text = f"Sale#{s.id}" + (f" — {customer}" if customer else "")
-
         # inventory (deduct)
-        if cat == "SLAB":
-            create_slab_entry(db, {
-                "item_id": item.id,
-                "slab_count": -_to_int(qty_secondary),
-                "total_sqft": _neg(qty_primary),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TILE":
-            create_tile_entry(db, {
-                "item_id": item.id,
-                "box_count": -_to_int(qty_secondary),
-                "total_sqft": _neg(qty_primary),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "BLOCK":
-            create_block_entry(db, {
-                "item_id": item.id,
-                "piece_count": -_to_int(qty_primary),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TABLE":
-            create_table_entry(db, {
-                "item_id": item.id,
-                "piece_count": -_to_int(qty_primary),
-                "location_id": location_id,
-                "notes": note_text
-            })
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=-1))
 
+    bulk_insert(db, staged)
     db.commit()
     db.refresh(s)
     return s
@@ -223,6 +213,9 @@ def cancel_sale(db, sale_id: int):
     if not items:
         raise ValueError("Sale has no line items.")
 
+    note_text = f"SaleCancel#{sale.id}" + (f" — {customer}" if customer else "")
+
+    staged = []
     for line in items:
         item = line.item
         if not item:
@@ -249,38 +242,9 @@ def cancel_sale(db, sale_id: int):
             ref_id=sale.id
         )
 
-        note_text = f"SaleCancel#{sale.id}" + (f" — {customer}" if customer else "")
-
-        if cat == "SLAB":
-            create_slab_entry(db, {
-                "item_id": item.id,
-                "slab_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TILE":
-            create_tile_entry(db, {
-                "item_id": item.id,
-                "box_count": int(qty_secondary or 0),
-                "total_sqft": float(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "BLOCK":
-            create_block_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
-        elif cat == "TABLE":
-            create_table_entry(db, {
-                "item_id": item.id,
-                "piece_count": int(qty_primary or 0),
-                "location_id": location_id,
-                "notes": note_text
-            })
+        staged.append(inventory_row(cat, item.id, location_id, qty_primary, qty_secondary, note_text, sign=1))
+
+    bulk_insert(db, staged)
 
     # optional flag if your model has it
     try:
@@ -1,30 +1,76 @@
 # src/db/security.py
+"""
+Password hashes: "pbkdf2$<iterations>$<salt_b64>$<hash_b64>"  (PBKDF2-HMAC-SHA256, 32 bytes)
+
+- iterations live inside every hash => changing the cost never locks anyone out:
+  old hashes still verify with THEIR count, and get rehashed on the next login (needs_rehash)
+- cost for new hashes: MARBLE_PBKDF2_ITERATIONS in .env (default 200000, min 50000)
+- legacy "pbkdf2$<salt_b64>$<hash_b64>" (fixed 200000) still verifies
+"""
 import os
 import hmac
 import base64
 import hashlib
 
+DEFAULT_ITERATIONS = 200_000
+MIN_ITERATIONS = 50_000
+LEGACY_ITERATIONS = 200_000  # old 3-part format
+
+
+def pbkdf2_iterations() -> int:
+    """Cost for NEW hashes (env, clamped to MIN_ITERATIONS; bad value => default)."""
+    raw = os.getenv("MARBLE_PBKDF2_ITERATIONS", "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_ITERATIONS
+    except ValueError:
+        value = DEFAULT_ITERATIONS
+    return max(MIN_ITERATIONS, value)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", (password or "").encode("utf-8"), salt, iterations, dklen=32)
 
-def hash_password(password: str) -> str:
-    """
-    Returns: "pbkdf2$<salt_b64>$<hash_b64>"
-    """
-    password = (password or "").encode("utf-8")
+
+def hash_password(password: str, iterations: int | None = None) -> str:
+    iterations = iterations or pbkdf2_iterations()
     salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password, salt, 200_000, dklen=32)
-    return "pbkdf2$" + base64.b64encode(salt).decode() + "$" + base64.b64encode(dk).decode()
+    dk = _pbkdf2(password, salt, iterations)
+    return f"pbkdf2${iterations}$" + base64.b64encode(salt).decode() + "$" + base64.b64encode(dk).decode()
+
+
+def parse_hash(stored: str):
+    """-> (iterations, salt, hash) for both formats. ValueError if it isn't a pbkdf2 hash."""
+    if not stored or not stored.startswith("pbkdf2$"):
+        raise ValueError("Not a pbkdf2 hash.")
+
+    parts = stored.split("$")
+    if len(parts) == 3:
+        _, salt_b64, hash_b64 = parts
+        iterations = LEGACY_ITERATIONS
+    elif len(parts) == 4:
+        _, iter_s, salt_b64, hash_b64 = parts
+        iterations = int(iter_s)
+        if iterations <= 0:
+            raise ValueError("Bad iteration count.")
+    else:
+        raise ValueError("Bad pbkdf2 hash.")
+
+    return iterations, base64.b64decode(salt_b64.encode()), base64.b64decode(hash_b64.encode())
 
 
 def verify_password(password: str, stored: str) -> bool:
     try:
-        if not stored or not stored.startswith("pbkdf2$"):
-            return False
+        iterations, salt, expected = parse_hash(stored)
+        return hmac.compare_digest(_pbkdf2(password, salt, iterations), expected)
+    except Exception:
+        return False
 
-        _, salt_b64, hash_b64 = stored.split("$", 2)
-        salt = base64.b64decode(salt_b64.encode())
-        expected = base64.b64decode(hash_b64.encode())
 
-        dk = hashlib.pbkdf2_hmac("sha256", (password or "").encode("utf-8"), salt, 200_000, dklen=32)
-        return hmac.compare_digest(dk, expected)
+def needs_rehash(stored: str, iterations: int | None = None) -> bool:
+    """Legacy format, or a cost different from the configured one (up OR down)."""
+    try:
+        if len(stored.split("$")) != 4:
+            return True
+        return parse_hash(stored)[0] != (iterations or pbkdf2_iterations())
     except Exception:
-        return False
+        return True
@@ -0,0 +1,94 @@
+# src/db/stock_lock.py
+"""
+Concurrency helpers for posting documents from several counters on one Postgres.
+
+- lock_stock_balances(): SELECT ... FOR UPDATE on the stock_balance rows of a document,
+  always in item_id order (every counter locks in the same order => no lock cycles)
+- retry_on_conflict: re-runs a document function on deadlock / serialization failure
+
+The last line of defence is the guarded UPDATE in ledger_repo (allow_negative=False):
+even without the lock a balance can never be pushed below zero.
+"""
+import functools
+import time
+
+from sqlalchemy.exc import DBAPIError
+
+from src.db.models import StockBalance
+
+
+# postgres SQLSTATEs worth a retry: serialization_failure, deadlock_detected
+RETRY_PGCODES = {"40001", "40P01"}
+MAX_ATTEMPTS = 4
+
+
+def lock_stock_balances(db, item_ids, location_id: int) -> dict:
+    """
+    Locks stock_balance rows for (item_ids, location_id) until commit/rollback.
+    Returns {item_id: (primary, secondary)}; items never stocked here => (0.0, 0).
+
+    SQLite ignores FOR UPDATE (it locks the whole file on write anyway).
+    """
+    ids = sorted({int(i) for i in (item_ids or []) if i})
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(StockBalance.item_id, StockBalance.qty_primary, StockBalance.qty_secondary)
+        .filter(
+            StockBalance.item_id.in_(ids),
+            StockBalance.location_id == location_id,
+        )
+        .order_by(StockBalance.item_id)
+        .with_for_update(of=StockBalance)
+        .all()
+    )
+
+    out = {i: (0.0, 0) for i in ids}
+    for item_id, pri, sec in rows:
+        out[item_id] = (float(pri or 0), int(sec or 0))
+    return out
+
+
+def is_retryable(exc) -> bool:
+    orig = getattr(exc, "orig", None)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code in RETRY_PGCODES:
+        return True
+
+    msg = str(orig or exc).lower()
+
+    # two counters stocking an item at a location for the first time:
+    # loser hits the unique key, on retry the row exists and it becomes an UPDATE
+    if "stock_balance" in msg and ("unique" in msg or "duplicate" in msg):
+        return True
+
+    # sqlite busy timeout
+    return "database is locked" in msg
+
+
+def retry_on_conflict(fn):
+    """
+    Decorator for document functions `fn(db, ...)`.
+    On a retryable DB error: rollback, short backoff, run the whole function again
+    (validation included, so the retry sees the winner's stock).
+    Any other error: rollback (no half-posted document left in the session) and re-raise.
+    """
+    @functools.wraps(fn)
+    def wrapper(db, *args, **kwargs):
+        attempt = 1
+        while True:
+            try:
+                return fn(db, *args, **kwargs)
+            except DBAPIError as e:
+                db.rollback()
+                if attempt >= MAX_ATTEMPTS or not is_retryable(e):
+                    raise
+            except Exception:
+                db.rollback()
+                raise
+
+            time.sleep(0.05 * attempt)
+            attempt += 1
+
+    return wrapper
@@ -0,0 +1,76 @@
+# src/db/stock_snapshots.py
+import sys
+
+from src.db.session import get_db
+from src.db.models import StockSnapshot
+from src.db.ledger_repo import (
+    SNAPSHOT_PERIODS, snapshot_period, due_snapshot_times, take_stock_snapshot, verify_stock_snapshot,
+)
+
+
+def _opt(argv, name, default=None):
+    if name in argv:
+        try:
+            return argv[argv.index(name) + 1]
+        except IndexError:
+            pass
+    return default
+
+
+def main(argv=None):
+    """
+    python -m src.db.stock_snapshots                 -> take every due snapshot (MARBLE_SNAPSHOT_INTERVAL, default month)
+    python -m src.db.stock_snapshots --every day     -> daily checkpoints instead
+    python -m src.db.stock_snapshots --list          -> existing snapshots
+    python -m src.db.stock_snapshots --verify        -> latest snapshot vs a full SUM over stock_ledger
+
+    Run it from cron / Task Scheduler (e.g. nightly); catching up after a pause is automatic.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    period = (_opt(argv, "--every", "") or snapshot_period()).upper()
+    period = {"DAILY": "DAY", "MONTHLY": "MONTH"}.get(period, period)
+    if period not in SNAPSHOT_PERIODS:
+        print(f"--every must be one of: {', '.join(p.lower() for p in SNAPSHOT_PERIODS)}")
+        return 2
+
+    with get_db() as db:
+        if "--list" in argv:
+            snaps = db.query(StockSnapshot).order_by(StockSnapshot.taken_at.desc()).all()
+            if not snaps:
+                print("No stock snapshots yet.")
+            for s in snaps:
+                print(f"  #{s.id}  {s.taken_at:%Y-%m-%d %H:%M}  {s.period:<6} {s.row_count} balance row(s)")
+            return 0
+
+        if "--verify" in argv:
+            snap = db.query(StockSnapshot).order_by(StockSnapshot.taken_at.desc()).first()
+            if snap is None:
+                print("No stock snapshots yet.")
+                return 0
+            drift = verify_stock_snapshot(db, snap)
+            if not drift:
+                print(f"Snapshot #{snap.id} ({snap.taken_at:%Y-%m-%d %H:%M}) matches stock_ledger ✅")
+                return 0
+            print(f"Snapshot #{snap.id}: drift in {len(drift)} item/location balance(s):")
+            for d in drift[:50]:
+                print(
+                    f"  item={d['item_id']} location={d['location_id']}  "
+                    f"ledger=({d['ledger_primary']:.3f}, {d['ledger_secondary']})  "
+                    f"snapshot=({d['snapshot_primary']:.3f}, {d['snapshot_secondary']})"
+                )
+            return 1
+
+        due = due_snapshot_times(db, period)
+        if not due:
+            print(f"{period.lower()} snapshots up to date ✅")
+            return 0
+
+        for t in due:
+            snap = take_stock_snapshot(db, t, period)
+            print(f"  {t:%Y-%m-%d %H:%M}  {snap.row_count} balance row(s)")
+        print(f"{len(due)} {period.lower()} snapshot(s) taken ✅")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
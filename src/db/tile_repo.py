@@ -1,11 +1,12 @@
 # src/db/tile_repo.py
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 from sqlalchemy.orm import joinedload
 
+from src.db.item_search import item_match
 from src.db.models import TileInventory, Item
 
 
-def list_tiles(db, q_text: str = ""):
+def list_tiles(db, q_text: str = "", limit: int | None = None, offset: int = 0):
     q = (
         db.query(TileInventory)
         .options(
@@ -17,11 +18,10 @@ def list_tiles(db, q_text: str = ""):
     )
 
     if q_text:
-        like = f"%{q_text}%"
-        q = q.join(TileInventory.item).filter(
-            or_(Item.sku.ilike(like), Item.name.ilike(like))
-        )
+        q = q.join(TileInventory.item).filter(item_match(q_text))
 
+    if limit:
+        q = q.offset(offset).limit(limit)
     return q.all()
 
 
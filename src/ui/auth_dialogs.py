@@ -1,12 +1,22 @@
 # src/ui/auth_dialogs.py
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QLineEdit, QPushButton,
-    QLabel, QHBoxLayout, QMessageBox, QComboBox
+    QLabel, QHBoxLayout, QMessageBox, QComboBox, QProgressBar
 )
 from PySide6.QtCore import Qt
 
 from src.db.session import get_db
 from src.db.auth_repo import user_count, create_user, authenticate
+from src.ui.utils.background import run_in_background
+
+
+def _busy_bar() -> QProgressBar:
+    bar = QProgressBar()
+    bar.setRange(0, 0)  # endless "working" bar
+    bar.setTextVisible(False)
+    bar.setMaximumHeight(8)
+    bar.hide()
+    return bar
 
 
 class FirstRunAdminDialog(QDialog):
@@ -42,6 +52,9 @@ class FirstRunAdminDialog(QDialog):
         form.addRow("Confirm", self.confirm)
         lay.addLayout(form)
 
+        self.busy = _busy_bar()
+        lay.addWidget(self.busy)
+
         btns = QHBoxLayout()
         btns.addStretch()
         self.create_btn = QPushButton("Create Admin")
@@ -51,6 +64,7 @@ class FirstRunAdminDialog(QDialog):
         self.create_btn.clicked.connect(self.on_create)
 
         self._user = None
+        self._working = False
 
     @property
     def user(self):
@@ -71,16 +85,38 @@ class FirstRunAdminDialog(QDialog):
             QMessageBox.warning(self, "Mismatch", "Password confirmation does not match.")
             return
 
-        try:
+        def work():
             with get_db() as db:
                 if user_count(db) > 0:
-                    QMessageBox.information(self, "Info", "Users already exist. Use login.")
-                    self.reject()
-                    return
-                self._user = create_user(db, u, p, role="ADMIN")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+                    return None
+                return create_user(db, u, p, role="ADMIN")
+
+        # password hashing takes a moment on slow PCs => worker thread, window stays alive
+        self._set_working(True)
+        run_in_background(self, work, self._on_created, self._on_failed)
+
+    def _set_working(self, on: bool):
+        self._working = on
+        self.busy.setVisible(on)
+        for w in (self.username, self.password, self.confirm, self.create_btn):
+            w.setEnabled(not on)
+
+    def _on_created(self, user):
+        self._set_working(False)
+        if user is None:
+            QMessageBox.information(self, "Info", "Users already exist. Use login.")
+            self.reject()
+            return
+        self._user = user
+        self.accept()
+
+    def _on_failed(self, err: str):
+        self._set_working(False)
+        QMessageBox.critical(self, "Error", err)
+
+    def reject(self):
+        if not self._working:  # Esc while saving => wait for it
+            super().reject()
 
 
 class LoginDialog(QDialog):
@@ -104,6 +140,12 @@ class LoginDialog(QDialog):
         form.addRow("Password", self.password)
         lay.addLayout(form)
 
+        self.status = QLabel("")
+        self.status.setStyleSheet("color:#9a9a9a;")
+        lay.addWidget(self.status)
+        self.busy = _busy_bar()
+        lay.addWidget(self.busy)
+
         btns = QHBoxLayout()
         btns.addStretch()
         self.login_btn = QPushButton("Login")
@@ -113,6 +155,7 @@ class LoginDialog(QDialog):
         self.login_btn.clicked.connect(self.on_login)
 
         self._user = None
+        self._working = False
 
     @property
     def user(self):
@@ -126,12 +169,39 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Missing", "Enter username and password.")
             return
 
-        with get_db() as db:
-            user = authenticate(db, u, p)
+        if self._working:
+            return
+
+        def work():
+            with get_db() as db:
+                return authenticate(db, u, p)
+
+        # PBKDF2 verify (+ rehash on upgrade) on a worker => no frozen window
+        self._set_working(True)
+        run_in_background(self, work, self._on_result, self._on_failed)
+
+    def _set_working(self, on: bool):
+        self._working = on
+        self.busy.setVisible(on)
+        self.status.setText("Checking password..." if on else "")
+        for w in (self.username, self.password, self.login_btn):
+            w.setEnabled(not on)
 
+    def _on_result(self, user):
+        self._set_working(False)
         if not user:
             QMessageBox.critical(self, "Invalid", "Wrong username or password.")
+            self.password.setFocus()
+            self.password.selectAll()
             return
 
         self._user = user
         self.accept()
+
+    def _on_failed(self, err: str):
+        self._set_working(False)
+        QMessageBox.critical(self, "Login", f"Could not log in:\n{err}")
+
+    def reject(self):
+        if not self._working:
+            super().reject()
@@ -1,27 +1,35 @@
 # src/ui/main_window.py
+import importlib
+import time
+
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QListWidget,
     QStackedWidget
 )
 
-from src.ui.pages.dashboard import DashboardPage
-from src.ui.pages.items import ItemsPage
-
-# Inventory pages
-from src.ui.pages.slabs import SlabsPage
-from src.ui.pages.tiles import TilesPage
-from src.ui.pages.blocks import BlocksPage
-from src.ui.pages.tables import TablesPage
-
-from src.ui.pages.purchases import PurchasesPage
-from src.ui.pages.ledger import LedgerPage
-from src.ui.pages.sales import SalesPage
-from src.ui.pages.adjustments import AdjustmentsPage
-from src.ui.pages.returns import ReturnsPage
-from src.ui.pages.location_stock_report import LocationStockReportPage
-
 from src.ui.app_state import AppState
-from src.ui.pages.users import UsersPage
+from src.ui.signals import signals
+from src.ui.utils import startup_timing
+
+
+# Page registry: (key, sidebar label, module, class, constructor args)
+# Pages are built LAZILY the first time their sidebar row is selected
+# (several of them hit the DB in __init__). Navigate by key, not by index.
+PAGES = [
+    ("dashboard",    "Dashboard",                  "src.ui.pages.dashboard",             "DashboardPage",           ()),
+    ("items",        "Items / Products",           "src.ui.pages.items",                 "ItemsPage",               ("ALL",)),
+    ("slabs",        "Slabs (Stock)",              "src.ui.pages.slabs",                 "SlabsPage",               ()),
+    ("tiles",        "Tiles (Stock)",              "src.ui.pages.tiles",                 "TilesPage",               ()),
+    ("blocks",       "Blocks (Stock)",             "src.ui.pages.blocks",                "BlocksPage",              ()),
+    ("tables",       "Tables (Stock)",             "src.ui.pages.tables",                "TablesPage",              ()),
+    ("purchases",    "Purchases",                  "src.ui.pages.purchases",             "PurchasesPage",           ()),
+    ("ledger",       "Ledger",                     "src.ui.pages.ledger",                "LedgerPage",              ()),
+    ("sales",        "Sales",                      "src.ui.pages.sales",                 "SalesPage",               ()),
+    ("adjustments",  "Adjustments",                "src.ui.pages.adjustments",           "AdjustmentsPage",         ()),
+    ("returns",      "Returns",                    "src.ui.pages.returns",               "ReturnsPage",             ()),
+    ("stock_report", "Stock Report (By Location)", "src.ui.pages.location_stock_report", "LocationStockReportPage", ()),
+    ("users",        "Users",                      "src.ui.pages.users",                 "UsersPage",               ()),
+]
 
 
 class MainWindow(QMainWindow):
@@ -33,76 +41,104 @@ class MainWindow(QMainWindow):
         layout = QHBoxLayout(root)
         layout.setContentsMargins(0, 0, 0, 0)
 
+        self.page_keys = [p[0] for p in PAGES]
+        self._specs = {p[0]: p for p in PAGES}
+        self._pages = {}  # key -> built page widget
+
         # Sidebar
         self.menu = QListWidget()
         self.menu.setFixedWidth(220)
 
-        self.menu_labels = [
-            "Dashboard",                 # 0
-            "Items / Products",          # 1
-            "Slabs (Stock)",             # 2
-            "Tiles (Stock)",             # 3
-            "Blocks (Stock)",            # 4
-            "Tables (Stock)",            # 5
-            "Purchases",                 # 6
-            "Ledger",                    # 7
-            "Sales",                     # 8
-            "Adjustments",               # 9
-            "Returns",                   # 10
-            "Stock Report (By Location)" # 11
-            "Users"  # 12
-        ]
+        self.menu_labels = [p[1] for p in PAGES]
         self.menu.addItems(self.menu_labels)
-        self.menu.setCurrentRow(0)
 
-        # Content
+        # Content: one empty placeholder per page, swapped for the real page on first visit
         self.stack = QStackedWidget()
-
-        self.dashboard_page = DashboardPage()
-        self.stack.addWidget(self.dashboard_page)          # 0
-        self.stack.addWidget(ItemsPage("ALL"))             # 1
-        self.stack.addWidget(SlabsPage())                  # 2
-        self.stack.addWidget(TilesPage())                  # 3
-        self.stack.addWidget(BlocksPage())                 # 4
-        self.stack.addWidget(TablesPage())                 # 5
-        self.stack.addWidget(PurchasesPage())              # 6
-        self.stack.addWidget(LedgerPage())                 # 7
-        self.stack.addWidget(SalesPage())                  # 8
-        self.stack.addWidget(AdjustmentsPage())            # 9
-        self.stack.addWidget(ReturnsPage())                # 10
-        self.stack.addWidget(LocationStockReportPage())    # 11
-        self.stack.addWidget(UsersPage())                  # 12
-
+        for _ in PAGES:
+            self.stack.addWidget(QWidget())
 
         # Navigation
         self.menu.currentRowChanged.connect(self.on_menu_change)
-        self.dashboard_page.navigate_requested.connect(self.go_to_index)
+        signals.navigate_to.connect(self.go_to)
 
         layout.addWidget(self.menu)
         layout.addWidget(self.stack, 1)
         self.setCentralWidget(root)
 
+        # only the landing page is built now
+        self.menu.setCurrentRow(0)
+
         # ✅ IMPORTANT: apply permissions right after UI build
         self.apply_permissions()
 
+    # ----------------------------
+    # Page registry
+    # ----------------------------
+    def page(self, key: str):
+        """Built page for key, or None if it was never opened (nothing to refresh/permission yet)."""
+        return self._pages.get(key)
+
+    def ensure_page(self, key: str):
+        """Builds the page on first use and puts it in its stack slot."""
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+
+        _, label, module, cls_name, args = self._specs[key]
+        t0 = time.perf_counter()
+        cls = getattr(importlib.import_module(module), cls_name)
+        page = cls(*args)
+        startup_timing.log(f"page '{key}' built in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        index = self.page_keys.index(key)
+        placeholder = self.stack.widget(index)
+        self.stack.insertWidget(index, page)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+
+        self._pages[key] = page
+
+        if key == "dashboard":
+            page.navigate_requested.connect(self.go_to)
+
+        self._apply_page_permissions(key, page)
+        return page
+
     def on_menu_change(self, index: int):
+        if not (0 <= index < len(self.page_keys)):
+            return
+
+        key = self.page_keys[index]
+        already_built = key in self._pages
+        page = self.ensure_page(key)
         self.stack.setCurrentIndex(index)
 
-        if index == 0 and hasattr(self, "dashboard_page"):
+        # dashboard: refresh numbers when coming back (fresh build already loaded them)
+        if key == "dashboard" and already_built:
             try:
-                self.dashboard_page.load_totals()
+                page.load_totals()
             except Exception:
                 pass
 
+    def go_to(self, key: str):
+        if key in self._specs:
+            self.menu.setCurrentRow(self.page_keys.index(key))
+
     def go_to_index(self, index: int):
-        if 0 <= index < self.stack.count():
+        # old index-based API; prefer go_to(key)
+        if 0 <= index < len(self.page_keys):
             self.menu.setCurrentRow(index)
 
+    # ----------------------------
+    # Permissions
+    # ----------------------------
     def apply_permissions(self):
         """
         Admin: everything
         Staff: can add tx (purchase/sale/returns/adjustments) but cannot edit master (items)
         Viewer: view + export only (no add buttons)
+
+        Only pages already built are touched; lazy pages get the same rules when built.
         """
         user = getattr(AppState, "current_user", None)
         username = getattr(user, "username", "") if user else ""
@@ -111,46 +147,46 @@ class MainWindow(QMainWindow):
         # ✅ Title shows who is logged in
         self.setWindowTitle(f"Marble Inventory — {username} ({role})" if username else "Marble Inventory")
 
+        for key, page in self._pages.items():
+            self._apply_page_permissions(key, page)
+
+        # ✅ Optional: Viewer ke liye transactions pages visible रहें, but menu label add indicator
+        # (aap chaho to yahan hide bhi kar sakte ho)
+
+    def _apply_page_permissions(self, key: str, page):
         can_add_tx = AppState.can_add_transactions()
         can_edit_master = AppState.can_edit_master_data()
 
         # --- ItemsPage (master data) ---
-        items_page = self.stack.widget(1)
-        for attr in ("add_btn", "import_btn", "delete_btn", "edit_btn"):
-            if hasattr(items_page, attr):
-                getattr(items_page, attr).setEnabled(can_edit_master)
-
-        # --- Purchases ---
-        purchases = self.stack.widget(6)
-        if hasattr(purchases, "apply_permissions"):
-            purchases.apply_permissions()
-        elif hasattr(purchases, "add_btn"):
-            purchases.add_btn.setEnabled(can_add_tx)
-
-        # --- Sales ---
-        sales = self.stack.widget(8)
-        if hasattr(sales, "apply_permissions"):
-            sales.apply_permissions()
-        elif hasattr(sales, "add_btn"):
-            sales.add_btn.setEnabled(can_add_tx)
+        if key == "items":
+            for attr in ("add_btn", "import_btn", "delete_btn", "edit_btn"):
+                if hasattr(page, attr):
+                    getattr(page, attr).setEnabled(can_edit_master)
+            return
+
+        # --- Purchases / Sales ---
+        if key in ("purchases", "sales"):
+            if hasattr(page, "apply_permissions"):
+                page.apply_permissions()
+            elif hasattr(page, "add_btn"):
+                page.add_btn.setEnabled(can_add_tx)
+            return
 
         # --- Adjustments ---
-        adj = self.stack.widget(9)
-        if hasattr(adj, "apply_permissions"):
-            adj.apply_permissions()
-        else:
-            for attr in ("add_btn", "add_adjust_btn", "create_btn"):
-                if hasattr(adj, attr):
-                    getattr(adj, attr).setEnabled(can_add_tx)
+        if key == "adjustments":
+            if hasattr(page, "apply_permissions"):
+                page.apply_permissions()
+            else:
+                for attr in ("add_btn", "add_adjust_btn", "create_btn"):
+                    if hasattr(page, attr):
+                        getattr(page, attr).setEnabled(can_add_tx)
+            return
 
         # --- Returns ---
-        ret = self.stack.widget(10)
-        if hasattr(ret, "apply_permissions"):
-            ret.apply_permissions()
-        else:
-            for attr in ("add_sale_btn", "add_purchase_btn", "btn_add_sale", "btn_add_purchase"):
-                if hasattr(ret, attr):
-                    getattr(ret, attr).setEnabled(can_add_tx)
-
-        # ✅ Optional: Viewer ke liye transactions pages visible रहें, but menu label add indicator
-        # (aap chaho to yahan hide bhi kar sakte ho)
+        if key == "returns":
+            if hasattr(page, "apply_permissions"):
+                page.apply_permissions()
+            else:
+                for attr in ("add_sale_btn", "add_purchase_btn", "btn_add_sale", "btn_add_purchase"):
+                    if hasattr(page, attr):
+                        getattr(page, attr).setEnabled(can_add_tx)
@@ -8,13 +8,13 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 
 from src.db.session import get_db
-from src.db.location_repo import get_locations
-from src.db.item_repo import get_items
+from src.db.catalog import get_catalog
 from src.db.adjustments_repo import (
     create_adjustments_batch,
     list_adjustments
 )
 from src.ui.signals import signals
+from src.ui.widgets.item_picker import ItemPicker, shared_item_model
 from src.ui.app_state import AppState
 
 
@@ -45,13 +45,13 @@ class AddAdjustmentDialog(QDialog):
         self.loc_dd = QComboBox()
         self.loc_dd.addItem("—", None)
 
-        with get_db() as db:
-            self._locations = get_locations(db)
-            for l in self._locations:
-                self.loc_dd.addItem(l.name, l.id)
+        # ✅ shared in-memory catalog (src/db/catalog.py): no DB round trip per dialog
+        self._catalog = get_catalog()
+        self._locations = self._catalog.locations
+        for l in self._locations:
+            self.loc_dd.addItem(l.name, l.id)
 
-            self._items = get_items(db, category="ALL")
-            self._items_by_id = {it.id: it for it in self._items}
+        self._item_model = shared_item_model(self._catalog)
 
         form.addRow("Type", self.movement_dd)
         form.addRow("Location", self.loc_dd)
@@ -82,10 +82,7 @@ class AddAdjustmentDialog(QDialog):
         r = self.rows.rowCount()
         self.rows.insertRow(r)
 
-        item_dd = QComboBox()
-        item_dd.addItem("Select item...", None)
-        for it in self._items:
-            item_dd.addItem(f"{it.sku} — {it.name}", it.id)
+        item_dd = ItemPicker(self._item_model)  # ✅ shared model: constant cost per line
 
         cat_lbl = QLabel("—")
 
@@ -106,7 +103,7 @@ class AddAdjustmentDialog(QDialog):
 
         def on_item_change():
             item_id = item_dd.currentData()
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 cat_lbl.setText("—")
                 qty_sec.setEnabled(True)
@@ -149,7 +146,7 @@ class AddAdjustmentDialog(QDialog):
             if not item_id:
                 continue
 
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 continue
 
@@ -2,13 +2,17 @@
 from datetime import datetime
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
+    QDialog, QComboBox, QTableWidget, QTableWidgetItem, QAbstractItemView
 )
 from PySide6.QtCore import Qt, Signal
 
-from src.db.session import get_db
-from src.db.dashboard_repo import get_dashboard_totals, get_low_stock_top_items
+from src.db.catalog import get_catalog
+from src.db.dashboard_repo import (
+    load_dashboard_snapshot, cached_dashboard_snapshot, stock_level, get_reorder_suggestions
+)
 from src.ui.signals import signals
+from src.ui.utils.search_controller import SearchController
 
 
 class ClickableCard(QFrame):
@@ -43,13 +47,95 @@ def _card(title: str) -> tuple[ClickableCard, QLabel]:
     return c, v
 
 
+# rows shown in "View all" (lowest stock first); more than this isn't a reorder list anymore
+REORDER_VIEW_LIMIT = 1000
+
+
+class ReorderDialog(QDialog):
+    """Everything at/below its reorder level (get_reorder_suggestions), loaded in the background."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Low Stock — All Items")
+        self.resize(820, 520)
+
+        lay = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        self.loc_dd = QComboBox()
+        self.loc_dd.addItem("All Locations", None)
+        for l in get_catalog().locations:
+            self.loc_dd.addItem(l.name, l.id)
+        self.refresh_btn = QPushButton("Refresh")
+        top.addWidget(QLabel("Location:"))
+        top.addWidget(self.loc_dd, 1)
+        top.addStretch(2)
+        top.addWidget(self.refresh_btn)
+        lay.addLayout(top)
+
+        self.count_lbl = QLabel("Loading...")
+        self.count_lbl.setStyleSheet("color:#9a9a9a;")
+        lay.addWidget(self.count_lbl)
+
+        self.table = QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels([
+            "SKU", "Name", "Category", "Qty", "Unit", "Reorder Level", "Suggested"
+        ])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        lay.addWidget(self.table)
+
+        self.loader = SearchController(self, self._params, self._load, self._show, self._failed)
+        self.loader.busy_changed.connect(lambda busy: self.refresh_btn.setEnabled(not busy))
+        self.loc_dd.currentIndexChanged.connect(self.loader.run_now)
+        self.refresh_btn.clicked.connect(self.loader.run_now)
+        self.loader.run_now()
+
+    def _params(self):
+        return {"location_id": self.loc_dd.currentData()}
+
+    @staticmethod
+    def _load(db, params):
+        # pool thread: no widget access here
+        return get_reorder_suggestions(db, location_id=params["location_id"], limit=REORDER_VIEW_LIMIT)
+
+    def _failed(self, _params, err: str):
+        self.count_lbl.setText(f"Could not load: {err}")
+
+    def _show(self, _params, rows):
+        if not rows:
+            self.count_lbl.setText("Nothing at or below its reorder level ✅")
+        elif len(rows) >= REORDER_VIEW_LIMIT:
+            self.count_lbl.setText(f"Lowest {REORDER_VIEW_LIMIT} item(s) shown (lowest stock first)")
+        else:
+            self.count_lbl.setText(f"{len(rows)} item(s) at or below reorder level (lowest stock first)")
+
+        def cell(text, right=False):
+            it = QTableWidgetItem(str(text))
+            it.setTextAlignment((Qt.AlignRight if right else Qt.AlignLeft) | Qt.AlignVCenter)
+            return it
+
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(rows))
+        for r, x in enumerate(rows):
+            mark = " ⚠" if x["level"] in ("zero", "critical") else ""
+            self.table.setItem(r, 0, cell(x["sku"]))
+            self.table.setItem(r, 1, cell(x["name"]))
+            self.table.setItem(r, 2, cell(x["category"]))
+            self.table.setItem(r, 3, cell(f"{x['qty']}{mark}", right=True))
+            self.table.setItem(r, 4, cell(x["unit"]))
+            self.table.setItem(r, 5, cell(f"{x['reorder_level']:g}", right=True))
+            self.table.setItem(r, 6, cell(f"{x['suggested']:g}", right=True))
+        self.table.resizeColumnsToContents()
+
+
 class DashboardPage(QWidget):
     """
     Emits:
-      navigate_requested(index:int)
-    MainWindow should connect this to go_to_index(index)
+      navigate_requested(page_key:str)   e.g. "slabs", "purchases"
+    MainWindow connects this to go_to(key) (see main_window.PAGES)
     """
-    navigate_requested = Signal(int)
+    navigate_requested = Signal(str)
 
     def __init__(self):
         super().__init__()
@@ -59,7 +145,7 @@ class DashboardPage(QWidget):
         title = QLabel("Dashboard")
         title.setStyleSheet("font-size:22px;font-weight:800;")
         self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.clicked.connect(self.load_totals)
+        self.refresh_btn.clicked.connect(lambda: self.load_totals(force=True))
         header.addWidget(title)
         header.addStretch()
         header.addWidget(self.refresh_btn)
@@ -126,6 +212,10 @@ class DashboardPage(QWidget):
         self.low_list.setWordWrap(True)
         low_lay.addWidget(self.low_list)
 
+        self.low_all_btn = QPushButton("View all")
+        self.low_all_btn.clicked.connect(self.open_reorder_list)
+        low_lay.addWidget(self.low_all_btn, 0, Qt.AlignRight)
+
         main_row.addLayout(cards_col, 4)
         main_row.addWidget(self.low_panel, 1)
 
@@ -178,22 +268,32 @@ class DashboardPage(QWidget):
         signals.inventory_changed.connect(self.on_inventory_changed)
 
         # Card clicks → navigation request
-        self.card_slab.clicked.connect(lambda: self.navigate_requested.emit(2))
-        self.card_slab_sqft.clicked.connect(lambda: self.navigate_requested.emit(2))
+        self.card_slab.clicked.connect(lambda: self.navigate_requested.emit("slabs"))
+        self.card_slab_sqft.clicked.connect(lambda: self.navigate_requested.emit("slabs"))
+
+        self.card_tile.clicked.connect(lambda: self.navigate_requested.emit("tiles"))
+        self.card_tile_sqft.clicked.connect(lambda: self.navigate_requested.emit("tiles"))
 
-        self.card_tile.clicked.connect(lambda: self.navigate_requested.emit(3))
-        self.card_tile_sqft.clicked.connect(lambda: self.navigate_requested.emit(3))
+        self.card_block.clicked.connect(lambda: self.navigate_requested.emit("blocks"))
+        self.card_table.clicked.connect(lambda: self.navigate_requested.emit("tables"))
 
-        self.card_block.clicked.connect(lambda: self.navigate_requested.emit(4))
-        self.card_table.clicked.connect(lambda: self.navigate_requested.emit(5))
+        self.card_purchase.clicked.connect(lambda: self.navigate_requested.emit("purchases"))
 
-        # Purchases page index (agar aap menu me purchases add kar chuke ho)
-        self.card_purchase.clicked.connect(lambda: self.navigate_requested.emit(6))
+        # snapshot reload runs on a pool thread; a newer request drops the older one
+        self.refresher = SearchController(
+            self, lambda: None, self._load_snapshot, self._show_snapshot, self._snapshot_failed
+        )
+        self.refresher.busy_changed.connect(self._on_busy)
 
         self.load_totals()
 
+    def open_reorder_list(self):
+        ReorderDialog(self).exec()
+
     def on_inventory_changed(self, scope: str):
-        self.load_totals()
+        # snapshot already marked stale (signals.py); hidden page reloads when navigated back
+        if self.isVisible():
+            self.refresher.trigger()  # debounced: a save can emit several signals
 
     def _set_val_int(self, label: QLabel, value):
         try:
@@ -208,18 +308,7 @@ class DashboardPage(QWidget):
             label.setText("0.000")
 
     def _stock_level(self, value, low, critical):
-        try:
-            v = float(value or 0)
-        except Exception:
-            v = 0.0
-
-        if v <= 0:
-            return "zero"
-        if v <= critical:
-            return "critical"
-        if v <= low:
-            return "low"
-        return "ok"
+        return stock_level(value, low, critical)
 
     def _apply_level(self, card: QFrame, level: str):
         card.setProperty("level", level)
@@ -227,10 +316,29 @@ class DashboardPage(QWidget):
         card.style().polish(card)
         card.update()
 
-    def load_totals(self):
-        with get_db() as db:
-            t = get_dashboard_totals(db) or {}
-            low_items = get_low_stock_top_items(db, limit=5)  # ✅ Top 5 global
+    def load_totals(self, force: bool = False):
+        """Cached snapshot now (no DB on the GUI thread), background reload if old/stale."""
+        snap, fresh = cached_dashboard_snapshot()
+        if snap is not None:
+            self._show_snapshot(None, snap)
+        if force or not fresh:
+            self.refresher.run_now()
+
+    @staticmethod
+    def _load_snapshot(db, _params):
+        return load_dashboard_snapshot(db, low_limit=5)  # ✅ Top 5 global
+
+    def _on_busy(self, busy: bool):
+        self.refresh_btn.setEnabled(not busy)
+        self.refresh_btn.setText("Refreshing..." if busy else "Refresh")
+
+    def _snapshot_failed(self, _params, err: str):
+        self.last_updated.setText(f"Could not refresh: {err}")
+
+    def _show_snapshot(self, _params, snap: dict):
+        t = snap.get("totals") or {}
+        low_items = snap.get("low_items") or []
+        th = snap.get("thresholds") or {}
 
         # SAFE READ
         slab_count = t.get("slab_count", t.get("slabs_count", 0))
@@ -256,24 +364,25 @@ class DashboardPage(QWidget):
 
         self._set_val_int(self.val_purchase, purchase_count)
 
-        # thresholds
-        SLAB_LOW, SLAB_CRIT = 5, 2
-        TILE_LOW, TILE_CRIT = 6, 2        # tile boxes <=2 => CRITICAL
-        BLOCK_LOW, BLOCK_CRIT = 20, 10
-        TABLE_LOW, TABLE_CRIT = 20, 10
+        # thresholds (reorder_thresholds table, per category)
         PURCHASE_LOW, PURCHASE_CRIT = 1, 0
 
-        self._apply_level(self.card_slab, self._stock_level(slab_count, SLAB_LOW, SLAB_CRIT))
-        self._apply_level(self.card_tile, self._stock_level(tile_boxes, TILE_LOW, TILE_CRIT))
-        self._apply_level(self.card_block, self._stock_level(block_pcs, BLOCK_LOW, BLOCK_CRIT))
-        self._apply_level(self.card_table, self._stock_level(table_pcs, TABLE_LOW, TABLE_CRIT))
+        def lvl(value, cat):
+            t = th.get(cat) or {"low": 0, "critical": 0}
+            return self._stock_level(value, t["low"], t["critical"])
+
+        self._apply_level(self.card_slab, lvl(slab_count, "SLAB"))
+        self._apply_level(self.card_tile, lvl(tile_boxes, "TILE"))
+        self._apply_level(self.card_block, lvl(block_pcs, "BLOCK"))
+        self._apply_level(self.card_table, lvl(table_pcs, "TABLE"))
         self._apply_level(self.card_purchase, self._stock_level(purchase_count, PURCHASE_LOW, PURCHASE_CRIT))
 
         # sqft cards neutral
         self._apply_level(self.card_slab_sqft, "ok")
         self._apply_level(self.card_tile_sqft, "ok")
 
-        self.last_updated.setText("Last updated: " + datetime.now().strftime("%Y-%m-%d %I:%M:%S %p"))
+        taken_at = snap.get("taken_at") or datetime.now()
+        self.last_updated.setText("Last updated: " + taken_at.strftime("%Y-%m-%d %I:%M:%S %p"))
 
         # empty state
         all_zero = (
@@ -294,5 +403,6 @@ class DashboardPage(QWidget):
         else:
             lines = []
             for x in low_items:
-                lines.append(f"• {x['sku']} — {x['name']}  ({x['qty']} {x['unit']})")
+                mark = " ⚠" if x.get("level") in ("zero", "critical") else ""
+                lines.append(f"• {x['sku']} — {x['name']}  ({x['qty']} {x['unit']}){mark}")
             self.low_list.setText("\n".join(lines))
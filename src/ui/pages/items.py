@@ -2,16 +2,18 @@
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QPushButton, QComboBox,
     QDialog, QFormLayout, QLineEdit, QDoubleSpinBox, QMessageBox, QMenu,
     QFileDialog
 )
-from PySide6.QtCore import Qt, QObject, QThread, Signal
+from PySide6.QtCore import Qt, QObject, QThread, Signal, QTimer
 
 from src.db.session import get_db
 from src.db.item_repo import search_items, create_item, update_item, soft_delete_item
 from src.db.importer import import_items_file  # ✅ CSV + Excel dispatcher
 from src.ui.widgets.progress_dialog import ImportProgressDialog
+from src.ui.widgets.lazy_table import LazyTableView, PAGE_SIZE, next_offset
+from src.ui.utils.search_controller import SearchController
 from src.ui.signals import signals
 from src.ui.app_state import AppState
 
@@ -58,6 +60,12 @@ class AddEditItemDialog(QDialog):
         self.finish = QLineEdit()
         self.finish.setPlaceholderText("e.g., Honed / Polished")
 
+        self.reorder_level = QDoubleSpinBox()
+        self.reorder_level.setRange(0, 999999)
+        self.reorder_level.setDecimals(3)
+        self.reorder_level.setSpecialValueText("Category default")
+        self.reorder_level.setValue(0)
+
         form.addRow("SKU", self.sku)
         form.addRow("Name", self.name)
         form.addRow("Category", self.category)
@@ -68,6 +76,7 @@ class AddEditItemDialog(QDialog):
         form.addRow("Material (optional)", self.material)
         form.addRow("Thickness (optional)", self.thickness)
         form.addRow("Finish (optional)", self.finish)
+        form.addRow("Reorder Level (slab/box/piece)", self.reorder_level)
 
         layout.addLayout(form)
 
@@ -95,6 +104,7 @@ class AddEditItemDialog(QDialog):
             self.material.setText(item.get("material") or "")
             self.thickness.setText(item.get("thickness") or "")
             self.finish.setText(item.get("finish") or "")
+            self.reorder_level.setValue(float(item.get("reorder_level") or 0))
 
         if self.lock_category and self.lock_category != "ALL":
             self.category.setCurrentText(self.lock_category)
@@ -133,6 +143,9 @@ class AddEditItemDialog(QDialog):
             "material": self.material.text().strip() or None,
             "thickness": self.thickness.text().strip() or None,
             "finish": self.finish.text().strip() or None,
+
+            # 0 => use category threshold
+            "reorder_level": float(self.reorder_level.value()) or None,
         }
 
         if unit_secondary:
@@ -152,10 +165,11 @@ class ImportWorker(QObject):
     done = Signal(dict)
     failed = Signal(str)
 
-    def __init__(self, file_path: str, batch_size: int = 500):
+    def __init__(self, file_path: str, batch_size: int = 500, mode: str = "copy"):
         super().__init__()
         self.file_path = file_path
         self.batch_size = batch_size
+        self.mode = mode  # "dry_run" = preview only; "copy" = COPY fast-path on Postgres, batched upsert elsewhere
         self._cancel = False
 
     def cancel(self):
@@ -170,7 +184,7 @@ class ImportWorker(QObject):
                 result = import_items_file(
                     db,
                     self.file_path,
-                    mode="upsert",
+                    mode=self.mode,
                     batch_size=self.batch_size,
                     progress_cb=lambda p, t: self.progress.emit(p, t),
                     stop_flag=self.is_cancelled
@@ -213,14 +227,12 @@ class ItemsPage(QWidget):
         top.addWidget(self.add_btn)
         layout.addLayout(top)
 
-        self.table = QTableWidget(0, 10)
-        self.table.setHorizontalHeaderLabels([
+        self.table = LazyTableView([
             "ID", "SKU", "Name", "Category",
             "Material", "Thickness", "Finish",
             "Primary Unit", "Secondary Unit", "Sqft/Unit"
-        ])
+        ], self._fetch_more)
         self.table.setColumnHidden(0, True)
-        self.table.horizontalHeader().setStretchLastSection(True)
 
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_menu)
@@ -229,9 +241,13 @@ class ItemsPage(QWidget):
         self._thread = None
         self._worker = None
         self._progress_dialog = None
+        self._import_path = None
 
-        self.search.textChanged.connect(self.load_data)
-        self.category.currentTextChanged.connect(self.load_data)
+        # typing => debounced background query; filters the table shows = self._filters
+        self._filters = self._search_params()
+        self.searcher = SearchController(self, self._search_params, self._first_page, self._show_results, self._search_failed)
+        self.search.textChanged.connect(self.searcher.trigger)
+        self.category.currentTextChanged.connect(self.searcher.run_now)
         self.import_btn.clicked.connect(self.import_file)
         self.add_btn.clicked.connect(self.add_item)
 
@@ -253,39 +269,46 @@ class ItemsPage(QWidget):
             self.import_btn.setToolTip("")
 
     def load_data(self):
-        self.table.setRowCount(0)
+        self.searcher.run_now()
+
+    def _search_params(self):
+        return (self.search.text().strip(), self.category.currentText())
+
+    def _first_page(self, db, params):
+        # pool thread: no widget access here
+        return self._query(db, params, 0, PAGE_SIZE)
+
+    def _show_results(self, params, page):
+        self._filters = params
+        self.table.show_first_page(*page)
+
+    def _search_failed(self, _params, err):
+        QMessageBox.warning(self, "Search", f"Search failed:\n{err}")
+
+    def _fetch_more(self, cursor, limit):
         with get_db() as db:
-            items = search_items(db, self.search.text().strip(), self.category.currentText())
-            for row, item in enumerate(items):
-                self.table.insertRow(row)
-                self.table.setItem(row, 0, QTableWidgetItem(str(item.id)))
-                self.table.setItem(row, 1, QTableWidgetItem(item.sku))
-                self.table.setItem(row, 2, QTableWidgetItem(item.name))
-                self.table.setItem(row, 3, QTableWidgetItem(item.category))
-
-                self.table.setItem(row, 4, QTableWidgetItem(getattr(item, "material", "") or ""))
-                self.table.setItem(row, 5, QTableWidgetItem(getattr(item, "thickness", "") or ""))
-                self.table.setItem(row, 6, QTableWidgetItem(getattr(item, "finish", "") or ""))
-
-                self.table.setItem(row, 7, QTableWidgetItem(item.unit_primary or ""))
-                self.table.setItem(row, 8, QTableWidgetItem(item.unit_secondary or ""))
-
-                sqft_txt = ""
-                if item.sqft_per_unit is not None:
-                    try:
-                        sqft_txt = f"{float(item.sqft_per_unit):.3f}"
-                    except Exception:
-                        sqft_txt = str(item.sqft_per_unit)
-                self.table.setItem(row, 9, QTableWidgetItem(sqft_txt))
+            return self._query(db, self._filters, cursor or 0, limit)
+
+    @staticmethod
+    def _query(db, filters, offset, limit):
+        q_text, category = filters
+        items = search_items(db, q_text, category, limit=limit, offset=offset)
+        rows = [
+            (
+                item.id, item.sku, item.name, item.category,
+                getattr(item, "material", "") or "",
+                getattr(item, "thickness", "") or "",
+                getattr(item, "finish", "") or "",
+                item.unit_primary or "",
+                item.unit_secondary or "",
+                item.sqft_per_unit,
+            )
+            for item in items
+        ]
+        return rows, next_offset(offset, rows, limit)
 
     def selected_item_id(self):
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        id_item = self.table.item(row, 0)
-        if not id_item:
-            return None
-        return int(id_item.text())
+        return self.table.current_id()
 
     def open_menu(self, pos):
         item_id = self.selected_item_id()
@@ -320,21 +343,18 @@ class ItemsPage(QWidget):
         if not file_path:
             return
 
-        ok = QMessageBox.question(
-            self,
-            "Confirm Import",
-            "Import will UPSERT by SKU (same SKU => update + reactivate if deleted).\nContinue?"
-        ) == QMessageBox.Yes
-        if not ok:
-            return
+        # 1) dry run first (nothing saved) => preview => 2) real import on confirm
+        self._start_import(file_path, mode="dry_run", title="Checking File")
 
+    def _start_import(self, file_path: str, mode: str, title: str):
         self.import_btn.setEnabled(False)
+        self._import_path = file_path
 
-        dlg = ImportProgressDialog(self, title="Importing File")
+        dlg = ImportProgressDialog(self, title=title)
         self._progress_dialog = dlg
 
         thread = QThread(self)
-        worker = ImportWorker(file_path=file_path, batch_size=500)
+        worker = ImportWorker(file_path=file_path, batch_size=500, mode=mode)
         worker.moveToThread(thread)
 
         thread.started.connect(worker.run)
@@ -365,18 +385,25 @@ class ItemsPage(QWidget):
 
         self.apply_permissions()
 
+        if result.get("dry_run"):
+            # let the progress dialog's exec() unwind before opening the next one
+            QTimer.singleShot(0, lambda: self._confirm_import(result))
+            return
+
         signals.inventory_changed.emit("items")
         self.load_data()
 
         inserted = result.get("inserted", 0)
         updated = result.get("updated", 0)
         skipped = result.get("skipped", 0)
+        unchanged = result.get("unchanged", 0)
         errors = result.get("errors", [])
 
         msg = (
             f"Import complete ✅\n\n"
             f"Inserted: {inserted}\n"
             f"Updated: {updated}\n"
+            f"Unchanged: {unchanged}\n"
             f"Skipped: {skipped}\n"
             f"Errors: {len(errors)}"
         )
@@ -388,6 +415,44 @@ class ItemsPage(QWidget):
 
         QMessageBox.information(self, "Import", msg)
 
+    def _confirm_import(self, preview: dict):
+        changes = preview.get("changes") or {}
+        new_skus = changes.get("inserted") or []
+        upd_skus = changes.get("updated") or []
+        invalid = changes.get("invalid") or []
+        fields = changes.get("fields") or {}
+        errors = preview.get("errors") or []
+
+        msg = (
+            f"Preview (nothing saved yet)\n\n"
+            f"New items: {len(new_skus)}\n"
+            f"Changed items: {len(upd_skus)}\n"
+            f"Unchanged (will be skipped): {preview.get('unchanged', 0)}\n"
+            f"Invalid / duplicate rows: {len(invalid)}"
+        )
+        if fields:
+            msg += "\n\nChanged fields:\n" + "\n".join(f"  {f}: {n}" for f, n in fields.items())
+        if new_skus:
+            msg += "\n\nNew: " + ", ".join(new_skus[:10]) + (" ..." if len(new_skus) > 10 else "")
+        if upd_skus:
+            msg += "\nChanged: " + ", ".join(upd_skus[:10]) + (" ..." if len(upd_skus) > 10 else "")
+        if errors:
+            msg += "\n\nFirst errors:\n" + "\n".join(errors[:5])
+
+        if not new_skus and not upd_skus:
+            QMessageBox.information(self, "Import", msg + "\n\nNothing to import ✅")
+            return
+
+        ok = QMessageBox.question(
+            self,
+            "Confirm Import",
+            msg + "\n\nImport will UPSERT by SKU (same SKU => update + reactivate if deleted).\nContinue?"
+        ) == QMessageBox.Yes
+        if not ok:
+            return
+
+        self._start_import(self._import_path, mode="copy", title="Importing File")
+
     def _on_import_failed(self, err: str):
         if self._progress_dialog:
             self._progress_dialog.reject()
@@ -432,6 +497,7 @@ class ItemsPage(QWidget):
                 "material": getattr(item, "material", None),
                 "thickness": getattr(item, "thickness", None),
                 "finish": getattr(item, "finish", None),
+                "reorder_level": getattr(item, "reorder_level", None),
             }
 
         dlg = AddEditItemDialog(self, existing, lock_category=self.default_category)
@@ -2,12 +2,15 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QTableWidget, QTableWidgetItem, QComboBox, QPushButton,
-    QDialog, QMessageBox
+    QDialog, QMessageBox, QCheckBox, QDateEdit
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QDate
 
 from src.db.session import get_db
-from src.db.ledger_repo import list_ledger
+from src.db.ledger_repo import list_ledger, ledger_cursor, get_ledger_entry, MOVEMENT_TYPE_GROUPS
+from src.db.catalog import get_catalog
+from src.ui.widgets.lazy_table import LazyTableView, PAGE_SIZE
+from src.ui.utils.search_controller import SearchController
 
 # ✅ Repo detail fetchers (no circular imports)
 from src.db.purchase_repo import get_purchase_details
@@ -352,77 +355,125 @@ class LedgerPage(QWidget):
 
         self.search = QLineEdit()
         self.search.setPlaceholderText("Search: PURCHASE / SALE / ADJUST / DAMAGE / ref_type ...")
-        self.search.textChanged.connect(self.load_data)
 
         self.type_dd = QComboBox()
         self.type_dd.addItem("ALL", None)
-        self.type_dd.addItems(["PURCHASE", "SALE", "SALE_RETURN", "PURCHASE_RETURN", "ADJUST", "DAMAGE"])
+        for t in MOVEMENT_TYPE_GROUPS:
+            self.type_dd.addItem(t, t)
         self.type_dd.currentIndexChanged.connect(self.load_data)
 
+        self.loc_dd = QComboBox()
+        self.loc_dd.addItem("ALL", None)
+        for loc in get_catalog().locations:
+            self.loc_dd.addItem(loc.name, loc.id)
+        self.loc_dd.currentIndexChanged.connect(self.load_data)
+
+        # date range is off by default (= all dates)
+        self.date_chk = QCheckBox("From")
+        self.date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to = QDateEdit(QDate.currentDate())
+        for d in (self.date_from, self.date_to):
+            d.setCalendarPopup(True)
+            d.setDisplayFormat("yyyy-MM-dd")
+            d.setEnabled(False)
+            d.dateChanged.connect(self.load_data)
+        self.date_chk.toggled.connect(self._on_date_toggle)
+
         self.refresh_btn = QPushButton("Refresh")
         self.refresh_btn.clicked.connect(self.load_data)
 
         top.addWidget(self.search, 2)
         top.addWidget(QLabel("Type:"))
         top.addWidget(self.type_dd)
+        top.addWidget(QLabel("Location:"))
+        top.addWidget(self.loc_dd)
+        top.addWidget(self.date_chk)
+        top.addWidget(self.date_from)
+        top.addWidget(QLabel("To"))
+        top.addWidget(self.date_to)
         top.addStretch()
         top.addWidget(self.refresh_btn)
         layout.addLayout(top)
 
-        self.table = QTableWidget(0, 9)
-        self.table.setHorizontalHeaderLabels([
+        self.table = LazyTableView([
             "ID", "When", "Type", "SKU", "Item",
             "Location", "Qty Primary", "Qty Secondary", "Ref"
-        ])
+        ], self._fetch_more)
         self.table.setColumnHidden(0, True)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellDoubleClicked.connect(self.open_ledger_popup)
+        self.table.doubleClicked.connect(self.open_ledger_popup)
         layout.addWidget(self.table)
 
-        self._rows_cache = []
+        # typing => debounced background query; the table keeps paging with self._active filters
+        self._active = self._search_params()
+        self.searcher = SearchController(self, self._search_params, self._first_page, self._show_results, self._search_failed)
+        self.search.textChanged.connect(self.searcher.trigger)
+
         self.load_data()
 
     def load_data(self):
-        self.table.setRowCount(0)
+        self.searcher.run_now()
 
-        q = self.search.text().strip()
-        type_filter = self.type_dd.currentText()
-        if self.type_dd.currentData() is None:
-            type_filter = None
+    def _on_date_toggle(self, on: bool):
+        self.date_from.setEnabled(on)
+        self.date_to.setEnabled(on)
+        self.load_data()
 
+    def _search_params(self) -> dict:
+        f = {
+            "q_text": self.search.text().strip(),
+            "movement_type": self.type_dd.currentData(),
+            "location_id": self.loc_dd.currentData(),
+        }
+        if self.date_chk.isChecked():
+            f["date_from"] = self.date_from.date().toPython()
+            f["date_to"] = self.date_to.date().toPython()
+        return f
+
+    def _first_page(self, db, params):
+        # pool thread: no widget access here
+        return self._query(db, params, None, PAGE_SIZE)
+
+    def _show_results(self, params, page):
+        self._active = params
+        self.table.show_first_page(*page)
+
+    def _search_failed(self, _params, err):
+        QMessageBox.warning(self, "Ledger", f"Could not load ledger:\n{err}")
+
+    def _fetch_more(self, cursor, limit):
         with get_db() as db:
-            rows = list_ledger(db, q_text=q, limit=400)
+            return self._query(db, self._active, cursor, limit)
 
-        if type_filter:
-            rows = [r for r in rows if (r.movement_type or "").upper() == type_filter]
-
-        self._rows_cache = rows
-
-        for r, led in enumerate(rows):
-            self.table.insertRow(r)
-
-            sku = led.item.sku if led.item else ""
-            name = led.item.name if led.item else ""
-            loc = led.location.name if led.location else ""
+    @staticmethod
+    def _query(db, filters, cursor, limit):
+        page = list_ledger(db, limit=limit, after=cursor, **filters)
 
+        rows = []
+        for led in page:
             ref_txt = ""
             if led.ref_type or led.ref_id:
                 ref_txt = f"{led.ref_type or ''}#{led.ref_id or ''}".strip()
 
-            self.table.setItem(r, 0, QTableWidgetItem(str(led.id)))
-            self.table.setItem(r, 1, QTableWidgetItem(str(getattr(led, "created_at", ""))))
-            self.table.setItem(r, 2, QTableWidgetItem(led.movement_type or ""))
-            self.table.setItem(r, 3, QTableWidgetItem(sku))
-            self.table.setItem(r, 4, QTableWidgetItem(name))
-            self.table.setItem(r, 5, QTableWidgetItem(loc))
-            self.table.setItem(r, 6, QTableWidgetItem(str(led.qty_primary or "")))
-            self.table.setItem(r, 7, QTableWidgetItem(str(led.qty_secondary or "")))
-            self.table.setItem(r, 8, QTableWidgetItem(ref_txt))
-
-    def open_ledger_popup(self, row, _col):
-        if row < 0 or row >= len(self._rows_cache):
+            rows.append((
+                led.id,
+                getattr(led, "created_at", None),
+                led.movement_type or "",
+                led.item.sku if led.item else "",
+                led.item.name if led.item else "",
+                led.location.name if led.location else "",
+                led.qty_primary,
+                led.qty_secondary,
+                ref_txt,
+            ))
+
+        # keyset: next page starts after the last (created_at, id) we got
+        return rows, (ledger_cursor(page[-1]) if len(page) >= limit else None)
+
+    def open_ledger_popup(self, _index=None):
+        entry_id = self.table.current_id()
+        if not entry_id:
             return
-        led = self._rows_cache[row]
-        LedgerEntryDialog(self, led=led).exec()
+        with get_db() as db:
+            led = get_ledger_entry(db, entry_id)
+        if led:
+            LedgerEntryDialog(self, led=led).exec()
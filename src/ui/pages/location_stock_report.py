@@ -5,15 +5,15 @@ from datetime import datetime
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QComboBox, QTableWidget, QTableWidgetItem,
-    QPushButton, QFileDialog, QMessageBox
+    QPushButton, QFileDialog, QMessageBox, QCheckBox, QDateEdit
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QTextDocument, QPageSize
 from PySide6.QtPrintSupport import QPrinter
 
-from src.db.session import get_db
-from src.db.location_repo import get_locations
+from src.db.catalog import get_catalog
 from src.db.reports_repo import location_stock_summary, location_stock_by_item
+from src.ui.utils.search_controller import SearchController
 
 
 class LocationStockReportPage(QWidget):
@@ -57,6 +57,14 @@ class LocationStockReportPage(QWidget):
         self.search = QLineEdit()
         self.search.setPlaceholderText("Search SKU / Name...")
 
+        # off = current stock (inventory tables); on = stock at the end of that day (ledger)
+        self.as_of_chk = QCheckBox("As of")
+        self.as_of_date = QDateEdit(QDate.currentDate().addDays(-QDate.currentDate().day()))  # last month end
+        self.as_of_date.setCalendarPopup(True)
+        self.as_of_date.setDisplayFormat("yyyy-MM-dd")
+        self.as_of_date.setMaximumDate(QDate.currentDate())
+        self.as_of_date.setEnabled(False)
+
         self.refresh_btn = QPushButton("Refresh")
         self.refresh_btn.clicked.connect(self.reload)
 
@@ -67,6 +75,9 @@ class LocationStockReportPage(QWidget):
         filters.addWidget(self.cat_dd, 1)
         filters.addSpacing(10)
         filters.addWidget(self.search, 2)
+        filters.addSpacing(10)
+        filters.addWidget(self.as_of_chk)
+        filters.addWidget(self.as_of_date)
         filters.addWidget(self.refresh_btn)
         layout.addLayout(filters)
 
@@ -100,10 +111,13 @@ class LocationStockReportPage(QWidget):
         self.items_table.horizontalHeader().setStretchLastSection(True)
         layout.addWidget(self.items_table)
 
-        # signals
+        # signals (queries run in the background; typing is debounced)
+        self.searcher = SearchController(self, self._search_params, self._run_report, self._show_report, self._report_failed)
         self.loc_dd.currentIndexChanged.connect(self.reload)
         self.cat_dd.currentIndexChanged.connect(self.reload)
-        self.search.textChanged.connect(self.reload)
+        self.search.textChanged.connect(self.searcher.trigger)
+        self.as_of_chk.toggled.connect(self._on_as_of_toggle)
+        self.as_of_date.dateChanged.connect(self.reload)
 
         self._load_locations()
         self.reload()
@@ -112,8 +126,7 @@ class LocationStockReportPage(QWidget):
     # Helpers
     # ---------------------------
     def _load_locations(self):
-        with get_db() as db:
-            locs = get_locations(db)
+        locs = get_catalog().locations
 
         self.loc_dd.blockSignals(True)
         self.loc_dd.clear()
@@ -132,18 +145,51 @@ class LocationStockReportPage(QWidget):
         return it
 
     def reload(self):
-        self._load_summary()
-        self._load_items()
+        self.searcher.run_now()
+
+    def _on_as_of_toggle(self, on: bool):
+        self.as_of_date.setEnabled(on)
+        self.reload()
+
+    def _as_of_text(self) -> str:
+        return self.as_of_date.date().toString("yyyy-MM-dd") if self.as_of_chk.isChecked() else "Current"
+
+    def _search_params(self):
+        return {
+            "location_id": self.loc_dd.currentData(),
+            "location_name": self.loc_dd.currentText(),
+            "category": self.cat_dd.currentText(),
+            "q_text": self.search.text().strip(),
+            "as_of": self.as_of_date.date().toPython() if self.as_of_chk.isChecked() else None,
+        }
+
+    @staticmethod
+    def _run_report(db, params):
+        # pool thread: no widget access here
+        summary = location_stock_summary(db, as_of=params["as_of"])
+        items = location_stock_by_item(
+            db=db, location_id=params["location_id"], category=params["category"], q_text=params["q_text"],
+            as_of=params["as_of"],
+        )
+        return summary, items
+
+    def _show_report(self, params, result):
+        summary, items = result
+        as_of = f" — as of {params['as_of']:%Y-%m-%d} (end of day, from stock ledger)" if params["as_of"] else ""
+        self.summary_label.setText(f"Summary (Totals by Location){as_of}:")
+        self.items_label.setText(f"Item-wise Stock{as_of}:")
+        self._load_summary(summary, params)
+        self._load_items(items)
+
+    def _report_failed(self, _params, err):
+        QMessageBox.warning(self, "Stock Report", f"Could not load report:\n{err}")
 
     # ---------------------------
     # Summary
     # ---------------------------
-    def _load_summary(self):
+    def _load_summary(self, rows, params):
         self.summary_table.setRowCount(0)
 
-        with get_db() as db:
-            rows = location_stock_summary(db)
-
         for r, row in enumerate(rows):
             self.summary_table.insertRow(r)
             self.summary_table.setItem(r, 0, self._make_item(row["location_name"]))
@@ -155,9 +201,9 @@ class LocationStockReportPage(QWidget):
             self.summary_table.setItem(r, 6, self._make_item(row["table_pieces"], align=Qt.AlignRight))
 
         # location filter (hide)
-        loc_id = self.loc_dd.currentData()
+        loc_id = params["location_id"]
         if loc_id is not None:
-            chosen = self.loc_dd.currentText()
+            chosen = params["location_name"]
             for rr in range(self.summary_table.rowCount()):
                 loc_name = self.summary_table.item(rr, 0).text()
                 self.summary_table.setRowHidden(rr, loc_name != chosen)
@@ -204,16 +250,9 @@ class LocationStockReportPage(QWidget):
     # ---------------------------
     # Items
     # ---------------------------
-    def _load_items(self):
+    def _load_items(self, rows):
         self.items_table.setRowCount(0)
 
-        loc_id = self.loc_dd.currentData()
-        cat = self.cat_dd.currentText()
-        q = self.search.text().strip()
-
-        with get_db() as db:
-            rows = location_stock_by_item(db=db, location_id=loc_id, category=cat, q_text=q)
-
         for r, row in enumerate(rows):
             self.items_table.insertRow(r)
 
@@ -289,6 +328,7 @@ class LocationStockReportPage(QWidget):
                 w.writerow([f"Location: {self.loc_dd.currentText()}"])
                 w.writerow([f"Category: {self.cat_dd.currentText()}"])
                 w.writerow([f"Search: {self.search.text().strip() or '—'}"])
+                w.writerow([f"As of: {self._as_of_text()}"])
                 w.writerow([])
 
                 w.writerow(["Summary (Totals by Location)"])
@@ -342,6 +382,7 @@ class LocationStockReportPage(QWidget):
             ws.append([f"Location: {self.loc_dd.currentText()}"])
             ws.append([f"Category: {self.cat_dd.currentText()}"])
             ws.append([f"Search: {self.search.text().strip() or '—'}"])
+            ws.append([f"As of: {self._as_of_text()}"])
             ws.append([])
 
             ws["A1"].font = Font(bold=True, size=14)
@@ -405,6 +446,7 @@ class LocationStockReportPage(QWidget):
             "Location": self.loc_dd.currentText(),
             "Category": self.cat_dd.currentText(),
             "Search": self.search.text().strip() or "—",
+            "As of": self._as_of_text(),
         }
         html = self._full_report_html(filters)
 
@@ -10,10 +10,10 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QPdfWriter, QPainter, QFont, QPageSize
 
 from src.db.session import get_db
-from src.db.location_repo import list_locations
-from src.db.item_repo import get_items
+from src.db.catalog import get_catalog
 from src.db.purchase_repo import create_purchase, list_purchases, get_purchase_details
 from src.ui.signals import signals
+from src.ui.widgets.item_picker import ItemPicker, shared_item_model
 from src.ui.app_state import AppState
 
 
@@ -149,13 +149,13 @@ class AddPurchaseDialog(QDialog):
         self.loc_dd = QComboBox()
         self.loc_dd.addItem("—", None)
 
-        with get_db() as db:
-            self._locations = list_locations(db)
-            for l in self._locations:
-                self.loc_dd.addItem(l.name, l.id)
+        # ✅ shared in-memory catalog (src/db/catalog.py): no DB round trip per dialog
+        self._catalog = get_catalog()
+        self._locations = self._catalog.locations
+        for l in self._locations:
+            self.loc_dd.addItem(l.name, l.id)
 
-            self._items = get_items(db, category="ALL")
-            self._items_by_id = {it.id: it for it in self._items}
+        self._item_model = shared_item_model(self._catalog)
 
         form.addRow("Vendor", self.vendor)
         form.addRow("Location", self.loc_dd)
@@ -185,10 +185,7 @@ class AddPurchaseDialog(QDialog):
         r = self.rows.rowCount()
         self.rows.insertRow(r)
 
-        item_dd = QComboBox()
-        item_dd.addItem("Select item...", None)
-        for it in self._items:
-            item_dd.addItem(f"{it.sku} — {it.name}", it.id)
+        item_dd = ItemPicker(self._item_model)  # ✅ shared model: constant cost per line
 
         cat_lbl = QLabel("—")
 
@@ -209,7 +206,7 @@ class AddPurchaseDialog(QDialog):
 
         def on_item_change():
             item_id = item_dd.currentData()
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 cat_lbl.setText("—")
                 qty_sec.setEnabled(True)
@@ -267,7 +264,7 @@ class AddPurchaseDialog(QDialog):
             if not item_id:
                 continue
 
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 continue
 
@@ -7,8 +7,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 
 from src.db.session import get_db
-from src.db.location_repo import list_locations
-from src.db.item_repo import get_items
+from src.db.catalog import get_catalog
 from src.db.returns_repo import (
     create_return,
     list_sale_returns, list_purchase_returns,
@@ -16,7 +15,9 @@ from src.db.returns_repo import (
     cancel_sale_return, cancel_purchase_return,
 )
 from src.ui.signals import signals
+from src.ui.widgets.item_picker import ItemPicker, shared_item_model
 from src.ui.app_state import AppState
+from src.ui.widgets.lazy_table import LazyTableView, offset_fetch
 
 
 def _get(obj, key, default=None):
@@ -46,13 +47,13 @@ class AddReturnDialog(QDialog):
         self.loc_dd = QComboBox()
         self.loc_dd.addItem("—", None)
 
-        with get_db() as db:
-            self._locations = list_locations(db)
-            for l in self._locations:
-                self.loc_dd.addItem(l.name, l.id)
+        # ✅ shared in-memory catalog (src/db/catalog.py): no DB round trip per dialog
+        self._catalog = get_catalog()
+        self._locations = self._catalog.locations
+        for l in self._locations:
+            self.loc_dd.addItem(l.name, l.id)
 
-            self._items = get_items(db, category="ALL")
-            self._items_by_id = {it.id: it for it in self._items}
+        self._item_model = shared_item_model(self._catalog)
 
         form.addRow("Return Type", self.return_type)
         form.addRow("Customer/Vendor", self.party)
@@ -83,10 +84,7 @@ class AddReturnDialog(QDialog):
         r = self.rows.rowCount()
         self.rows.insertRow(r)
 
-        item_dd = QComboBox()
-        item_dd.addItem("Select item...", None)
-        for it in self._items:
-            item_dd.addItem(f"{it.sku} — {it.name}", it.id)
+        item_dd = ItemPicker(self._item_model)  # ✅ shared model: constant cost per line
 
         cat_lbl = QLabel("—")
 
@@ -107,7 +105,7 @@ class AddReturnDialog(QDialog):
 
         def on_item_change():
             item_id = item_dd.currentData()
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 cat_lbl.setText("—")
                 qty_sec.setEnabled(True)
@@ -162,7 +160,7 @@ class AddReturnDialog(QDialog):
             if not item_id:
                 continue
 
-            it = self._items_by_id.get(item_id)
+            it = self._catalog.item(item_id)
             if not it:
                 continue
 
@@ -315,23 +313,25 @@ class ReturnsPage(QWidget):
         layout.addWidget(self.tabs)
 
         # Sale Returns
-        self.sale_table = QTableWidget(0, 5)
-        self.sale_table.setHorizontalHeaderLabels(["ID", "Party", "Location", "Created", "Ref"])
+        self.sale_table = LazyTableView(
+            ["ID", "Party", "Location", "Created", "Ref"],
+            offset_fetch(lambda offset, limit: self._load_page("SALE_RETURN", offset, limit))
+        )
         self.sale_table.setColumnHidden(0, True)
-        self.sale_table.horizontalHeader().setStretchLastSection(True)
         self.sale_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.sale_table.customContextMenuRequested.connect(lambda pos: self.open_menu(self.sale_table, "SALE_RETURN", pos))
-        self.sale_table.cellDoubleClicked.connect(lambda *_: self.open_details("SALE_RETURN"))
+        self.sale_table.doubleClicked.connect(lambda *_: self.open_details("SALE_RETURN"))
         self.tabs.addTab(self.sale_table, "Sale Returns")
 
         # Purchase Returns
-        self.pur_table = QTableWidget(0, 5)
-        self.pur_table.setHorizontalHeaderLabels(["ID", "Party", "Location", "Created", "Ref"])
+        self.pur_table = LazyTableView(
+            ["ID", "Party", "Location", "Created", "Ref"],
+            offset_fetch(lambda offset, limit: self._load_page("PURCHASE_RETURN", offset, limit))
+        )
         self.pur_table.setColumnHidden(0, True)
-        self.pur_table.horizontalHeader().setStretchLastSection(True)
         self.pur_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.pur_table.customContextMenuRequested.connect(lambda pos: self.open_menu(self.pur_table, "PURCHASE_RETURN", pos))
-        self.pur_table.cellDoubleClicked.connect(lambda *_: self.open_details("PURCHASE_RETURN"))
+        self.pur_table.doubleClicked.connect(lambda *_: self.open_details("PURCHASE_RETURN"))
         self.tabs.addTab(self.pur_table, "Purchase Returns")
 
         self.apply_permissions()
@@ -343,38 +343,33 @@ class ReturnsPage(QWidget):
         self.add_btn.setToolTip("" if can_add else "Viewer role: Adding returns is disabled.")
 
     def load_data(self):
-        q = self.search.text().strip()
-
-        self.sale_table.setRowCount(0)
-        self.pur_table.setRowCount(0)
+        self.sale_table.reload()
+        self.pur_table.reload()
 
+    def _load_page(self, return_type: str, offset: int, limit: int):
+        q = self.search.text().strip()
         with get_db() as db:
-            sale_rows = list_sale_returns(db, q_text=q) or []
-            pur_rows = list_purchase_returns(db, q_text=q) or []
-
-        for r, ret in enumerate(sale_rows):
-            self.sale_table.insertRow(r)
-            self.sale_table.setItem(r, 0, QTableWidgetItem(str(_get(ret, "id", ""))))
-            self.sale_table.setItem(r, 1, QTableWidgetItem(str(_get(ret, "customer_name", "") or "")))
-            loc = _get(ret, "location", None)
-            self.sale_table.setItem(r, 2, QTableWidgetItem(loc.name if loc else ""))
-            self.sale_table.setItem(r, 3, QTableWidgetItem(str(_get(ret, "created_at", "") or "")))
-            self.sale_table.setItem(r, 4, QTableWidgetItem(f"sale_return#{_get(ret,'id','')}"))
-
-        for r, ret in enumerate(pur_rows):
-            self.pur_table.insertRow(r)
-            self.pur_table.setItem(r, 0, QTableWidgetItem(str(_get(ret, "id", ""))))
-            self.pur_table.setItem(r, 1, QTableWidgetItem(str(_get(ret, "vendor_name", "") or "")))
-            loc = _get(ret, "location", None)
-            self.pur_table.setItem(r, 2, QTableWidgetItem(loc.name if loc else ""))
-            self.pur_table.setItem(r, 3, QTableWidgetItem(str(_get(ret, "created_at", "") or "")))
-            self.pur_table.setItem(r, 4, QTableWidgetItem(f"purchase_return#{_get(ret,'id','')}"))
-
-    def selected_id(self, table: QTableWidget):
-        row = table.currentRow()
-        if row < 0:
-            return None
-        return int(table.item(row, 0).text())
+            if return_type == "SALE_RETURN":
+                rets = list_sale_returns(db, q_text=q, limit=limit, offset=offset) or []
+                party_key, ref = "customer_name", "sale_return"
+            else:
+                rets = list_purchase_returns(db, q_text=q, limit=limit, offset=offset) or []
+                party_key, ref = "vendor_name", "purchase_return"
+
+            rows = []
+            for ret in rets:
+                loc = _get(ret, "location", None)
+                rows.append((
+                    _get(ret, "id", None),
+                    str(_get(ret, party_key, "") or ""),
+                    loc.name if loc else "",
+                    _get(ret, "created_at", None),
+                    f"{ref}#{_get(ret, 'id', '')}",
+                ))
+            return rows
+
+    def selected_id(self, table: LazyTableView):
+        return table.current_id()
 
     def open_details(self, return_type: str):
         table = self.sale_table if return_type == "SALE_RETURN" else self.pur_table
@@ -384,7 +379,7 @@ class ReturnsPage(QWidget):
         dlg = ReturnDetailsDialog(self, return_type, rid)
         dlg.exec()
 
-    def open_menu(self, table: QTableWidget, return_type: str, pos):
+    def open_menu(self, table: LazyTableView, return_type: str, pos):
         rid = self.selected_id(table)
         if not rid:
             return
@@ -396,7 +391,7 @@ class ReturnsPage(QWidget):
         if AppState.can_add_transactions():
             cancel_action = menu.addAction("Cancel Transaction")
 
-        action = menu.exec(table.mapToGlobal(pos))
+        action = menu.exec(table.viewport().mapToGlobal(pos))
         if action == view:
             self.open_details(return_type)
         elif cancel_action and action == cancel_action:
@@ -1,7 +1,7 @@
 # src/ui/pages/slabs.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem, QDialog,
+    QPushButton, QDialog,
     QFormLayout, QComboBox, QDoubleSpinBox, QSpinBox,
     QLineEdit, QMessageBox, QMenu
 )
@@ -10,10 +10,12 @@ from PySide6.QtCore import Qt
 from src.db.session import get_db
 from src.db.slab_repo import (
     list_slabs, create_slab_entry, update_slab_entry,
-    soft_delete_slab_entry, get_slab_items, get_slab_entry
+    soft_delete_slab_entry, get_slab_entry
 )
-from src.db.location_repo import get_locations
+from src.db.catalog import get_catalog
 from src.ui.signals import signals
+from src.ui.widgets.item_picker import ItemPicker, shared_item_model
+from src.ui.widgets.lazy_table import LazyTableView, offset_fetch
 
 
 class AddEditSlabDialog(QDialog):
@@ -27,16 +29,8 @@ class AddEditSlabDialog(QDialog):
         form = QFormLayout()
 
         # ---- load items once ----
-        self._items = []
-        self._items_by_id = {}
-        with get_db() as db:
-            self._items = get_slab_items(db)
-        for it in self._items:
-            self._items_by_id[it.id] = it
-
-        self.item_dd = QComboBox()
-        for it in self._items:
-            self.item_dd.addItem(f"{it.sku} — {it.name}", it.id)
+        self._catalog = get_catalog()  # ✅ shared in-memory catalog, no DB hit
+        self.item_dd = ItemPicker(shared_item_model(self._catalog, "SLAB"))
 
         self.slab_count = QSpinBox()
         self.slab_count.setRange(0, 10_000_000)
@@ -48,9 +42,7 @@ class AddEditSlabDialog(QDialog):
         # ---- locations dropdown ----
         self.location_cb = QComboBox()
         self.location_cb.addItem("Select Location...", None)
-        with get_db() as db:
-            locs = get_locations(db)
-        for loc in locs:
+        for loc in self._catalog.locations:
             self.location_cb.addItem(loc.name, loc.id)
 
         self.notes = QLineEdit()
@@ -92,10 +84,7 @@ class AddEditSlabDialog(QDialog):
     def _set_selected_item(self, item_id: int):
         if not item_id:
             return
-        for i in range(self.item_dd.count()):
-            if self.item_dd.itemData(i) == item_id:
-                self.item_dd.setCurrentIndex(i)
-                break
+        self.item_dd.set_item_id(item_id)
 
     def _set_selected_location(self, loc_id: int):
         if loc_id is None:
@@ -109,7 +98,7 @@ class AddEditSlabDialog(QDialog):
     def _auto_calc_sqft(self):
         item_id = self.item_dd.currentData()
         slabs = self.slab_count.value()
-        item = self._items_by_id.get(item_id)
+        item = self._catalog.item(item_id)
         if not item:
             return
 
@@ -165,13 +154,11 @@ class SlabsPage(QWidget):
         top.addWidget(self.add_btn)
         layout.addLayout(top)
 
-        self.table = QTableWidget(0, 8)
-        self.table.setHorizontalHeaderLabels([
+        self.table = LazyTableView([
             "ID", "SKU", "Name", "Slab Count", "Sqft", "Location", "Notes", "Created"
-        ])
+        ], offset_fetch(self._load_page))
         self.table.setColumnHidden(0, True)
         self.table.setColumnHidden(7, True)
-        self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_menu)
         layout.addWidget(self.table)
@@ -179,30 +166,27 @@ class SlabsPage(QWidget):
         self.load_data()
 
     def load_data(self):
-        self.table.setRowCount(0)
+        self.table.reload()
+
+    def _load_page(self, offset, limit):
         with get_db() as db:
-            rows = list_slabs(db, self.search.text().strip())
-            for r, row in enumerate(rows):
-                self.table.insertRow(r)
-                self.table.setItem(r, 0, QTableWidgetItem(str(row.id)))
-                self.table.setItem(r, 1, QTableWidgetItem(row.item.sku if row.item else ""))
-                self.table.setItem(r, 2, QTableWidgetItem(row.item.name if row.item else ""))
-
-                slab_txt = "" if row.slab_count is None else str(row.slab_count)
-                sqft_txt = "" if row.total_sqft is None else f"{float(row.total_sqft):.3f}"
-                loc_txt = row.location.name if getattr(row, "location", None) else ""
-
-                self.table.setItem(r, 3, QTableWidgetItem(slab_txt))
-                self.table.setItem(r, 4, QTableWidgetItem(sqft_txt))
-                self.table.setItem(r, 5, QTableWidgetItem(loc_txt))
-                self.table.setItem(r, 6, QTableWidgetItem(row.notes or ""))
-                self.table.setItem(r, 7, QTableWidgetItem(str(getattr(row, "created_at", ""))))
+            rows = list_slabs(db, self.search.text().strip(), limit=limit, offset=offset)
+            return [
+                (
+                    row.id,
+                    row.item.sku if row.item else "",
+                    row.item.name if row.item else "",
+                    row.slab_count,
+                    row.total_sqft,
+                    row.location.name if getattr(row, "location", None) else "",
+                    row.notes or "",
+                    getattr(row, "created_at", None),
+                )
+                for row in rows
+            ]
 
     def selected_id(self):
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        return int(self.table.item(row, 0).text())
+        return self.table.current_id()
 
     def open_menu(self, pos):
         entry_id = self.selected_id()
@@ -211,7 +195,7 @@ class SlabsPage(QWidget):
         menu = QMenu(self)
         edit = menu.addAction("Edit")
         delete = menu.addAction("Delete")
-        action = menu.exec(self.table.mapToGlobal(pos))
+        action = menu.exec(self.table.viewport().mapToGlobal(pos))
         if action == edit:
             self.edit_entry(entry_id)
         elif action == delete:
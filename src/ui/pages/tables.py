@@ -1,7 +1,7 @@
 # src/ui/pages/tables.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem, QDialog,
+    QPushButton, QDialog,
     QFormLayout, QComboBox, QSpinBox,
     QLineEdit, QMessageBox, QMenu
 )
@@ -10,10 +10,12 @@ from PySide6.QtCore import Qt
 from src.db.session import get_db
 from src.db.table_repo import (
     list_tables, create_table_entry, update_table_entry,
-    soft_delete_table_entry, get_table_items, get_table_entry
+    soft_delete_table_entry, get_table_entry
 )
-from src.db.location_repo import get_locations
+from src.db.catalog import get_catalog
 from src.ui.signals import signals
+from src.ui.widgets.item_picker import ItemPicker, shared_item_model
+from src.ui.widgets.lazy_table import LazyTableView, offset_fetch
 
 
 class AddEditTableDialog(QDialog):
@@ -27,13 +29,8 @@ class AddEditTableDialog(QDialog):
         form = QFormLayout()
 
         # items
-        self._items = []
-        with get_db() as db:
-            self._items = get_table_items(db)
-
-        self.item_dd = QComboBox()
-        for it in self._items:
-            self.item_dd.addItem(f"{it.sku} — {it.name}", it.id)
+        self._catalog = get_catalog()  # ✅ shared in-memory catalog, no DB hit
+        self.item_dd = ItemPicker(shared_item_model(self._catalog, "TABLE"))
 
         self.piece_count = QSpinBox()
         self.piece_count.setRange(0, 10_000_000)
@@ -41,9 +38,7 @@ class AddEditTableDialog(QDialog):
         # locations
         self.location_cb = QComboBox()
         self.location_cb.addItem("Select Location...", None)
-        with get_db() as db:
-            locs = get_locations(db)
-        for loc in locs:
+        for loc in self._catalog.locations:
             self.location_cb.addItem(loc.name, loc.id)
 
         self.notes = QLineEdit()
@@ -76,10 +71,7 @@ class AddEditTableDialog(QDialog):
     def _set_selected_item(self, item_id: int):
         if not item_id:
             return
-        for i in range(self.item_dd.count()):
-            if self.item_dd.itemData(i) == item_id:
-                self.item_dd.setCurrentIndex(i)
-                break
+        self.item_dd.set_item_id(item_id)
 
     def _set_selected_location(self, loc_id: int):
         if loc_id is None:
@@ -132,13 +124,11 @@ class TablesPage(QWidget):
         top.addWidget(self.add_btn)
         layout.addLayout(top)
 
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
+        self.table = LazyTableView([
             "ID", "SKU", "Name", "Pieces", "Location", "Notes", "Created"
-        ])
+        ], offset_fetch(self._load_page))
         self.table.setColumnHidden(0, True)
         self.table.setColumnHidden(6, True)
-        self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_menu)
         layout.addWidget(self.table)
@@ -146,28 +136,26 @@ class TablesPage(QWidget):
         self.load_data()
 
     def load_data(self):
-        self.table.setRowCount(0)
-        with get_db() as db:
-            rows = list_tables(db, self.search.text().strip())
-            for r, row in enumerate(rows):
-                self.table.insertRow(r)
-                self.table.setItem(r, 0, QTableWidgetItem(str(row.id)))
-                self.table.setItem(r, 1, QTableWidgetItem(row.item.sku if row.item else ""))
-                self.table.setItem(r, 2, QTableWidgetItem(row.item.name if row.item else ""))
-
-                pieces_txt = "" if row.piece_count is None else str(row.piece_count)
-                loc_txt = row.location.name if getattr(row, "location", None) else ""
+        self.table.reload()
 
-                self.table.setItem(r, 3, QTableWidgetItem(pieces_txt))
-                self.table.setItem(r, 4, QTableWidgetItem(loc_txt))
-                self.table.setItem(r, 5, QTableWidgetItem(row.notes or ""))
-                self.table.setItem(r, 6, QTableWidgetItem(str(getattr(row, "created_at", ""))))
+    def _load_page(self, offset, limit):
+        with get_db() as db:
+            rows = list_tables(db, self.search.text().strip(), limit=limit, offset=offset)
+            return [
+                (
+                    row.id,
+                    row.item.sku if row.item else "",
+                    row.item.name if row.item else "",
+                    row.piece_count,
+                    row.location.name if getattr(row, "location", None) else "",
+                    row.notes or "",
+                    getattr(row, "created_at", None),
+                )
+                for row in rows
+            ]
 
     def selected_id(self):
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        return int(self.table.item(row, 0).text())
+        return self.table.current_id()
 
     def open_menu(self, pos):
         entry_id = self.selected_id()
@@ -176,7 +164,7 @@ class TablesPage(QWidget):
         menu = QMenu(self)
         edit = menu.addAction("Edit")
         delete = menu.addAction("Delete")
-        action = menu.exec(self.table.mapToGlobal(pos))
+        action = menu.exec(self.table.viewport().mapToGlobal(pos))
         if action == edit:
             self.edit_entry(entry_id)
         elif action == delete:
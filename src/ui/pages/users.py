@@ -9,9 +9,9 @@ from PySide6.QtCore import Qt
 
 from src.db.session import get_db
 from src.db.models import User
-from src.db.auth_repo import create_user
-from src.db.security import hash_password
+from src.db.auth_repo import create_user, set_password
 from src.ui.app_state import AppState
+from src.ui.utils.background import run_in_background, busy_dialog
 
 
 class AddUserDialog(QDialog):
@@ -246,13 +246,23 @@ class UsersPage(QWidget):
             QMessageBox.warning(self, "Missing", "Password is required.")
             return
 
-        try:
+        def work():
             with get_db() as db:
                 create_user(db, data["username"], data["password"], data["role"])
+
+        # password hashing on a worker (slow on purpose) => page doesn't freeze
+        busy = busy_dialog(self, "Creating user...")
+
+        def done(_):
+            busy.close()
             self.load_data()
             QMessageBox.information(self, "Created", "User created ✅")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not create user:\n{e}")
+
+        def failed(err):
+            busy.close()
+            QMessageBox.critical(self, "Error", f"Could not create user:\n{err}")
+
+        run_in_background(self, work, done, failed)
 
     def edit_user(self):
         if not AppState.is_admin():
@@ -304,19 +314,33 @@ class UsersPage(QWidget):
             if not u:
                 QMessageBox.warning(self, "Not found", "User not found.")
                 return
+            username = u.username or ""
 
-            dlg = ResetPasswordDialog(u.username or "", self)
-            if dlg.exec() != QDialog.Accepted:
-                return
+        dlg = ResetPasswordDialog(username, self)
+        if dlg.exec() != QDialog.Accepted:
+            return
 
-            if not dlg.password or len(dlg.password) < 4:
-                QMessageBox.warning(self, "Weak", "Password must be at least 4 characters.")
-                return
-            if dlg.password != dlg.password2:
-                QMessageBox.warning(self, "Mismatch", "Passwords do not match.")
-                return
+        if not dlg.password or len(dlg.password) < 4:
+            QMessageBox.warning(self, "Weak", "Password must be at least 4 characters.")
+            return
+        if dlg.password != dlg.password2:
+            QMessageBox.warning(self, "Mismatch", "Passwords do not match.")
+            return
 
-            u.password_hash = hash_password(dlg.password)
-            db.commit()
+        password = dlg.password
+
+        def work():
+            with get_db() as db:
+                set_password(db, user_id, password)
+
+        busy = busy_dialog(self, "Updating password...")
+
+        def done(_):
+            busy.close()
+            QMessageBox.information(self, "Updated", "Password updated ✅")
+
+        def failed(err):
+            busy.close()
+            QMessageBox.critical(self, "Error", f"Could not update password:\n{err}")
 
-        QMessageBox.information(self, "Updated", "Password updated ✅")
+        run_in_background(self, work, done, failed)
@@ -1,12 +1,27 @@
 # src/ui/signals.py
 from PySide6.QtCore import QObject, Signal
 
+from src.db import catalog
+from src.db.dashboard_repo import invalidate_dashboard_snapshot
+
 class AppSignals(QObject):
     # kind: "slab" | "tile" | "block" | "table" | "items"
     inventory_changed = Signal(str)
 
     # NEW: dashboard cards navigation
-    # target_index = QStackedWidget index
-    navigate_to = Signal(int)
+    # page key from main_window.PAGES, e.g. "slabs" / "purchases"
+    navigate_to = Signal(str)
 
 signals = AppSignals()
+
+
+def _on_inventory_changed(kind: str):
+    # any stock/item change => dashboard numbers are stale (page reloads them in the background)
+    invalidate_dashboard_snapshot()
+
+    # item master changed => dialogs must not offer stale items (stock moves don't touch the catalog)
+    if kind == "items":
+        catalog.invalidate()
+
+
+signals.inventory_changed.connect(_on_inventory_changed)
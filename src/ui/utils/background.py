@@ -0,0 +1,59 @@
+# src/ui/utils/background.py
+"""
+Run one blocking call (password hashing / login) off the GUI thread.
+
+    run_in_background(self, work, on_done=self._done, on_error=self._failed)
+
+- work() runs on a daemon thread: NO widget access, open its own session (get_db())
+- on_done(result) / on_error(message) arrive on the GUI thread (queued signal)
+- the signal object is parented to `parent`, so a closed dialog doesn't get callbacks
+  after it was deleted
+
+busy_dialog(parent, text) => small modal "please wait" with an endless progress bar.
+"""
+import threading
+
+from PySide6.QtCore import QObject, Qt, Signal
+from PySide6.QtWidgets import QProgressDialog
+
+
+class _TaskSignals(QObject):
+    done = Signal(object)
+    failed = Signal(str)
+
+
+def run_in_background(parent, work, on_done, on_error=None):
+    sig = _TaskSignals(parent)
+    sig.done.connect(on_done)
+    if on_error:
+        sig.failed.connect(on_error)
+    sig.done.connect(sig.deleteLater)
+    sig.failed.connect(sig.deleteLater)
+
+    def _run():
+        try:
+            result = work()
+        except Exception as e:
+            _emit(sig.failed, str(e))
+            return
+        _emit(sig.done, result)
+
+    threading.Thread(target=_run, name="ui-background", daemon=True).start()
+    return sig
+
+
+def _emit(signal, value):
+    try:
+        signal.emit(value)
+    except RuntimeError:
+        pass  # parent (dialog) already deleted => nobody to tell
+
+
+def busy_dialog(parent, text: str) -> QProgressDialog:
+    dlg = QProgressDialog(text, None, 0, 0, parent)  # 0..0 => busy indicator, no cancel button
+    dlg.setWindowTitle("Please wait")
+    dlg.setWindowModality(Qt.WindowModal)
+    dlg.setMinimumDuration(0)
+    dlg.setAutoClose(False)
+    dlg.show()
+    return dlg
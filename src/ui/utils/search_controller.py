@@ -0,0 +1,139 @@
+# src/ui/utils/search_controller.py
+"""
+Debounced background search for list pages.
+
+    self.searcher = SearchController(
+        self,
+        params=self._search_params,      # GUI thread: read the filter widgets -> plain value
+        run=self._search,                # pool thread: run(db, params) -> result (NO widget access)
+        on_result=self._show_results,    # GUI thread: on_result(params, result)
+    )
+    self.search.textChanged.connect(self.searcher.trigger)       # typing: waits DEBOUNCE_MS
+    self.cat_dd.currentIndexChanged.connect(self.searcher.run_now)
+
+- only the latest search is shown; older results are dropped
+- a newer search cancels the in-flight query on the server (QueryCancelToken)
+- run() gets its own session from the pool thread (sessions are never shared across threads)
+"""
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from src.db.session import get_db
+from src.db.query_cancel import QueryCancelToken
+
+DEBOUNCE_MS = 300
+SEARCH_THREADS = 4
+
+_pool = None
+
+
+def search_pool() -> QThreadPool:
+    """
+    Own pool for searches: the global one has QThread.idealThreadCount() threads
+    (1 on a single-core till PC) and one slow query would block every page.
+    """
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(SEARCH_THREADS)
+    return _pool
+
+
+class _RunnerSignals(QObject):
+    done = Signal(int, object, object)   # generation, params, result
+    failed = Signal(int, object, str)    # generation, params, error
+
+
+class _SearchRunner(QRunnable):
+    def __init__(self, generation, params, run, token):
+        super().__init__()
+        self.generation = generation
+        self.params = params
+        self.run_fn = run
+        self.token = token
+        self.signals = _RunnerSignals()
+
+    def run(self):
+        try:
+            with get_db() as db:
+                self.token.bind(db)
+                try:
+                    result = self.run_fn(db, self.params)
+                finally:
+                    self.token.release()
+        except Exception as e:
+            # always report (also when cancelled) so the controller can drop its ref; stale = ignored
+            self.signals.failed.emit(self.generation, self.params, str(e))
+            return
+        self.signals.done.emit(self.generation, self.params, result)
+
+
+class SearchController(QObject):
+    busy_changed = Signal(bool)
+
+    def __init__(self, parent, params, run, on_result, on_error=None, delay_ms: int = DEBOUNCE_MS):
+        super().__init__(parent)
+        self._params = params
+        self._run = run
+        self._on_result = on_result
+        self._on_error = on_error
+
+        self._generation = 0
+        self._token = None
+        self._runners = {}  # generation -> runner: keeps the Python side alive until its signal arrives
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.run_now)
+
+        self.pool = search_pool()
+
+    def trigger(self, *_):
+        """Restart the debounce timer (connect textChanged here)."""
+        self._timer.start()
+
+    def run_now(self, *_):
+        self._timer.stop()
+        self.cancel()
+
+        self._generation += 1
+        token = QueryCancelToken()
+        self._token = token
+
+        runner = _SearchRunner(self._generation, self._params(), self._run, token)
+        runner.signals.done.connect(self._done)
+        runner.signals.failed.connect(self._failed)
+        self._runners[self._generation] = runner
+
+        self.busy_changed.emit(True)
+        self.pool.start(runner)
+
+    def cancel(self):
+        """Drops the pending/in-flight search (results of it will be ignored)."""
+        self._timer.stop()
+        if self._token is not None:
+            token, self._token = self._token, None
+            self._generation += 1  # whatever the old one returns is stale now
+            self.busy_changed.emit(False)
+            # pg_cancel_backend needs a connection: not on the GUI thread, and not queued behind
+            # the very query it has to stop (pool may be full)
+            threading.Thread(target=token.cancel, daemon=True).start()
+
+    def _finish(self, generation):
+        self._runners.pop(generation, None)
+        if generation == self._generation:
+            self._token = None
+            self.busy_changed.emit(False)
+            return True
+        return False  # stale
+
+    def _done(self, generation, params, result):
+        if self._finish(generation):
+            self._on_result(params, result)
+
+    def _failed(self, generation, params, err):
+        if self._finish(generation):
+            if self._on_error:
+                self._on_error(params, err)
@@ -0,0 +1,48 @@
+# src/ui/utils/startup_timing.py
+"""
+Startup timing report (where does login-to-window time go?).
+
+Enable with env:  MARBLE_STARTUP_TIMING=1
+main.py imports this module FIRST so the clock starts before the heavy imports.
+
+    mark("imports")        -> time since the previous mark is booked under "imports"
+    mark("login", wait=True)  -> user think-time, shown but excluded from the total
+    report()               -> prints the breakdown once (after the window is painted)
+"""
+import os
+import sys
+import time
+
+ENABLED = os.getenv("MARBLE_STARTUP_TIMING", "").strip().lower() not in ("", "0", "false", "no")
+
+_last = time.perf_counter()
+_marks = []  # [(label, seconds, wait)]
+_reported = False
+
+
+def mark(label: str, wait: bool = False):
+    global _last
+    now = time.perf_counter()
+    _marks.append((label, now - _last, wait))
+    _last = now
+
+
+def log(text: str):
+    """One-off line (e.g. a lazy page built later)."""
+    if ENABLED:
+        print(f"[startup] {text}", file=sys.stderr)
+
+
+def report():
+    global _reported
+    if not ENABLED or _reported:
+        return
+    _reported = True
+
+    total = sum(sec for _, sec, wait in _marks if not wait)
+    lines = ["[startup] timing (ms):"]
+    for label, sec, wait in _marks:
+        note = "  (waiting for user, not counted)" if wait else ""
+        lines.append(f"[startup]   {label:<28} {sec * 1000:8.1f}{note}")
+    lines.append(f"[startup]   {'TOTAL':<28} {total * 1000:8.1f}")
+    print("\n".join(lines), file=sys.stderr)
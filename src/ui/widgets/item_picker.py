@@ -0,0 +1,173 @@
+# src/ui/widgets/item_picker.py
+"""
+Type-ahead item picker for invoice lines (sales, purchases, returns, adjustments).
+
+    self._item_model = shared_item_model(self._catalog)   # once per dialog (shared, cached)
+    item_dd = ItemPicker(self._item_model)                 # per line: O(1), no addItem loop
+
+- ONE ItemListModel per catalog (src/db/catalog.py) => every line of every dialog shares it;
+  a new line doesn't copy the item list into its own combo.
+- Typing filters incrementally: SKU prefix matches first, then labels containing every
+  typed word (SKU / name), at most MAX_SUGGESTIONS shown. Up/Down + Enter picks, Esc closes.
+- Same API the dialogs already used: currentData() -> item id (None when nothing picked),
+  currentIndexChanged.
+"""
+from PySide6.QtCore import Qt, QAbstractListModel, QAbstractProxyModel, QModelIndex
+from PySide6.QtWidgets import QComboBox, QCompleter
+
+MAX_SUGGESTIONS = 50
+ITEM_ID_ROLE = Qt.UserRole  # == QComboBox.currentData() default role
+
+
+class ItemListModel(QAbstractListModel):
+    """Read-only list of catalog ItemRecs: label for display, id for ITEM_ID_ROLE."""
+    def __init__(self, items, parent=None):
+        super().__init__(parent)
+        self.items = tuple(items)
+        self._labels = [it.label for it in self.items]
+        self._keys = [label.lower() for label in self._labels]
+        self._row_of = {it.id: row for row, it in enumerate(self.items)}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._labels[index.row()]
+        if role == ITEM_ID_ROLE:
+            return self.items[index.row()].id
+        return None
+
+    def row_of(self, item_id) -> int:
+        return self._row_of.get(item_id, -1)
+
+    def matches(self, text: str, rows=None) -> list[int]:
+        """
+        Rows whose label starts with text, then rows containing every word of it
+        ("calacatta 12" finds "MBL-0012 — Calacatta Gold"). rows=None => all rows.
+        """
+        q = " ".join((text or "").lower().split())
+        if not q:
+            return []
+        first, *rest = q.split(" ")
+        keys = self._keys
+        prefix, inside = [], []
+        for row in (range(len(keys)) if rows is None else rows):
+            key = keys[row]
+            if key.startswith(q):
+                prefix.append(row)
+            elif first in key and all(w in key for w in rest):
+                inside.append(row)
+        return prefix + inside
+
+
+class _Suggestions(QAbstractProxyModel):
+    """
+    The picker's current matches, as a proxy of the shared model: QComboBox maps an activated
+    completion back to its own row through mapToSource (no findText over the whole list).
+    """
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows[:MAX_SUGGESTIONS])
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or not 0 <= proxy_index.row() < len(self._rows):
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], 0)
+
+    def mapFromSource(self, source_index):
+        if source_index.isValid() and source_index.row() in self._rows:
+            return self.index(self._rows.index(source_index.row()), 0)
+        return QModelIndex()
+
+
+class ItemPicker(QComboBox):
+    def __init__(self, model: ItemListModel, parent=None):
+        super().__init__(parent)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setModel(model)
+        self.setCurrentIndex(-1)
+        self.lineEdit().setPlaceholderText("Type SKU / name...")
+
+        # default size policy measures every row on first show
+        self.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.setMinimumContentsLength(28)
+        self.view().setUniformItemSizes(True)
+
+        # our own completer: the default one filters the full model on every keystroke
+        self._suggestions = _Suggestions(model, self)
+        completer = QCompleter(self._suggestions, self)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setMaxVisibleItems(12)
+        self.setCompleter(completer)
+
+        self._last_text = ""
+        self._last_rows = None  # all matches of _last_text (narrowed further while typing on)
+
+        self.lineEdit().textEdited.connect(self._on_text_edited)
+        self.lineEdit().editingFinished.connect(self._sync_text)
+
+    def _on_text_edited(self, text: str):
+        q = " ".join(text.lower().split())
+        model = self.model()
+
+        # typing on => only the previous matches can still match
+        narrow = self._last_rows is not None and self._last_text and q.startswith(self._last_text)
+        rows = model.matches(q, self._last_rows if narrow else None)
+
+        self._last_text, self._last_rows = (q, rows) if q else ("", None)
+        self._suggestions.set_rows(rows)
+        # QLineEdit refreshes the popup right after textEdited
+
+    def _sync_text(self):
+        """Left half-typed text => show the picked item again (or nothing)."""
+        row = self.currentIndex()
+        label = self.itemText(row) if row >= 0 else ""
+        if self.currentText() != label:
+            self.lineEdit().setText(label)
+
+    def set_item_id(self, item_id):
+        self.setCurrentIndex(self.model().row_of(item_id))
+
+
+_shared = {}  # (id(catalog), category) -> (catalog, ItemListModel)
+
+
+def shared_item_model(catalog, category: str = "ALL") -> ItemListModel:
+    """One model per catalog snapshot (+ category); a reloaded catalog gets a fresh model."""
+    key = (id(catalog), (category or "ALL").upper())
+    hit = _shared.get(key)
+    if hit is not None and hit[0] is catalog:
+        return hit[1]
+
+    # old snapshots' models are dropped (open dialogs keep theirs alive until they close)
+    for k in [k for k, (cat, _) in _shared.items() if cat is not catalog]:
+        del _shared[k]
+
+    model = ItemListModel(catalog.in_category(key[1]))
+    _shared[key] = (catalog, model)
+    return model
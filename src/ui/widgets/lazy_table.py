@@ -0,0 +1,177 @@
+# src/ui/widgets/lazy_table.py
+"""
+Lazy (virtual) table for big lists: items, ledger, stock pages, returns.
+
+The page gives a `fetch(cursor, limit) -> (rows, next_cursor)` function:
+- rows   = list of plain tuples (raw values: str/int/float/Decimal/datetime/None), column 0 = id
+- cursor = None for the first page; next_cursor=None means "no more rows"
+  (offset pages just return offset+len(rows); keyset pages return the last key)
+
+Only the first page is loaded up front; Qt asks for more (canFetchMore/fetchMore)
+when the user scrolls near the bottom. No QTableWidgetItem per cell => memory
+and first paint don't depend on how big the table is.
+
+Sorting (header click) goes through a QSortFilterProxyModel on the raw values
+of the rows loaded so far.
+"""
+from decimal import Decimal
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PySide6.QtWidgets import QTableView, QAbstractItemView
+
+PAGE_SIZE = 200
+SORT_ROLE = Qt.UserRole
+
+
+def display_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (float, Decimal)):
+        return f"{float(value):.3f}"
+    return str(value)
+
+
+class LazyTableModel(QAbstractTableModel):
+    def __init__(self, headers, fetch, page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._fetch = fetch
+        self.page_size = page_size
+
+        self._rows = []  # row cache (only what was fetched so far)
+        self._cursor = None
+        self._exhausted = False
+
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        # answered here, not via super().headerData: that call crashes the app at exit
+        # (PySide6 drops a reference to the returned None)
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if 0 <= section < len(self._headers) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return display_text(value)
+        if role == SORT_ROLE:
+            if isinstance(value, Decimal):
+                return float(value)
+            return value if value is None or isinstance(value, (int, float, str)) else str(value)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        # stays exhausted if fetch raises => the view won't retry in a loop
+        self._exhausted = True
+        rows, next_cursor = self._fetch(self._cursor, self.page_size)
+
+        # a filtered page can come back empty while more exist: keep going (the view
+        # only asks again after rows were added)
+        while not rows and next_cursor is not None and next_cursor != self._cursor:
+            self._cursor = next_cursor
+            rows, next_cursor = self._fetch(self._cursor, self.page_size)
+
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+        self._cursor = next_cursor
+        self._exhausted = next_cursor is None
+
+    # ---------- helpers ----------
+    def reload(self):
+        """Drops the cache and loads the first page again (filters changed / data saved)."""
+        self.beginResetModel()
+        self._rows = []
+        self._cursor = None
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def show_first_page(self, rows, next_cursor):
+        """First page fetched elsewhere (background search): replaces the cache, scrolling continues from next_cursor."""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._cursor = next_cursor
+        self._exhausted = next_cursor is None
+        self.endResetModel()
+
+    def row_values(self, row: int):
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+
+class LazyTableView(QTableView):
+    """
+    QTableView + LazyTableModel + sort proxy, with the QTableWidget-ish helpers the pages need.
+    The view starts empty: call reload() once the page's filter widgets exist.
+    """
+    def __init__(self, headers, fetch, page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.source = LazyTableModel(headers, fetch, page_size, self)
+
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.source)
+        self.proxy.setSortRole(SORT_ROLE)
+
+        self.setModel(self.proxy)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.horizontalHeader().setStretchLastSection(True)
+
+        # unsorted (= repo order) until the user clicks a header
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+
+    def reload(self):
+        self.source.reload()
+
+    def show_first_page(self, rows, next_cursor):
+        self.source.show_first_page(rows, next_cursor)
+
+    def current_values(self):
+        """Raw tuple of the current row (sorted view is mapped back to the cache)."""
+        index = self.currentIndex()
+        if not index.isValid():
+            return None
+        return self.source.row_values(self.proxy.mapToSource(index).row())
+
+    def current_id(self):
+        values = self.current_values()
+        if not values or values[0] is None:
+            return None
+        return int(values[0])
+
+
+def next_offset(offset, rows, limit):
+    """next_cursor for offset paging: None once a short page came back."""
+    return (offset or 0) + len(rows) if len(rows) >= limit else None
+
+
+def offset_fetch(load):
+    """
+    Wraps an offset/limit loader `load(offset, limit) -> rows` into the fetch contract.
+    """
+    def fetch(cursor, limit):
+        rows = load(cursor or 0, limit)
+        return rows, next_offset(cursor, rows, limit)
+    return fetch